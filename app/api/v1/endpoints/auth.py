@@ -1,21 +1,21 @@
-from __future__ import annotations
-
 import random
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends, Request, status
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.user import UserCreate  # expects mobile_number, password
 from app.schemas.token import Token
 from app.models.citizen import Citizen
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    hashing_executor,
+    verify_password_async,
     create_access_token,
 )
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.services.otp import otp_service
 from app.services.sms import get_sms_provider
 from app.limits import limiter  # ✅ shared limiter wired in main.py
@@ -78,7 +78,7 @@ async def request_otp(request: Request, user_in: UserCreate):
 async def verify_otp(
     request: Request,
     payload: VerifyOtpRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Verify OTP, create user (if not exists), and return JWT.
@@ -90,27 +90,29 @@ async def verify_otp(
             detail="Mobile number required",
         )
 
-    ok = await otp_service.verify_and_consume(mobile, str(payload.otp))
-    if not ok:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid or expired OTP",
-        )
+    invalid_otp = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid or expired OTP",
+    )
+    if await otp_service.get(mobile) != str(payload.otp):
+        raise invalid_otp
 
-    existing = db.query(Citizen).filter(Citizen.mobile_number == mobile).first()
+    existing = await db.scalar(select(Citizen.id).where(Citizen.mobile_number == mobile))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mobile number already registered",
         )
 
-    new_user = Citizen(
-        mobile_number=mobile,
-        password_hash=get_password_hash(payload.password),
-    )
+    # Hash before consuming the OTP: a 503 from the hashing executor leaves
+    # it valid for the retry that Retry-After invites.
+    password_hash = await get_password_hash_async(payload.password)
+    if not await otp_service.verify_and_consume(mobile, str(payload.otp)):
+        raise invalid_otp
+
+    new_user = Citizen(mobile_number=mobile, password_hash=password_hash)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     token = create_access_token(subject=str(new_user.id))
     return {"access_token": token, "token_type": "bearer"}
@@ -118,13 +120,14 @@ async def verify_otp(
 
 @router.post("/login", response_model=Token)
 @limiter.limit("5/minute")
-def login(
+async def login(
     request: Request,
     body: LoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Password login: verify user and issue JWT.
+    Password login: verify user and issue JWT. The bcrypt check runs on the
+    hashing executor (503 when it is saturated).
     """
     mobile = body.mobile_number.strip()
     if not mobile:
@@ -133,10 +136,8 @@ def login(
             detail="Mobile number required",
         )
 
-    user: Optional[Citizen] = (
-        db.query(Citizen).filter(Citizen.mobile_number == mobile).first()
-    )
-    if not user or not verify_password(body.password, user.password_hash):
+    user: Optional[Citizen] = await db.scalar(select(Citizen).where(Citizen.mobile_number == mobile))
+    if not user or not await verify_password_async(body.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -144,3 +145,9 @@ def login(
 
     token = create_access_token(subject=str(user.id))
     return {"access_token": token, "token_type": "bearer"}
+
+
+@router.get("/hashing/stats")
+async def hashing_stats():
+    """Password-hashing executor: running and queued hashes, and requests shed with 503."""
+    return hashing_executor.stats()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
+import hashlib
+import json
 import uuid
 
 from app import schemas, models
 from app.db.session import get_db
 from app.api.v1.endpoints.admin import get_current_admin
+from app.utils.http_cache import conditional_get
 
 router = APIRouter()
 
@@ -48,8 +51,17 @@ def create_charter_clause(
     return db_clause
 
 @router.get("/charter/versions", response_model=List[schemas.CharterVersion])
-def list_charter_versions(db: Session = Depends(get_db)):
+def list_charter_versions(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Retrieve all versions of the July Charter.
+    Supports conditional GET (ETag / If-None-Match). The generation is a hash
+    of the listed content, so edits (is_active, effective_date), deletes and
+    new versions all change it; the table is small and read whole anyway.
     """
-    return db.query(models.CharterVersion).all()
\ No newline at end of file
+    versions = [schemas.CharterVersion.model_validate(v) for v in db.query(models.CharterVersion).all()]
+    content = sorted(json.dumps(v.model_dump(mode="json"), sort_keys=True) for v in versions)
+    generation = hashlib.sha256("\n".join(content).encode()).hexdigest()
+    not_modified = conditional_get(request, response, namespace="charter-versions", generation=generation)
+    if not_modified is not None:
+        return not_modified
+    return versions
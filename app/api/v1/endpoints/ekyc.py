@@ -3,18 +3,19 @@ from __future__ import annotations
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import oauth2_scheme, SECRET_KEY, ALGORITHM
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.citizen import Citizen, VerificationStatus
 
 # All routes here live under /ekyc (final path: /api/v1/ekyc/*)
 router = APIRouter(prefix="/ekyc")
 
 
-def get_current_citizen(
-    db: Session = Depends(get_db),
+async def get_current_citizen(
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme),
 ) -> Citizen:
     """
@@ -35,7 +36,7 @@ def get_current_citizen(
     except (JWTError, ValueError):
         raise credentials_exception
 
-    citizen = db.query(Citizen).filter(Citizen.id == citizen_id).first()
+    citizen = await db.get(Citizen, citizen_id)
     if not citizen:
         raise credentials_exception
     return citizen
@@ -70,10 +71,10 @@ def initiate_ekyc_flow(
 
 
 @router.get("/callback", status_code=status.HTTP_200_OK)
-def handle_ekyc_callback(
+async def handle_ekyc_callback(
     code: str,
     state: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Handles the callback from the partner after user authorization.
@@ -100,12 +101,12 @@ def handle_ekyc_callback(
     }
 
     # 3) Update a citizen record (mock: just take the first one)
-    citizen_to_verify = db.query(Citizen).first()
+    citizen_to_verify = await db.scalar(select(Citizen).limit(1))
     if not citizen_to_verify:
         return {"status": "error", "message": "No user found to verify."}
 
     citizen_to_verify.verification_status = VerificationStatus.NID_VERIFIED
-    db.commit()
+    await db.commit()
 
     return {
         "status": "success",
@@ -1,27 +1,40 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
+import logging
 import uuid
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Literal, Optional, Tuple
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, HttpUrl
-
-from app.services.crawler import crawl_and_extract
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.approved_store import get_approved_store
+from app.services.browser_pool import browser_pool
+from app.services.crawl_cache import crawl_cache, url_key
+from app.services.crawl_runner import abandon, finish, flights_stale_before, orphaned_before, run_crawl
+from app.services.extraction_pool import extraction_pool
+from app.services.job_events import TERMINAL, Subscription, job_events
+from app.services.job_registry import get_job_registry
+from app.services.resolution import get_entity_resolver, sync_approved
+from app.services.scheduler import QueueFull, crawl_scheduler
+from app.utils.response_cache import response_cache
+from app.worker import send_crawl
+
+log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ingest")
 
-STORE_DIR = Path("storage/ingest")
-APPROVED_DIR = Path("storage/approved")
-STORE_DIR.mkdir(parents=True, exist_ok=True)
-APPROVED_DIR.mkdir(parents=True, exist_ok=True)
-
 
 class CreateJobRequest(BaseModel):
     url: HttpUrl
+    priority: int = Field(default=0, ge=0, le=9, description="Higher runs first")
 
 
 class JobSummary(BaseModel):
@@ -37,73 +50,337 @@ class JobDetail(JobSummary):
     error: Optional[str] = None
 
 
+class CreateBatchRequest(BaseModel):
+    urls: List[HttpUrl] = Field(min_length=1, max_length=1000)
+    priority: int = Field(default=0, ge=0, le=9, description="Higher runs first")
+
+
+class BatchJob(BaseModel):
+    id: str
+    url: HttpUrl
+    status: str
+
+
+class BatchCreated(BaseModel):
+    batch_id: str
+    jobs: List[BatchJob]
+
+
+class BatchProgress(BaseModel):
+    batch_id: str
+    created_at: datetime
+    total: int
+    counts: Dict[str, int]
+    done: bool
+
+
 class ApprovePayload(BaseModel):
     payload: Dict[str, Any] = Field(default_factory=dict)
 
 
-def _job_path(job_id: str) -> Path:
-    return STORE_DIR / f"{job_id}.json"
+class ApproveItem(BaseModel):
+    kind: Literal["party", "candidate"]
+    index: int = Field(ge=0, description="Position in the job's extracted parties/candidates")
+    overrides: Dict[str, Any] = Field(default_factory=dict, description="Fields to correct before approving")
 
 
-def _load_job(job_id: str) -> Dict[str, Any]:
-    p = _job_path(job_id)
-    if not p.exists():
-        raise HTTPException(status_code=404, detail="Job not found")
-    return json.loads(p.read_text(encoding="utf-8"))
+class BulkApproveRequest(BaseModel):
+    items: List[ApproveItem] = Field(min_length=1, max_length=1000)
+
+
+class BulkApproved(BaseModel):
+    job_id: str
+    counts: Dict[str, int]
+    approved: List[Dict[str, Any]]
 
 
-def _save_job(job: Dict[str, Any]) -> None:
-    p = _job_path(job["id"])
-    job["updated_at"] = datetime.utcnow().isoformat()
-    p.write_text(json.dumps(job, ensure_ascii=False, indent=2), encoding="utf-8")
+def _encode_cursor(job: Dict[str, Any]) -> str:
+    raw = f"{job['created_at'].isoformat()}|{job['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
 
-async def _run_job(job_id: str, url: str) -> None:
-    job = _load_job(job_id)
-    job["status"] = "running"
-    _save_job(job)
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
     try:
-        result = await crawl_and_extract(url)
-        job["status"] = "success"
-        job["result"] = result
-        _save_job(job)
-    except Exception as e:
-        job["status"] = "error"
-        job["error"] = f"{type(e).__name__}: {e}"
-        _save_job(job)
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, job_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), job_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _load_job(job_id: str, with_result: bool = True) -> Dict[str, Any]:
+    job = await run_in_threadpool(get_job_registry().get, job_id, with_result)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Crawl queue is full, retry later",
+        headers={"Retry-After": "30"},
+    )
+
+
+async def _dispatch(job_id: str, url: str, key: str, priority: int = 0) -> None:
+    """Hand a leader job to the crawl executor: this worker's scheduler or the Celery fleet."""
+    if settings.crawl_executor == "celery":
+        # publishing talks to the broker; keep it off the event loop
+        await run_in_threadpool(send_crawl, job_id, url, key, priority)
+        return
+    # the scheduler bounds concurrency per worker and host; don't block the request
+    crawl_scheduler.submit(
+        job_id,
+        lambda: run_crawl(job_id, url, key),
+        priority=priority,
+        host=urlsplit(url).hostname,
+    )
+
+
+async def recover_crawls() -> int:
+    """Re-dispatch jobs left "running" by a worker that stopped heartbeating."""
+    orphans = await run_in_threadpool(get_job_registry().claim_orphans, orphaned_before())
+    for job_id, url in orphans:
+        await _dispatch(job_id, url, url_key(url))
+    return len(orphans)
+
+
+async def sweep_crawls(interval: float) -> None:
+    """Background task: every `interval` seconds, recover crawls orphaned since startup."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            recovered = await recover_crawls()
+        except Exception:
+            log.exception("recovering orphaned crawls failed")
+            continue
+        if recovered:
+            log.info("re-dispatched %d orphaned crawl jobs", recovered)
+
+
+async def shutdown_crawls() -> None:
+    """Stop the crawl workers; jobs that never started (and their followers) are marked as errors."""
+    for job_id in await crawl_scheduler.shutdown():
+        await abandon(job_id, "Cancelled: API shut down before the crawl started")
+
+
+async def _admit(urls: List[str], priority: int, batch_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Create jobs for `urls` in one registry transaction. Each URL is answered
+    from a crawl within CRAWL_CACHE_TTL_SECONDS (the job starts out
+    successful), follows a crawl of the same URL already in flight on any
+    worker, or leads a new crawl. If the new crawls don't all fit in this
+    worker's queue, nothing is created and the caller gets 503.
+    """
+    registry = get_job_registry()
+    keys = [url_key(url) for url in urls]
+    cached: Dict[str, str] = {}
+    fresh_after = crawl_cache.fresh_after()
+    if fresh_after is not None:
+        cached = await run_in_threadpool(registry.cached_crawls, set(keys), fresh_after)
+        for key in keys:
+            crawl_cache.record_lookup(key in cached)
+
+    rows: List[Dict[str, Any]] = []
+    claims: Dict[str, str] = {}
+    for url, key in zip(urls, keys):
+        job_id = str(uuid.uuid4())
+        if key in cached:
+            rows.append({"id": job_id, "url": url, "status": "success", "result_ref": cached[key]})
+            continue
+        rows.append({"id": job_id, "url": url})
+        claims.setdefault(key, job_id)
+
+    flights: Dict[str, str] = {}
+    if claims:
+        flights = await run_in_threadpool(registry.claim_flights, claims, flights_stale_before(), orphaned_before())
+    leaders = {key: job_id for key, job_id in claims.items() if flights[key] == job_id}
+
+    async def release() -> None:
+        # jobs that joined our claims meanwhile must not wait on crawls that won't happen
+        for key, job_id in leaders.items():
+            await run_in_threadpool(
+                registry.land_flight, key, job_id, status="error", error="Crawl could not be queued"
+            )
+
+    in_process = settings.crawl_executor != "celery"
+    if in_process and leaders and crawl_scheduler.queued + len(leaders) > crawl_scheduler.max_queue:
+        crawl_scheduler.rejected += len(leaders)
+        await release()
+        raise _queue_full()
+
+    try:
+        jobs = {job["id"]: job for job in await run_in_threadpool(registry.create_many, rows, batch_id)}
+    except BaseException:
+        await release()
+        raise
+
+    follows = [
+        (flights[key], row["id"])
+        for row, key in zip(rows, keys)
+        if key in flights and row["id"] != leaders.get(key)
+    ]
+    crawl_cache.coalesced += len(follows)
+    # leaders that finished while the rows were being written
+    for job_id, fields in (await run_in_threadpool(registry.follow, follows)).items():
+        jobs[job_id].update(fields)
+
+    for key, job_id in leaders.items():
+        url = jobs[job_id]["url"]
+        try:
+            await _dispatch(job_id, url, key, priority)
+        except Exception as e:
+            error = "Crawl queue is full" if isinstance(e, QueueFull) else f"Crawl could not be queued: {e}"
+            fields = {"status": "error", "error": error}
+            await finish(job_id, key, **fields)
+            jobs[job_id].update(fields)
+    return list(jobs.values())
 
 
 @router.post("/jobs", response_model=JobDetail, status_code=status.HTTP_202_ACCEPTED)
 async def create_job(body: CreateJobRequest):
-    job_id = str(uuid.uuid4())
-    now = datetime.utcnow().isoformat()
-    job = {
-        "id": job_id,
-        "url": str(body.url),
-        "status": "queued",
-        "created_at": now,
-        "updated_at": now,
-        "result": None,
-        "error": None,
+    """
+    Queue a crawl of `url`. A URL crawled within CRAWL_CACHE_TTL_SECONDS is
+    answered from that crawl (the job is created already successful), and a
+    URL already being crawled shares that crawl.
+    """
+    (job,) = await _admit([str(body.url)], body.priority)
+    return job
+
+
+@router.post("/jobs/batch", response_model=BatchCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_batch(body: CreateBatchRequest):
+    """
+    Queue crawls for many URLs at once. Crawls are spread over hosts by the
+    scheduler's per-host limits; progress is at GET /ingest/batches/{batch_id}.
+    """
+    batch_id = str(uuid.uuid4())
+    jobs = await _admit([str(url) for url in body.urls], body.priority, batch_id)
+    return {"batch_id": batch_id, "jobs": jobs}
+
+
+@router.get("/batches/{batch_id}", response_model=BatchProgress)
+async def get_batch(batch_id: str):
+    progress = await run_in_threadpool(get_job_registry().batch_progress, batch_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return progress
+
+
+@router.get("/cache/stats")
+async def crawl_cache_stats():
+    """Cache hits/misses and coalesced submissions for this worker; crawls in flight across all workers."""
+    return {**crawl_cache.stats(), **await run_in_threadpool(get_job_registry().flight_stats)}
+
+
+@router.get("/scheduler/stats")
+async def scheduler_stats():
+    """Queue depth, running jobs, wait/run percentiles, browser/extraction pools and event viewers for this worker."""
+    return {
+        **crawl_scheduler.stats(),
+        "browser": browser_pool.stats(),
+        "extraction": extraction_pool.stats(),
+        "events": job_events.stats(),
     }
-    _save_job(job)
-    # schedule the crawl (don't block the request)
-    asyncio.create_task(_run_job(job_id, str(body.url)))
-    return _load_job(job_id)
 
 
 @router.get("/jobs", response_model=List[JobSummary])
-async def list_jobs():
-    out: List[JobSummary] = []
-    for p in sorted(STORE_DIR.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
-        j = json.loads(p.read_text(encoding="utf-8"))
-        out.append(JobSummary.model_validate(j))
-    return out
+async def list_jobs(
+    response: Response,
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+):
+    """
+    Newest jobs first, optionally filtered by one or more `status` values.
+    When more jobs exist, the `X-Next-Cursor` response header holds the
+    cursor for the next page.
+    """
+    before = _decode_cursor(after) if after else None
+    jobs = await run_in_threadpool(get_job_registry().list, status_filter, before, limit + 1)
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(jobs[-1])
+    return jobs
 
 
 @router.get("/jobs/{job_id}", response_model=JobDetail)
 async def get_job(job_id: str):
-    return JobDetail.model_validate(_load_job(job_id))
+    """
+    Job status and result manifest with extracted entities; the crawled HTML
+    is at /html. Each extracted party and candidate lists its likely
+    `matches` among approved entities and other jobs' extractions.
+    """
+    job = await _load_job(job_id)
+    entities = (job.get("result") or {}).get("entities")
+    if entities:
+        resolver = get_entity_resolver()
+        # catch up on recent approvals only; the store is indexed once at startup (resolution.warm_up)
+        await sync_approved(resolver, get_approved_store(), max_batches=1)
+        job["result"]["entities"] = await run_in_threadpool(resolver.annotate, job_id, job["result_ref"], entities)
+    return JobDetail.model_validate(job)
+
+
+@router.get("/jobs/{job_id}/html", response_class=PlainTextResponse)
+async def get_job_html(job_id: str):
+    job = await _load_job(job_id, with_result=False)
+    html = await run_in_threadpool(get_job_registry().load_html, job["result_ref"])
+    if html is None:
+        raise HTTPException(status_code=404, detail="Job has no crawled HTML")
+    # Third-party markup: served as text so browsers never render it on our origin
+    return PlainTextResponse(html, headers={"X-Content-Type-Options": "nosniff"})
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _job_event_stream(job: Dict[str, Any], sub: Subscription) -> AsyncIterator[str]:
+    registry = get_job_registry()
+    last = job["status"]
+    try:
+        yield _sse({"job_id": job["id"], "type": "status", "status": last, "error": job["error"]})
+        while last not in TERMINAL:
+            try:
+                event = await asyncio.wait_for(sub.get(), settings.job_events_keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Idle: keep proxies from closing the stream, and re-read the row in case the
+                # transition happened where no event reaches this process
+                row = await run_in_threadpool(registry.get, job["id"], False)
+                if row is not None and row["status"] != last:
+                    last = row["status"]
+                    yield _sse({"job_id": row["id"], "type": "status", "status": last, "error": row["error"]})
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+            if event["type"] == "status":
+                last = event["status"]
+            yield _sse(event)
+    finally:
+        sub.close()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events_stream(job_id: str):
+    """
+    Server-Sent Events for one job: the current status, then status changes
+    and crawl stages ("progress" events: fetching, scrolling, extracting,
+    done) as they happen. The stream ends after the final status; fetch the
+    result once, from GET /ingest/jobs/{job_id}.
+    """
+    # Subscribe before reading the row so a transition in between isn't missed
+    sub = job_events.subscribe(job_id)
+    try:
+        job = await _load_job(job_id, with_result=False)
+    except BaseException:
+        sub.close()
+        raise
+    return StreamingResponse(
+        _job_event_stream(job, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/extracted/{kind}/{index}/approve", status_code=status.HTTP_200_OK)
@@ -115,7 +392,7 @@ async def approve_extracted(kind: str, index: int, body: ApprovePayload, job_id:
     approved = body.payload or {}
 
     if job_id:
-        job = _load_job(job_id)
+        job = await _load_job(job_id)
         if job.get("status") != "success" or not job.get("result"):
             raise HTTPException(status_code=400, detail="Job has no successful result to approve from")
 
@@ -129,8 +406,52 @@ async def approve_extracted(kind: str, index: int, body: ApprovePayload, job_id:
         base.update(approved)
         approved = base
 
-    out_file = APPROVED_DIR / f"{kind}.jsonl"
-    with out_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(approved, ensure_ascii=False) + "\n")
+    store = get_approved_store()
+    await run_in_threadpool(store.append, kind, [approved])
+    response_cache.invalidate("parties" if kind == "party" else "candidates")
 
     return {"status": "ok", "approved": approved}
+
+
+_ENTITY_LISTS = {"party": "parties", "candidate": "candidates"}
+
+
+@router.post("/jobs/{job_id}/approve", response_model=BulkApproved)
+async def approve_job_entities(job_id: str, body: BulkApproveRequest):
+    """
+    Approve many extracted entities of one job at once, each with optional
+    overrides. The job's entities are loaded once (never its HTML) and every
+    item is validated before anything is written; then each kind's rows go
+    to the approved store in one append (one buffered write and fsync for
+    the JSONL files, one transaction for the DB).
+    """
+    job = await _load_job(job_id)
+    if job.get("status") != "success" or not job.get("result"):
+        raise HTTPException(status_code=400, detail="Job has no successful result to approve from")
+    entities: Dict[str, Any] = job["result"].get("entities") or {}
+
+    seen = set()
+    missing: List[str] = []
+    rows: Dict[str, List[Dict[str, Any]]] = {"party": [], "candidate": []}
+    approved: List[Dict[str, Any]] = []
+    for item in body.items:
+        if (item.kind, item.index) in seen:
+            raise HTTPException(status_code=400, detail=f"{item.kind} {item.index} is listed twice")
+        seen.add((item.kind, item.index))
+        extracted = entities.get(_ENTITY_LISTS[item.kind]) or []
+        if item.index >= len(extracted):
+            missing.append(f"{item.kind} {item.index}")
+            continue
+        row = {**extracted[item.index], **item.overrides}
+        rows[item.kind].append(row)
+        approved.append({"kind": item.kind, "index": item.index, **row})
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Not in the job's extracted entities: {', '.join(missing)}")
+
+    store = get_approved_store()
+    for kind, kind_rows in rows.items():
+        if kind_rows:
+            await run_in_threadpool(store.append, kind, kind_rows)
+            response_cache.invalidate(_ENTITY_LISTS[kind])
+
+    return {"job_id": job_id, "counts": {kind: len(r) for kind, r in rows.items()}, "approved": approved}
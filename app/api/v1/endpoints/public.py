@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import base64
 import json
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-APPROVED_DIR = Path("storage/approved")
-APPROVED_DIR.mkdir(parents=True, exist_ok=True)
+from app.services.approved_store import Filters, call_store, get_approved_store
+from app.services.search import tokenize
+from app.utils.http_cache import is_not_modified, validator_headers
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/public")
 
+_EXPORT_BATCH = 500
+
 
 class Party(BaseModel):
     id: Optional[str] = None
@@ -34,96 +39,172 @@ class Paged(BaseModel):
     items: List[Any]
     page: int
     size: int
-    total: int
-
-
-def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    if not path.exists():
-        return []
-    rows: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                pass
-    return rows
+    # Counted on the first page only; pages after a cursor leave it out
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+def _encode_cursor(pos: int) -> str:
+    return base64.urlsafe_b64encode(f"p:{pos}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        tag, pos = raw.split(":", 1)
+        if tag != "p":
+            raise ValueError(tag)
+        return int(pos)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(
+    kind: str,
+    filters: Filters,
+    page: int,
+    size: int,
+    after: Optional[str],
+    rank: bool = False,
+) -> Paged:
+    """
+    One page from the approved store. With `after`, the page resumes right
+    after the cursor's row position instead of counting from the start, and
+    the total is not recounted. Relevance order (`rank`) has no stable
+    position, so it offers no cursor.
+    """
+    hits, total, has_more = get_approved_store().page(
+        kind,
+        filters,
+        offset=(page - 1) * size,
+        limit=size,
+        after=None if after is None else _decode_cursor(after),
+        rank=rank,
+    )
+    next_cursor = None
+    if not rank and hits and has_more:
+        next_cursor = _encode_cursor(hits[-1][0])
+    return Paged(items=[row for _, row in hits], page=page, size=size, total=total, next_cursor=next_cursor)
+
+
+async def _cached_page(
+    request: Request,
+    namespace: str,
+    kind: str,
+    params: Tuple[Any, ...],
+    build: Callable[[], Paged],
+) -> Response:
+    """
+    Serve a page with HTTP validators, answering from (in order) the client's
+    If-None-Match, the encoded-response LRU, or `build()`.
+    """
+    store = get_approved_store()
+    generation, last_modified = await call_store(store, store.generation, kind)
+    headers = validator_headers(
+        request,
+        namespace=namespace,
+        generation=generation,
+        last_modified=last_modified,
+    )
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    key = (generation, params)
+    body = response_cache.get(namespace, key)
+    if body is None:
+        paged = await call_store(store, build)
+        body = paged.model_dump_json().encode("utf-8")
+        response_cache.set(namespace, key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the encoded-response cache in this worker."""
+    return response_cache.stats()
 
 
 @router.get("/parties", response_model=Paged)
 async def get_parties(
+    request: Request,
     search: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous next_cursor; overrides page"),
 ):
-    rows = _read_jsonl(APPROVED_DIR / "party.jsonl")
-
-    if search:
-        s = search.lower()
-        rows = [r for r in rows if s in (r.get("name", "") or "").lower()]
-
-    total = len(rows)
-    start = (page - 1) * size
-    end = start + size
-    page_items = rows[start:end]
-
-    # normalize keys → Party model-like
-    def norm(r: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "id": r.get("id"),
-            "name": r.get("name") or r.get("full_name") or r.get("title") or "Unknown",
-            "abbrev": r.get("abbrev"),
-            "logoUrl": r.get("logo_url") or r.get("logoUrl"),
-            "description": r.get("description"),
-        }
+    def build() -> Paged:
+        return _page("party", {"search": search}, page, size, after)
 
-    return Paged(items=[norm(r) for r in page_items], page=page, size=size, total=total)
+    return await _cached_page(request, "parties", "party", (search, page, size, after), build)
 
 
 @router.get("/candidates", response_model=Paged)
 async def get_candidates(
+    request: Request,
     party: Optional[str] = Query(None),
     constituency: Optional[str] = Query(None),
     q: Optional[str] = Query(None),
+    sort: Literal["approved", "relevance"] = Query("approved"),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous next_cursor; overrides page"),
+):
+    ranked = sort == "relevance" and bool(tokenize(q))
+    if ranked and after is not None:
+        raise HTTPException(status_code=400, detail="Cursor pagination requires sort=approved")
+
+    filters: Filters = {"party": party, "constituency": constituency, "q": q}
+
+    def build() -> Paged:
+        return _page("candidate", filters, page, size, after, rank=ranked)
+
+    key = (party, constituency, q, ranked, page, size, after)
+    return await _cached_page(request, "candidates", "candidate", key, build)
+
+
+async def _by_key(kind: str, key: str) -> Dict[str, Any]:
+    store = get_approved_store()
+    row = await call_store(store, store.lookup, kind, key)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No approved {kind} with this key")
+    return row
+
+
+@router.get("/parties/by-key", response_model=Party)
+async def get_party_by_key(key: str = Query(..., description="Identity key, as in an extracted entity's `matches`")):
+    """One approved party by its identity key (folded name)."""
+    return await _by_key("party", key)
+
+
+@router.get("/candidates/by-key", response_model=Candidate)
+async def get_candidate_by_key(key: str = Query(..., description="Identity key, as in an extracted entity's `matches`")):
+    """One approved candidate by its identity key (folded name, party and constituency)."""
+    return await _by_key("candidate", key)
+
+
+@router.get("/candidates/export")
+async def export_candidates(
+    party: Optional[str] = Query(None),
+    constituency: Optional[str] = Query(None),
+    q: Optional[str] = Query(None),
 ):
-    rows = _read_jsonl(APPROVED_DIR / "candidate.jsonl")
-
-    def match(r: Dict[str, Any]) -> bool:
-        ok = True
-        if party:
-            p = (r.get("party_guess") or r.get("partyName") or "").lower()
-            ok = ok and (party.lower() in p)
-        if constituency:
-            c = (r.get("constituency_guess") or r.get("constituencyName") or "").lower()
-            ok = ok and (constituency.lower() in c)
-        if q:
-            s = q.lower()
-            ok = ok and (
-                s in (r.get("full_name") or r.get("fullName") or "").lower()
-                or s in (r.get("bio") or "").lower()
-            )
-        return ok
-
-    rows = [r for r in rows if match(r)]
-
-    total = len(rows)
-    start = (page - 1) * size
-    end = start + size
-    page_items = rows[start:end]
-
-    def norm(r: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "id": r.get("id"),
-            "fullName": r.get("full_name") or r.get("fullName") or "Unknown",
-            "partyName": r.get("party_guess") or r.get("partyName"),
-            "constituencyName": r.get("constituency_guess") or r.get("constituencyName"),
-            "photoUrl": r.get("photo_url") or r.get("photoUrl"),
-            "bio": r.get("bio"),
-        }
-
-    return Paged(items=[norm(r) for r in page_items], page=page, size=size, total=total)
+    """
+    Stream every matching candidate as NDJSON (one JSON object per line).
+
+    Rows are encoded lazily in small batches, so the body is never built in
+    memory: the SQL store reads them in batches too, and the JSONL store hands
+    out the rows its catalog already holds.
+    """
+    rows = get_approved_store().export("candidate", {"party": party, "constituency": constituency, "q": q})
+
+    def lines() -> Iterator[str]:
+        batch: List[str] = []
+        for row in rows:
+            batch.append(json.dumps(row, ensure_ascii=False))
+            if len(batch) >= _EXPORT_BATCH:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
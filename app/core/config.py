@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import json
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -28,11 +28,98 @@ class Settings(BaseSettings):
     # Security / Auth
     secret_key: str = Field(env="SECRET_KEY")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    # bcrypt runs on its own threads: concurrent hashes, and how many more may wait before requests get a 503
+    password_hash_workers: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_max: int = Field(default=32, env="PASSWORD_HASH_QUEUE_MAX")
 
     # Database / cache
     sqlalchemy_database_uri: str = Field(env="SQLALCHEMY_DATABASE_URI")
+    # Async engine (get_async_db); unset = SQLALCHEMY_DATABASE_URI with the asyncpg/aiosqlite driver
+    async_database_uri: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URI")
     redis_url: Optional[str] = Field(default=None, env="REDIS_URL")
 
+    # Approved parties/candidates: "jsonl" (per-host files) or "db" (shared indexed tables)
+    approved_store_backend: str = Field(default="jsonl", env="APPROVED_STORE_BACKEND")
+    approved_store_dir: str = Field(default="storage/approved", env="APPROVED_STORE_DIR")
+    # JSONL logs are rewritten without superseded rows once this many piled up (checked every N seconds, 0 = off)
+    approved_compact_min_superseded: int = Field(default=1000, env="APPROVED_COMPACT_MIN_SUPERSEDED")
+    approved_compact_interval_seconds: float = Field(default=300.0, env="APPROVED_COMPACT_INTERVAL_SECONDS")
+
+    # Ingest job registry: SQLite file locally, the shared Postgres in prod
+    ingest_store_dir: str = Field(default="storage/ingest", env="INGEST_STORE_DIR")
+    ingest_registry_url: str = Field(default="sqlite:///storage/ingest/registry.db", env="INGEST_REGISTRY_URL")
+    # Crawl result blobs (HTML, entities): "files" under INGEST_STORE_DIR, which only this host sees,
+    # or "db" in the registry database, required when the Celery fleet crawls for the API
+    ingest_blob_backend: str = Field(default="files", env="INGEST_BLOB_BACKEND")
+
+    # Where crawls run: "inprocess" (each API worker's scheduler) or "celery" (the app.worker fleet)
+    crawl_executor: str = Field(default="inprocess", env="CRAWL_EXECUTOR")
+    # Celery broker (defaults to REDIS_URL); unacknowledged crawl tasks are redelivered after the
+    # visibility timeout, so it must exceed the longest crawl
+    celery_broker_url: Optional[str] = Field(default=None, env="CELERY_BROKER_URL")
+    celery_visibility_timeout_seconds: int = Field(default=3600, env="CELERY_VISIBILITY_TIMEOUT_SECONDS")
+    celery_task_always_eager: bool = Field(default=False, env="CELERY_TASK_ALWAYS_EAGER")
+    # Running jobs heartbeat; ones silent for CRAWL_ORPHAN_AFTER_SECONDS are re-queued (and their
+    # crawls taken over) by a sweep at startup and every CRAWL_ORPHAN_SWEEP_SECONDS (0 = startup only)
+    crawl_heartbeat_seconds: float = Field(default=30.0, env="CRAWL_HEARTBEAT_SECONDS")
+    crawl_orphan_after_seconds: float = Field(default=300.0, env="CRAWL_ORPHAN_AFTER_SECONDS")
+    crawl_orphan_sweep_seconds: float = Field(default=60.0, env="CRAWL_ORPHAN_SWEEP_SECONDS")
+    # Live job events (SSE): Redis pub/sub carrying them between processes, needed with the Celery
+    # fleet or several API workers (unset = this process only); keep-alive/re-check interval
+    job_events_url: Optional[str] = Field(default=None, env="JOB_EVENTS_URL")
+    job_events_keepalive_seconds: float = Field(default=15.0, env="JOB_EVENTS_KEEPALIVE_SECONDS")
+    # Crawl scheduling (per API worker)
+    crawl_concurrency: int = Field(default=2, env="CRAWL_CONCURRENCY")
+    crawl_queue_max: int = Field(default=1000, env="CRAWL_QUEUE_MAX")
+    # Politeness per target host: concurrent crawls (0 = unlimited) and seconds between crawl starts
+    crawl_per_host_concurrency: int = Field(default=1, env="CRAWL_PER_HOST_CONCURRENCY")
+    crawl_per_host_delay_seconds: float = Field(default=2.0, env="CRAWL_PER_HOST_DELAY_SECONDS")
+    # Repeat submissions of a URL within this many seconds reuse its last crawl (0 = always crawl)
+    crawl_cache_ttl_seconds: float = Field(default=900.0, env="CRAWL_CACHE_TTL_SECONDS")
+    # Entity resolution: name similarity (3-gram Jaccard) to flag a likely match, and matches listed per entity
+    entity_resolution_min_similarity: float = Field(default=0.5, env="ENTITY_RESOLUTION_MIN_SIMILARITY")
+    entity_resolution_max_matches: int = Field(default=5, env="ENTITY_RESOLUTION_MAX_MATCHES")
+    # Shared headless browser: open-page cap, relaunch after N pages or above RSS MB (0 = off)
+    browser_max_pages: int = Field(default=4, env="BROWSER_MAX_PAGES")
+    browser_recycle_after: int = Field(default=200, env="BROWSER_RECYCLE_AFTER")
+    browser_max_rss_mb: int = Field(default=1536, env="BROWSER_MAX_RSS_MB")
+    # Auto-scroll: stop once scrollHeight is unchanged for N network-idle rounds, or at the caps.
+    # CRAWL_SCROLL_PROFILES overrides any of these per host, e.g. {"ec.gov.bd": {"max_steps": 60}}
+    crawl_scroll_max_steps: int = Field(default=30, env="CRAWL_SCROLL_MAX_STEPS")
+    crawl_scroll_max_seconds: float = Field(default=30.0, env="CRAWL_SCROLL_MAX_SECONDS")
+    crawl_scroll_stable_rounds: int = Field(default=2, env="CRAWL_SCROLL_STABLE_ROUNDS")
+    crawl_scroll_idle_ms: int = Field(default=300, env="CRAWL_SCROLL_IDLE_MS")
+    crawl_scroll_step_timeout_ms: int = Field(default=3000, env="CRAWL_SCROLL_STEP_TIMEOUT_MS")
+    crawl_scroll_profiles: Dict[str, Dict[str, Any]] = Field(default_factory=dict, env="CRAWL_SCROLL_PROFILES")
+    # Static fast path: plain GET first, browser only if it yields fewer than N candidates+parties
+    crawl_static_first: bool = Field(default=True, env="CRAWL_STATIC_FIRST")
+    crawl_static_min_entities: int = Field(default=5, env="CRAWL_STATIC_MIN_ENTITIES")
+    crawl_static_timeout_seconds: float = Field(default=15.0, env="CRAWL_STATIC_TIMEOUT_SECONDS")
+    crawl_static_max_bytes: int = Field(default=5 * 1024 * 1024, env="CRAWL_STATIC_MAX_BYTES")
+    crawl_http_max_connections: int = Field(default=20, env="CRAWL_HTTP_MAX_CONNECTIONS")
+    # Processes for HTML extraction (0 = threadpool in the API process)
+    crawl_extract_workers: int = Field(default=2, env="CRAWL_EXTRACT_WORKERS")
+    # Requests the crawler aborts: Playwright resource types, and URL substrings (trackers/ads)
+    crawl_block_resource_types: List[str] = Field(default=["image", "media", "font"], env="CRAWL_BLOCK_RESOURCE_TYPES")
+    crawl_block_url_patterns: List[str] = Field(
+        default=[
+            "google-analytics.com",
+            "googletagmanager.com",
+            "doubleclick.net",
+            "googlesyndication.com",
+            "connect.facebook.net",
+            "hotjar.com",
+        ],
+        env="CRAWL_BLOCK_URL_PATTERNS",
+    )
+
+    # HTTP caching of public read endpoints (seconds a CDN/browser may reuse a response)
+    public_cache_max_age: int = Field(default=30, env="PUBLIC_CACHE_MAX_AGE")
+    # In-process LRU of encoded public responses
+    response_cache_max_entries: int = Field(default=1024, env="RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="RESPONSE_CACHE_MAX_BYTES")
+    response_cache_ttl_seconds: float = Field(default=60.0, env="RESPONSE_CACHE_TTL_SECONDS")
+
     # CORS
     # Accept JSON array or comma-separated string in env
     cors_origins: List[str] = Field(default_factory=list, env="CORS_ORIGINS")
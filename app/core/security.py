@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
+import queue
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -21,6 +25,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 # === Password hashing ===
 def get_password_hash(password: str) -> str:
@@ -37,6 +43,138 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+class HashingBusy(Exception):
+    """Every hashing worker is busy and the wait queue is full."""
+
+
+# Logins wait for a password check; new hashes (registration) can take a back seat
+PRIORITY_VERIFY = 0
+PRIORITY_HASH = 1
+
+_STOP = float("inf")
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class HashingExecutor:
+    """
+    Dedicated threads for bcrypt, so hashing neither blocks the event loop
+    nor competes with sync endpoints for Starlette's shared threadpool
+    (bcrypt releases the GIL, so `workers` up to the core count run in
+    parallel).
+
+    Waiting calls run lowest `priority` first, so a registration storm
+    cannot queue logins behind it. A call is shed with HashingBusy when
+    `max_queue` calls of its priority or a more urgent one are already
+    waiting: registrations are turned away before any login is.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 32) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._queue: "queue.PriorityQueue[Tuple[float, int, Any]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+        self.completed = 0
+        self.shed = 0
+
+    def _work(self) -> None:
+        while True:
+            priority, _, job = self._queue.get()
+            if priority == _STOP:
+                return
+            loop, future, fn, args = job
+            if future.cancelled():
+                self._finish(priority, ran=False)
+                continue
+            try:
+                result, error = fn(*args), None
+            except BaseException as e:  # handed to the awaiting caller
+                result, error = None, e
+            # Counted here, not by the caller: one that went away (client
+            # disconnect) leaves the hash running until this point.
+            self._finish(priority, ran=True)
+            loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    def _finish(self, priority: int, ran: bool) -> None:
+        with self._lock:
+            self._pending[priority] -= 1
+            if ran:
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, priority: int = PRIORITY_VERIFY) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            ahead = sum(n for p, n in self._pending.items() if p <= priority)
+            if ahead >= self.workers + self.max_queue:
+                self.shed += 1
+                raise HashingBusy()
+            self._pending[priority] = self._pending.get(priority, 0) + 1
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._work, name=f"password-hash-{i}", daemon=True)
+                    for i in range(self.workers)
+                ]
+                for t in self._threads:
+                    t.start()
+            self._queue.put((priority, next(self._seq), (loop, future, fn, args)))
+        return await future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put((_STOP, next(self._seq), None))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(self._pending.values())
+            hashes = self._pending.get(PRIORITY_HASH, 0)
+        return {
+            "workers": self.workers,
+            "running": min(pending, self.workers),
+            "queued": max(0, pending - self.workers),
+            "pending_hashes": hashes,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "shed": self.shed,
+        }
+
+
+hashing_executor = HashingExecutor(workers=settings.password_hash_workers, max_queue=settings.password_hash_queue_max)
+
+
+async def _hash_off_loop(priority: int, fn: Callable[..., T], *args: Any) -> T:
+    try:
+        return await hashing_executor.run(fn, *args, priority=priority)
+    except HashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry later",
+            headers={"Retry-After": "5"},
+        )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing executor, behind pending logins; 503 when saturated."""
+    return await _hash_off_loop(PRIORITY_HASH, get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing executor, ahead of new hashes; 503 when saturated."""
+    return await _hash_off_loop(PRIORITY_VERIFY, verify_password, plain_password, hashed_password)
+
+
 # === JWT helpers ===
 def create_access_token(
     subject: Union[str, Dict[str, Any]],
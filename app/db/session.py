@@ -1,7 +1,9 @@
 # D:\Application\Electa\app\app\electa-backend-api\app\db\session.py
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
@@ -22,3 +24,47 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+# --- Async stack, for endpoints ported off the sync session ---
+# Same database as `engine`; both coexist while endpoints migrate.
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def async_database_uri() -> str:
+    """ASYNC_DATABASE_URI, else SQLALCHEMY_DATABASE_URI with its async driver (asyncpg / aiosqlite)."""
+    if settings.async_database_uri:
+        return settings.async_database_uri
+    url = make_url(settings.sqlalchemy_database_uri)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver for {url.drivername}; set ASYNC_DATABASE_URI")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Built on first use, so processes that never touch the async stack
+    (Celery workers, migrations) don't need its driver installed.
+    """
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        _async_engine = create_async_engine(async_database_uri(), pool_pre_ping=True)
+        # Not expired on commit: attributes stay readable without another round-trip
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session_factory = None
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.ingest import recover_crawls, shutdown_crawls, sweep_crawls
+from app.core.security import hashing_executor
+from app.db.session import dispose_async_engine
+from app.services.approved_store import get_approved_store, run_compactor
+from app.services.browser_pool import browser_pool
+from app.services.crawler import close_http_client
+from app.services.extraction_pool import extraction_pool
+from app.services.job_events import job_events
+from app.services.resolution import warm_up as warm_up_resolution
 
 # ---- SlowAPI (rate limiting) via shared limiter ----
 # If you remove slowapi from dependencies, you can delete this block safely.
@@ -13,9 +25,41 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from app.limits import limiter  # single shared Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Spawn extraction workers up front; the shared browser is launched lazily by the first crawl
+    await extraction_pool.start()
+    # Jobs a dead worker left "running" (no heartbeat) are crawled again, now and as they turn up
+    await recover_crawls()
+    sweeper = None
+    if settings.crawl_orphan_sweep_seconds > 0:
+        sweeper = asyncio.create_task(sweep_crawls(settings.crawl_orphan_sweep_seconds))
+    compactor = None
+    if settings.approved_compact_interval_seconds > 0:
+        compactor = asyncio.create_task(run_compactor(settings.approved_compact_interval_seconds))
+    # Index approved entities for duplicate matching in the background, not in the first job read
+    resolution = asyncio.create_task(warm_up_resolution(get_approved_store()))
+    yield
+    for task in (sweeper, compactor, resolution):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    # Cancel in-flight crawls first so their pages are released, then the browser
+    await shutdown_crawls()
+    await browser_pool.close()
+    await close_http_client()
+    extraction_pool.shutdown()
+    hashing_executor.shutdown()
+    await job_events.close()
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title=settings.project_name,
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS
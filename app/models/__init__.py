@@ -6,4 +6,5 @@ from .source import Source
 from .charter_version import CharterVersion
 from .charter_clause import CharterClause
 from .compliance_evidence import ComplianceEvidence
-from .party_compliance_record import PartyComplianceRecord
\ No newline at end of file
+from .party_compliance_record import PartyComplianceRecord
+from .approved_entity import ApprovedParty, ApprovedCandidate, ApprovedTerm
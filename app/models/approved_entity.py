@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from app.db.base_class import Base
+
+
+# Approved rows published through /public. The integer primary key grows with
+# every approval and doubles as the keyset cursor and the store generation.
+# identity_key (see approved_store.identity_key) is unique: approving the same
+# entity again replaces its row with a new one.
+class ApprovedParty(Base):
+    __tablename__ = "approved_parties"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    identity_key = Column(String, nullable=True, unique=True, index=True)
+    external_id = Column(String, nullable=True)
+    name = Column(String, nullable=False)
+    name_folded = Column(String, nullable=False, index=True)
+    abbrev = Column(String, nullable=True)
+    logo_url = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=True)  # the approved row as submitted
+    approved_at = Column(DateTime, nullable=False)
+
+
+class ApprovedCandidate(Base):
+    __tablename__ = "approved_candidates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    identity_key = Column(String, nullable=True, unique=True, index=True)
+    external_id = Column(String, nullable=True)
+    full_name = Column(String, nullable=False)
+    party_name = Column(String, nullable=True)
+    party_folded = Column(String, nullable=True, index=True)
+    constituency_name = Column(String, nullable=True)
+    constituency_folded = Column(String, nullable=True, index=True)
+    photo_url = Column(String, nullable=True)
+    bio = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=True)
+    approved_at = Column(DateTime, nullable=False)
+
+
+class ApprovedTerm(Base):
+    """
+    Inverted index over approved rows: one row per (kind, field, token, row).
+    Prefix lookups are range scans on (kind, field, term).
+    """
+    __tablename__ = "approved_terms"
+
+    kind = Column(String(16), primary_key=True)   # party | candidate
+    field = Column(String(16), primary_key=True)  # name | bio | party | constituency
+    # Byte/codepoint ordering on Postgres so prefix range scans are exact.
+    term = Column(String().with_variant(String(collation="C"), "postgresql"), primary_key=True)
+    row_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (Index("ix_approved_terms_row", "kind", "row_id"),)
@@ -0,0 +1,522 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.approved_entity import ApprovedCandidate, ApprovedParty, ApprovedTerm
+from app.services.catalog import SEQ_FIELD, ApprovedCatalog, log_lock
+from app.services.search import CandidateIndex, NameIndex, tokenize
+
+log = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+Filters = Dict[str, Optional[str]]
+# (position, normalized row) pairs; positions are what cursors encode
+Hits = List[Tuple[int, Row]]
+
+KINDS = ("party", "candidate")
+
+
+def normalize_party(r: Row) -> Row:
+    # normalize keys → Party model-like
+    return {
+        "id": r.get("id"),
+        "name": r.get("name") or r.get("full_name") or r.get("title") or "Unknown",
+        "abbrev": r.get("abbrev"),
+        "logoUrl": r.get("logo_url") or r.get("logoUrl"),
+        "description": r.get("description"),
+    }
+
+
+def normalize_candidate(r: Row) -> Row:
+    return {
+        "id": r.get("id"),
+        "fullName": r.get("full_name") or r.get("fullName") or "Unknown",
+        "partyName": r.get("party_guess") or r.get("partyName"),
+        "constituencyName": r.get("constituency_guess") or r.get("constituencyName"),
+        "photoUrl": r.get("photo_url") or r.get("photoUrl"),
+        "bio": r.get("bio"),
+    }
+
+
+def _fold(text: Optional[str]) -> str:
+    return " ".join(tokenize(text))
+
+
+def identity_key(kind: str, item: Row) -> str:
+    """
+    What makes two approvals the same entity (from the normalized row): the
+    folded party name, or a candidate's folded name, party and constituency.
+    A later approval with the same key supersedes the earlier one.
+    """
+    if kind == "party":
+        return _fold(item["name"])
+    return "|".join(_fold(item[f]) for f in ("fullName", "partyName", "constituencyName"))
+
+
+def has_filters(kind: str, filters: Filters) -> bool:
+    if kind == "party":
+        return bool(tokenize(filters.get("search")))
+    return bool(filters.get("party") or filters.get("constituency") or tokenize(filters.get("q")))
+
+
+class ApprovedStore(Protocol):
+    """
+    Where approved parties/candidates are written and read back for /public.
+
+    Appends are upserts by `identity_key`: reads return only the latest
+    version of each entity, as normalized rows tagged with a monotonic
+    position (a new version gets a new one), which is what public cursors
+    encode. A `page` after a cursor seeks straight to the rows following it
+    and leaves the total (None) to the first page. `blocking` stores do I/O
+    and are called from
+    a threadpool by async handlers; `append` always does I/O (a commit or an
+    fsync) and is always called from the threadpool.
+    """
+
+    blocking: bool
+
+    def append(self, kind: str, rows: Sequence[Row]) -> None: ...
+
+    def generation(self, kind: str) -> Tuple[int, Optional[float]]: ...
+
+    def page(
+        self,
+        kind: str,
+        filters: Filters,
+        *,
+        offset: int,
+        limit: int,
+        after: Optional[int] = None,
+        rank: bool = False,
+    ) -> Tuple[Hits, Optional[int], bool]: ...
+
+    def export(self, kind: str, filters: Filters) -> Iterator[Row]: ...
+
+    def lookup(self, kind: str, key: str) -> Optional[Row]: ...
+
+    def compact(self, kind: str) -> int: ...
+
+
+class JsonlApprovedStore:
+    """
+    Append-only `{kind}.jsonl` logs, read through per-worker catalogs that
+    keep the latest row per identity. Superseded rows stay in the log until
+    `compact` rewrites it once at least `compact_min_superseded` of them
+    have piled up.
+    """
+
+    blocking = False
+
+    def __init__(self, directory: Path, compact_min_superseded: int = 1000) -> None:
+        self.directory = directory
+        self.compact_min_superseded = compact_min_superseded
+        directory.mkdir(parents=True, exist_ok=True)
+        self._catalogs = {
+            "party": ApprovedCatalog(
+                directory / "party.jsonl",
+                normalize_party,
+                index=NameIndex("name"),
+                identity=lambda item: identity_key("party", item),
+            ),
+            "candidate": ApprovedCatalog(
+                directory / "candidate.jsonl",
+                normalize_candidate,
+                index=CandidateIndex(),
+                identity=lambda item: identity_key("candidate", item),
+            ),
+        }
+
+    def append(self, kind: str, rows: Sequence[Row]) -> None:
+        """All rows in one write and one fsync, so a batch is durable (and seen by readers) together."""
+        if not rows:
+            return
+        path = self.directory / f"{kind}.jsonl"
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8")
+        with log_lock(path, exclusive=False), path.open("ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, kind: str) -> int:
+        """Rewrite the log without superseded rows if enough have piled up; returns rows dropped."""
+        # No refresh here: this runs off the event loop, where the catalog is read.
+        catalog = self._catalogs[kind]
+        if catalog.superseded < max(1, self.compact_min_superseded):
+            return 0
+        return catalog.compact()
+
+    def generation(self, kind: str) -> Tuple[int, Optional[float]]:
+        catalog = self._catalogs[kind]
+        catalog.refresh()
+        return catalog.generation, catalog.last_modified
+
+    def _positions(self, kind: str, filters: Filters, rank: bool) -> Optional[List[int]]:
+        """Matching positions, or None when no filter applies (every row matches)."""
+        catalog = self._catalogs[kind]
+        catalog.refresh()
+        if not has_filters(kind, filters):
+            return None
+        if kind == "party":
+            return catalog.index.search(filters["search"])
+        return catalog.index.search(
+            q=filters.get("q"),
+            party=filters.get("party"),
+            constituency=filters.get("constituency"),
+            rank=rank,
+        )
+
+    def page(
+        self,
+        kind: str,
+        filters: Filters,
+        *,
+        offset: int,
+        limit: int,
+        after: Optional[int] = None,
+        rank: bool = False,
+    ) -> Tuple[Hits, Optional[int], bool]:
+        catalog = self._catalogs[kind]
+        if after is not None and not (rank and tokenize(filters.get("q"))):
+            # resume right after the cursor row in the (ascending) match set
+            ids = catalog.seek(after, limit + 1, self._positions(kind, filters, rank=False))
+            return [(i, catalog.row(i)) for i in ids[:limit]], None, len(ids) > limit
+        ids = self._positions(kind, filters, rank)
+        if ids is None:
+            ids = catalog.positions()
+        end = offset + limit
+        return [(i, catalog.row(i)) for i in ids[offset:end]], len(ids), end < len(ids)
+
+    def export(self, kind: str, filters: Filters) -> Iterator[Row]:
+        # Not a generator: the rows are resolved here, on the caller's (event loop)
+        # thread, since the iterator is drained from a threadpool while later
+        # requests may refresh (and supersede rows in) the catalog.
+        catalog = self._catalogs[kind]
+        ids = self._positions(kind, filters, rank=False)
+        return iter([catalog.row(i) for i in (catalog.positions() if ids is None else ids)])
+
+    def lookup(self, kind: str, key: str) -> Optional[Row]:
+        """The current row with this identity key, if any."""
+        catalog = self._catalogs[kind]
+        pos = catalog.lookup(key)
+        return None if pos is None else catalog.row(pos)
+
+
+_MODELS = {"party": ApprovedParty, "candidate": ApprovedCandidate}
+_EXPORT_BATCH = 500
+
+
+def _successor(prefix: str) -> str:
+    # Smallest string greater than every string starting with `prefix`.
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SqlApprovedStore:
+    """
+    Approved rows in indexed tables, shared by every API worker and node,
+    one row per identity key (unique).
+
+    Search uses `approved_terms`, an inverted index with one row per token;
+    token-prefix lookups are range scans on its primary key. Filters have the
+    same semantics as the in-memory CandidateIndex, party search as
+    NameIndex.
+    """
+
+    blocking = True
+
+    def __init__(self, session_factory: Optional[sessionmaker] = None) -> None:
+        if session_factory is None:
+            from app.db.session import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+
+    # --- writes ---
+    def append(self, kind: str, rows: Sequence[Row]) -> None:
+        """
+        Upsert by identity key in one transaction: rows replacing existing
+        ones are deleted and re-inserted, so the new version gets a new id
+        (position), as in the JSONL store.
+        """
+        if not rows:
+            return
+        model = _MODELS[kind]
+        now = datetime.utcnow()
+        latest: Dict[str, Tuple[Row, Dict[str, Any]]] = {}
+        for raw in rows:
+            raw = {k: v for k, v in raw.items() if k != SEQ_FIELD}
+            values = self._columns(kind, raw, now)
+            # later rows in the batch supersede earlier ones (and take their place in order)
+            latest.pop(values["identity_key"], None)
+            latest[values["identity_key"]] = (raw, values)
+        for attempt in range(2):
+            try:
+                self._upsert(kind, model, list(latest.values()))
+                return
+            except IntegrityError:
+                # a concurrent writer inserted one of these keys first; replace it
+                if attempt:
+                    raise
+
+    def _upsert(self, kind: str, model: Any, rows: List[Tuple[Row, Dict[str, Any]]]) -> None:
+        keys = [values["identity_key"] for _, values in rows]
+        with self._session_factory() as db:
+            stale = db.scalars(select(model.id).where(model.identity_key.in_(keys))).all()
+            if stale:
+                db.execute(delete(ApprovedTerm).where(ApprovedTerm.kind == kind, ApprovedTerm.row_id.in_(stale)))
+                db.execute(delete(model).where(model.id.in_(stale)))
+            # multi-row INSERT ... RETURNING, ids in parameter order
+            ids = db.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                [values for _, values in rows],
+            ).all()
+            terms = [
+                {"kind": kind, "field": field, "term": term, "row_id": row_id}
+                for row_id, (raw, _) in zip(ids, rows)
+                for field, term in self._terms(kind, raw)
+            ]
+            if terms:
+                db.execute(insert(ApprovedTerm), terms)
+            db.commit()
+
+    def compact(self, kind: str) -> int:
+        return 0  # upserts replace rows in place; nothing accumulates
+
+    @staticmethod
+    def _columns(kind: str, raw: Row, now: datetime) -> Dict[str, Any]:
+        external_id = None if raw.get("id") is None else str(raw["id"])
+        if kind == "party":
+            item = normalize_party(raw)
+            return {
+                "identity_key": identity_key(kind, item),
+                "external_id": external_id,
+                "name": item["name"],
+                "name_folded": item["name"].casefold(),
+                "abbrev": item["abbrev"],
+                "logo_url": item["logoUrl"],
+                "description": item["description"],
+                "payload": raw,
+                "approved_at": now,
+            }
+        item = normalize_candidate(raw)
+        return {
+            "identity_key": identity_key(kind, item),
+            "external_id": external_id,
+            "full_name": item["fullName"],
+            "party_name": item["partyName"],
+            "party_folded": (item["partyName"] or "").casefold().strip() or None,
+            "constituency_name": item["constituencyName"],
+            "constituency_folded": (item["constituencyName"] or "").casefold().strip() or None,
+            "photo_url": item["photoUrl"],
+            "bio": item["bio"],
+            "payload": raw,
+            "approved_at": now,
+        }
+
+    @staticmethod
+    def _terms(kind: str, raw: Row) -> List[Tuple[str, str]]:
+        if kind == "party":
+            fields = {"name": normalize_party(raw)["name"]}
+        else:
+            item = normalize_candidate(raw)
+            fields = {
+                "name": item["fullName"],
+                "bio": item["bio"],
+                "party": item["partyName"],
+                "constituency": item["constituencyName"],
+            }
+        return [(field, term) for field, text in fields.items() for term in set(tokenize(text))]
+
+    # --- reads ---
+    @staticmethod
+    def _item(kind: str, m: Any) -> Row:
+        if kind == "party":
+            return {
+                "id": m.external_id,
+                "name": m.name,
+                "abbrev": m.abbrev,
+                "logoUrl": m.logo_url,
+                "description": m.description,
+            }
+        return {
+            "id": m.external_id,
+            "fullName": m.full_name,
+            "partyName": m.party_name,
+            "constituencyName": m.constituency_name,
+            "photoUrl": m.photo_url,
+            "bio": m.bio,
+        }
+
+    def generation(self, kind: str) -> Tuple[int, Optional[float]]:
+        model = _MODELS[kind]
+        # The newest row (a primary-key seek, cheap on every read): ids and approval times grow together
+        with self._session_factory() as db:
+            last = db.execute(select(model.id, model.approved_at).order_by(model.id.desc()).limit(1)).first()
+        if last is None:
+            return 0, None
+        return last.id, last.approved_at.replace(tzinfo=timezone.utc).timestamp()
+
+    @staticmethod
+    def _term_rows(kind: str, fields: Sequence[str], token: str, after: Optional[int] = None):
+        stmt = select(ApprovedTerm.row_id).where(
+            ApprovedTerm.kind == kind,
+            ApprovedTerm.field.in_(fields),
+            ApprovedTerm.term >= token,
+            ApprovedTerm.term < _successor(token),
+        )
+        # past a cursor only later rows can match: don't collect the earlier ones
+        return stmt if after is None else stmt.where(ApprovedTerm.row_id > after)
+
+    def _field_match(
+        self, db: Session, kind: str, field: str, column: Any, query: str, after: Optional[int] = None
+    ) -> list:
+        # exact value first (e.g. picked from a dropdown), else token prefixes
+        model = _MODELS[kind]
+        value = query.casefold().strip()
+        if db.scalar(select(model.id).where(column == value).limit(1)) is not None:
+            return [column == value]
+        tokens = tokenize(query)
+        if not tokens:
+            return [model.id.is_(None)]
+        return [model.id.in_(self._term_rows(kind, [field], t, after)) for t in tokens]
+
+    def _conditions(self, db: Session, kind: str, filters: Filters, after: Optional[int] = None) -> list:
+        model = _MODELS[kind]
+        conds: list = [] if after is None else [model.id > after]
+        if kind == "party":
+            for t in tokenize(filters.get("search")):
+                conds.append(model.id.in_(self._term_rows(kind, ["name"], t, after)))
+            return conds
+        if filters.get("party"):
+            conds += self._field_match(db, kind, "party", model.party_folded, filters["party"], after)
+        if filters.get("constituency"):
+            conds += self._field_match(
+                db, kind, "constituency", model.constituency_folded, filters["constituency"], after
+            )
+        for t in tokenize(filters.get("q")):
+            conds.append(model.id.in_(self._term_rows(kind, ["name", "bio"], t, after)))
+        return conds
+
+    def _score(self, kind: str, tokens: List[str]):
+        # Same weights as CandidateIndex: name 4, bio 1, doubled for whole-word hits.
+        model = _MODELS[kind]
+        score = None
+        for t in tokens:
+            for field, weight in (("name", 4), ("bio", 1)):
+                base = select(func.count()).where(
+                    ApprovedTerm.kind == kind,
+                    ApprovedTerm.field == field,
+                    ApprovedTerm.row_id == model.id,
+                )
+                prefix_hits = base.where(ApprovedTerm.term >= t, ApprovedTerm.term < _successor(t)).scalar_subquery()
+                exact_hits = base.where(ApprovedTerm.term == t).scalar_subquery()
+                part = weight * (prefix_hits + exact_hits)
+                score = part if score is None else score + part
+        return score
+
+    def page(
+        self,
+        kind: str,
+        filters: Filters,
+        *,
+        offset: int,
+        limit: int,
+        after: Optional[int] = None,
+        rank: bool = False,
+    ) -> Tuple[Hits, Optional[int], bool]:
+        model = _MODELS[kind]
+        tokens = tokenize(filters.get("q"))
+        ranked = rank and bool(tokens)
+        with self._session_factory() as db:
+            if after is not None and not ranked:
+                # keyset seek: WHERE id > :after ORDER BY id LIMIT n, no count
+                conds = self._conditions(db, kind, filters, after)
+                found = db.scalars(select(model).where(*conds).order_by(model.id).limit(limit + 1)).all()
+                hits = [(m.id, self._item(kind, m)) for m in found[:limit]]
+                return hits, None, len(found) > limit
+
+            conds = self._conditions(db, kind, filters)
+            total = db.scalar(select(func.count()).select_from(model).where(*conds)) or 0
+            stmt = select(model).where(*conds)
+            if ranked:
+                stmt = stmt.order_by(self._score(kind, tokens).desc(), model.id)
+            else:
+                stmt = stmt.order_by(model.id)
+            found = db.scalars(stmt.offset(offset).limit(limit + 1)).all()
+
+        hits = [(m.id, self._item(kind, m)) for m in found[:limit]]
+        return hits, total, len(found) > limit
+
+    def export(self, kind: str, filters: Filters) -> Iterator[Row]:
+        model = _MODELS[kind]
+        last_id = 0
+        with self._session_factory() as db:
+            conds = self._conditions(db, kind, filters)
+            while True:
+                batch = db.scalars(
+                    select(model).where(*conds, model.id > last_id).order_by(model.id).limit(_EXPORT_BATCH)
+                ).all()
+                if not batch:
+                    return
+                for m in batch:
+                    yield self._item(kind, m)
+                last_id = batch[-1].id
+                db.expunge_all()
+
+    def lookup(self, kind: str, key: str) -> Optional[Row]:
+        model = _MODELS[kind]
+        with self._session_factory() as db:
+            m = db.scalars(select(model).where(model.identity_key == key)).first()
+            return None if m is None else self._item(kind, m)
+
+
+_approved_store_singleton: Optional[ApprovedStore] = None
+
+
+def get_approved_store() -> ApprovedStore:
+    global _approved_store_singleton
+    if _approved_store_singleton:
+        return _approved_store_singleton
+
+    backend = (settings.approved_store_backend or "jsonl").lower()
+    if backend == "db":
+        _approved_store_singleton = SqlApprovedStore()
+    else:
+        _approved_store_singleton = JsonlApprovedStore(
+            Path(settings.approved_store_dir),
+            compact_min_superseded=settings.approved_compact_min_superseded,
+        )
+    return _approved_store_singleton
+
+
+async def run_compactor(interval: float) -> None:
+    """Background task: every `interval` seconds, compact approved logs that need it."""
+    while True:
+        await asyncio.sleep(interval)
+        store = get_approved_store()
+        for kind in KINDS:
+            try:
+                dropped = await run_in_threadpool(store.compact, kind)
+            except Exception:
+                log.exception("compacting approved %s rows failed", kind)
+                continue
+            if dropped:
+                log.info("compacted approved %s log: %d superseded rows dropped", kind, dropped)
+
+
+async def call_store(store: ApprovedStore, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call a store method from async code; stores that do I/O run off the event loop."""
+    if store.blocking:
+        return await run_in_threadpool(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import Column, LargeBinary, MetaData, String, Table, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file + fsync + rename so readers never see partial data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class BlobStore:
+    """
+    Content-addressed, zlib-compressed blobs under `root/ab/cdef…`.
+
+    The ref is the sha256 of the uncompressed bytes, so storing the same
+    content twice (a page crawled again unchanged) writes nothing new, and
+    a blob never changes once written.
+    """
+
+    def __init__(self, root: Path, level: int = 6) -> None:
+        self.root = root
+        self.level = level
+        root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        if len(ref) != 64 or not all(c in "0123456789abcdef" for c in ref):
+            raise ValueError(f"invalid blob ref: {ref!r}")
+        return self.root / ref[:2] / ref[2:]
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if not path.exists():
+            write_atomic(path, zlib.compress(data, self.level))
+        return ref
+
+    def get(self, ref: str) -> Optional[bytes]:
+        try:
+            return zlib.decompress(self._path(ref).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def put_json(self, obj: Any) -> str:
+        return self.put(json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+    def get_json(self, ref: str) -> Any:
+        data = self.get(ref)
+        return None if data is None else json.loads(data)
+
+
+_metadata = MetaData()
+
+blobs = Table(
+    "blobs",
+    _metadata,
+    Column("ref", String(64), primary_key=True),
+    Column("data", LargeBinary, nullable=False),
+)
+
+
+class SqlBlobStore(BlobStore):
+    """
+    The same blobs in a database table, for processes that share no disk:
+    with the Celery fleet the worker that crawled a job and the API worker
+    that serves it both reach the registry database, not each other's files.
+    """
+
+    def __init__(self, engine: Engine, level: int = 6) -> None:
+        self.engine = engine
+        self.level = level
+        _metadata.create_all(engine)
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        with self.engine.connect() as conn:
+            if conn.execute(select(blobs.c.ref).where(blobs.c.ref == ref)).first() is not None:
+                return ref
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(blobs).values(ref=ref, data=zlib.compress(data, self.level)))
+        except IntegrityError:
+            pass  # written concurrently by another worker: same content
+        return ref
+
+    def get(self, ref: str) -> Optional[bytes]:
+        with self.engine.connect() as conn:
+            data = conn.execute(select(blobs.c.data).where(blobs.c.ref == ref)).scalar()
+        return None if data is None else zlib.decompress(data)
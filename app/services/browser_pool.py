@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+try:  # optional: only needed for the RSS-based recycle threshold
+    import psutil
+except ImportError:  # pragma: no cover - depends on the environment
+    psutil = None
+
+log = logging.getLogger(__name__)
+
+# (driver handle with an async stop(), browser) — swappable for tests
+Launcher = Callable[[], Awaitable[Tuple[Any, Any]]]
+
+
+async def _launch_chromium() -> Tuple[Any, Any]:
+    from playwright.async_api import async_playwright
+
+    driver = await async_playwright().start()
+    try:
+        browser = await driver.chromium.launch(headless=True)
+    except BaseException:
+        await driver.stop()
+        raise
+    return driver, browser
+
+
+# Argument of the Playwright driver process (node cli.js run-driver) that owns the browser
+_DRIVER_ARG = "run-driver"
+
+
+def _browser_rss_mb() -> Optional[float]:
+    """
+    RSS of the Playwright driver trees under this process (the driver, the
+    browser and its renderers), in MB. Other children, like the extraction
+    pool's workers, are not counted.
+    """
+    if psutil is None:
+        return None
+    try:
+        children = psutil.Process(os.getpid()).children()
+    except psutil.Error:
+        return None
+    total = 0
+    for child in children:
+        try:
+            if _DRIVER_ARG not in child.cmdline():
+                continue
+            tree = [child, *child.children(recursive=True)]
+        except psutil.Error:
+            continue
+        for proc in tree:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+    return total / (1024 * 1024)
+
+
+class _Instance:
+    __slots__ = ("driver", "browser", "uses", "active", "retired")
+
+    def __init__(self, driver: Any, browser: Any) -> None:
+        self.driver = driver
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+
+    async def close(self) -> None:
+        try:
+            await self.browser.close()
+        except Exception:
+            log.warning("browser close failed", exc_info=True)
+        try:
+            await self.driver.stop()
+        except Exception:
+            log.warning("playwright stop failed", exc_info=True)
+
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium per worker, shared by all crawls.
+
+    `page()` hands out a page in a fresh browser context (cookies/storage are
+    not shared between jobs) and closes the context afterwards. At most
+    `max_pages` pages are open at once. The browser is launched on first use
+    and replaced after `recycle_after` pages, when its process tree exceeds
+    `max_rss_mb` (needs psutil), or when it disconnects; the retired one is
+    closed once its last page is released.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 4,
+        recycle_after: int = 200,
+        max_rss_mb: int = 0,
+        launcher: Optional[Launcher] = None,
+    ) -> None:
+        self.max_pages = max(1, max_pages)
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self._launch = launcher or _launch_chromium
+        self._current: Optional[_Instance] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.launches = 0
+        self.recycles = 0
+        self.pages_served = 0
+
+    def _primitives(self) -> Tuple[asyncio.Lock, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Bound to the loop that created them; a new loop (tests, reload) starts over
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_pages)
+            self._current = None
+        assert self._lock is not None and self._slots is not None
+        return self._lock, self._slots
+
+    async def _acquire_instance(self) -> _Instance:
+        lock, _ = self._primitives()
+        async with lock:
+            inst = self._current
+            if inst is not None and not inst.browser.is_connected():
+                self._retire(inst)
+                inst = None
+            if inst is None:
+                driver, browser = await self._launch()
+                inst = self._current = _Instance(driver, browser)
+                self.launches += 1
+            inst.uses += 1
+            inst.active += 1
+            return inst
+
+    def _retire(self, inst: _Instance) -> None:
+        if inst.retired:
+            return
+        inst.retired = True
+        if self._current is inst:
+            self._current = None
+
+    def _should_recycle(self, inst: _Instance) -> bool:
+        if self.recycle_after and inst.uses >= self.recycle_after:
+            return True
+        if self.max_rss_mb:
+            rss = _browser_rss_mb()
+            if rss is not None and rss >= self.max_rss_mb:
+                return True
+        return False
+
+    async def _release_instance(self, inst: _Instance) -> None:
+        inst.active -= 1
+        if not inst.retired and self._should_recycle(inst):
+            self._retire(inst)
+            self.recycles += 1
+        if inst.retired and inst.active == 0:
+            await inst.close()
+
+    @asynccontextmanager
+    async def page(self, **context_options: Any) -> AsyncIterator[Any]:
+        _, slots = self._primitives()
+        async with slots:
+            inst = await self._acquire_instance()
+            try:
+                context = await inst.browser.new_context(**context_options)
+                try:
+                    page = await context.new_page()
+                    self.pages_served += 1
+                    yield page
+                finally:
+                    try:
+                        await context.close()
+                    except Exception:
+                        log.warning("browser context close failed", exc_info=True)
+            finally:
+                await asyncio.shield(self._release_instance(inst))
+
+    async def close(self) -> None:
+        """Close the current browser (idempotent); called from the app lifespan."""
+        inst, self._current = self._current, None
+        if inst is not None:
+            inst.retired = True
+            await inst.close()
+
+    def stats(self) -> Dict[str, Any]:
+        inst = self._current
+        return {
+            "max_pages": self.max_pages,
+            "running": inst is not None,
+            "active_pages": inst.active if inst else 0,
+            "browser_uses": inst.uses if inst else 0,
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "pages_served": self.pages_served,
+            "browser_rss_mb": _browser_rss_mb(),
+        }
+
+
+browser_pool = BrowserPool(
+    max_pages=settings.browser_max_pages,
+    recycle_after=settings.browser_recycle_after,
+    max_rss_mb=settings.browser_max_rss_mb,
+)
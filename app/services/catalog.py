@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from app.services.blob_store import write_atomic
+
+Row = Dict[str, Any]
+
+# Position a compacted row had in the log before compaction
+SEQ_FIELD = "_seq"
+# ...written as the last key of each line of a compacted snapshot
+_SEQ_TAIL = re.compile(rb'"' + re.escape(SEQ_FIELD.encode()) + rb'": (\d+)\}\s*$')
+
+
+class CatalogIndex(Protocol):
+    def clear(self) -> None: ...
+
+    def add(self, row_id: int, item: Row) -> None: ...
+
+    def remove(self, row_id: int, item: Row) -> None: ...
+
+
+@contextmanager
+def log_lock(path: Path, exclusive: bool) -> Iterator[None]:
+    """
+    Advisory lock next to a JSONL log, across processes: appends hold it
+    shared, compaction exclusively, so a rewrite never drops an append.
+    """
+    with open(path.with_name(path.name + ".lock"), "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _parse_log(chunk: bytes, next_pos: int) -> Tuple[List[Tuple[int, Row]], int, int]:
+    """
+    (position, row) pairs of the complete lines in `chunk`, the bytes they
+    span and the next free position. A row's position is the one compaction
+    stored with it, else the next free one.
+    """
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return [], 0, next_pos
+    rows: List[Tuple[int, Row]] = []
+    for line in chunk[: end + 1].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw = json.loads(line)
+        except Exception:
+            continue
+        if not isinstance(raw, dict):
+            continue
+        seq = raw.pop(SEQ_FIELD, None)
+        pos = seq if isinstance(seq, int) and seq >= next_pos else next_pos
+        rows.append((pos, raw))
+        next_pos = pos + 1
+    return rows, end + 1, next_pos
+
+
+class ApprovedCatalog:
+    """
+    Per-worker, in-memory view of an approved JSONL log.
+
+    The file is loaded once and then watched by size/mtime; on change only the
+    newly appended tail is read and normalized. Readers get the pre-normalized
+    rows, so request handlers only have to filter and slice. An optional
+    `index` is fed every new row (keyed by its position) as it is loaded.
+
+    Positions only grow: a row's line in the log, kept through compaction.
+    With `identity`, a row supersedes the earlier row with the same key; the
+    catalog and index then hold only the latest version of each entity, and
+    `superseded` counts the dead rows still in the file.
+
+    A compacted snapshot replacing the file (new inode) is adopted without a
+    reload: its rows carry their positions, so the ones already held are
+    skipped by position and only rows past `generation` are parsed. If the
+    file shrinks, or is replaced by anything else, the catalog reloads from
+    scratch. A trailing line without a newline is treated as an append in
+    progress and picked up on the next refresh.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        normalize: Callable[[Row], Row],
+        index: Optional[CatalogIndex] = None,
+        identity: Optional[Callable[[Row], str]] = None,
+    ) -> None:
+        self.path = path
+        self._normalize = normalize
+        self._identity = identity
+        self.index = index
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._rows: Dict[int, Row] = {}
+        self._order: List[int] = []
+        self._latest: Dict[str, int] = {}
+        self._next = 0
+        self.superseded = 0
+        self._offset = 0
+        self._size = -1
+        self._mtime_ns = -1
+        self._inode: Optional[int] = None
+        if self.index is not None:
+            self.index.clear()
+
+    @property
+    def generation(self) -> int:
+        """Next position; grows with every appended row and is unchanged by compaction."""
+        return self._next
+
+    @property
+    def last_modified(self) -> Optional[float]:
+        """Mtime (epoch seconds) of the file as last loaded, if it exists."""
+        return self._mtime_ns / 1e9 if self._mtime_ns >= 0 else None
+
+    def refresh(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._offset or self._rows:
+                    self._reset()
+            return
+
+        if st.st_size == self._size and st.st_mtime_ns == self._mtime_ns and st.st_ino == self._inode:
+            return
+
+        with self._lock:
+            replaced = st.st_ino != self._inode
+            if not (replaced and self._rows and self._adopt_snapshot(st.st_size)):
+                if replaced or st.st_size < self._offset:
+                    self._reset()
+                self._read_tail(st.st_size)
+            self._inode = st.st_ino
+            self._size = st.st_size
+            self._mtime_ns = st.st_mtime_ns
+
+    def _read_tail(self, size: int) -> None:
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(max(0, size - self._offset))
+        rows, consumed, self._next = _parse_log(chunk, self._next)
+        self._offset += consumed
+        self._append(rows)
+
+    def _adopt_snapshot(self, size: int) -> bool:
+        """
+        Continue from a compacted rewrite of the log: skip its leading lines
+        holding positions below `generation` (rows already held, or superseded
+        here as they were there) and load the rest as a tail. False, with
+        nothing changed, if the file doesn't start with such a line.
+        """
+        with self.path.open("rb") as f:
+            data = f.read(size)
+        offset = held = 0
+        for line in data.splitlines(keepends=True):
+            m = _SEQ_TAIL.search(line) if line.endswith(b"\n") else None
+            if m is None or int(m.group(1)) >= self._next:
+                break
+            offset += len(line)
+            held += 1
+        if not held:
+            return False
+        rows, consumed, self._next = _parse_log(data[offset:], self._next)
+        self._offset = offset + consumed
+        self._append(rows)
+        # dead rows left in the file, not those the rewrite already dropped
+        self.superseded = held + len(rows) - len(self._rows)
+        return True
+
+    def _append(self, rows: List[Tuple[int, Row]]) -> None:
+        for pos, raw in rows:
+            item = self._normalize(raw)
+            if self._identity is not None:
+                key = self._identity(item)
+                previous = self._latest.get(key)
+                if previous is not None:
+                    self._drop(previous)
+                self._latest[key] = pos
+            if self.index is not None:
+                self.index.add(pos, item)
+            self._rows[pos] = item
+            self._order.append(pos)
+
+    def _drop(self, pos: int) -> None:
+        item = self._rows.pop(pos)
+        del self._order[bisect_left(self._order, pos)]
+        if self.index is not None:
+            self.index.remove(pos, item)
+        self.superseded += 1
+
+    def positions(self) -> List[int]:
+        """Refresh from disk if needed; positions of the current rows, ascending (don't mutate)."""
+        self.refresh()
+        return self._order
+
+    def row(self, pos: int) -> Row:
+        return self._rows[pos]
+
+    def lookup(self, key: str) -> Optional[int]:
+        """Refresh from disk if needed; position of the current row with this identity key."""
+        self.refresh()
+        return self._latest.get(key)
+
+    def items(self) -> List[Row]:
+        """Refresh from disk if needed and return all current normalized rows."""
+        return [self._rows[pos] for pos in self.positions()]
+
+    def seek(self, after: int, limit: int, positions: Optional[List[int]] = None) -> List[int]:
+        """
+        Refresh from disk if needed; up to `limit` of `positions` (ascending,
+        default every current row) after `after`. A bisect and a slice, so a
+        cursor page costs its own rows whatever its depth.
+        """
+        self.refresh()
+        ids = self._order if positions is None else positions
+        start = bisect_right(ids, after)
+        return ids[start : start + limit]
+
+    def compact(self) -> int:
+        """
+        Atomically rewrite the log as a snapshot: the latest row per identity,
+        in position order, each carrying its position. Returns the number of
+        rows dropped (0 leaves the file alone).
+        """
+        if self._identity is None:
+            return 0
+        with log_lock(self.path, exclusive=True):
+            try:
+                data = self.path.read_bytes()
+            except FileNotFoundError:
+                return 0
+            rows, _, _ = _parse_log(data, 0)
+            latest: Dict[str, Tuple[int, Row]] = {}
+            for pos, raw in rows:
+                latest[self._identity(self._normalize(raw))] = (pos, raw)
+            if len(latest) == len(rows):
+                return 0
+            # A partial trailing line can only be left by a crashed writer here; it is dropped.
+            snapshot = "".join(
+                json.dumps({**raw, SEQ_FIELD: pos}, ensure_ascii=False) + "\n" for pos, raw in sorted(latest.values())
+            )
+            write_atomic(self.path, snapshot.encode("utf-8"))
+        return len(rows) - len(latest)
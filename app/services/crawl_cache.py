@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.core.config import settings
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = frozenset(("fbclid", "gclid"))
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used as the cache key: lower-case scheme/host, no default
+    port, no fragment, no tracking parameters, query sorted, "/" for an
+    empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith(_TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class CrawlCache:
+    """
+    Answers repeat submissions of a URL from its last crawl while that is
+    younger than `ttl` seconds. Both that and the coalescing of concurrent
+    submissions (crawl flights) live in the shared registry so every worker
+    sees them; this object keeps the TTL and this worker's counters.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def fresh_after(self) -> Optional[datetime]:
+        """Oldest crawl time still served from cache (None when caching is off)."""
+        return datetime.utcnow() - timedelta(seconds=self.ttl) if self.ttl > 0 else None
+
+    def record_lookup(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "coalesced": self.coalesced,
+        }
+
+
+crawl_cache = CrawlCache(ttl=settings.crawl_cache_ttl_seconds)
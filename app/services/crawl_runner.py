@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.crawl_cache import url_key
+from app.services.crawler import crawl_and_extract
+from app.services.job_events import job_events
+from app.services.job_registry import get_job_registry
+from app.services.resolution import get_entity_resolver
+
+log = logging.getLogger(__name__)
+
+
+def orphaned_before() -> datetime:
+    """Running jobs whose last heartbeat is older than this are presumed lost."""
+    return datetime.utcnow() - timedelta(seconds=settings.crawl_orphan_after_seconds)
+
+
+def flights_stale_before() -> datetime:
+    """Leaders queued (never started) since before this are presumed lost; running ones go by heartbeat."""
+    return datetime.utcnow() - timedelta(seconds=settings.celery_visibility_timeout_seconds)
+
+
+async def _heartbeat(job_id: str) -> None:
+    registry = get_job_registry()
+    while True:
+        await asyncio.sleep(settings.crawl_heartbeat_seconds)
+        await run_in_threadpool(registry.heartbeat, job_id)
+
+
+def _publish_status(job_ids, status: str, error: Any = None) -> None:
+    for job_id in job_ids:
+        job_events.publish(job_id, "status", status=status, error=error)
+
+
+async def _land(job_id: str, key: str, **fields: Any) -> None:
+    followers = await run_in_threadpool(get_job_registry().land_flight, key, job_id, **fields)
+    _publish_status([job_id, *followers], fields["status"], fields.get("error"))
+
+
+async def finish(job_id: str, key: str, **fields: Any) -> None:
+    """Record a leader's outcome, then hand it to the jobs that followed its crawl."""
+    await run_in_threadpool(get_job_registry().update, job_id, **fields)
+    await _land(job_id, key, **fields)
+
+
+async def run_crawl(job_id: str, url: str, key: str) -> None:
+    """
+    Crawl a leader job and settle its followers. Runs in an API worker's
+    scheduler or in a Celery crawl worker; delivery is at-least-once, so a
+    job that already finished, or that another worker is still running
+    (fresh heartbeat), is skipped. Status changes and crawl stages are
+    published to the job's event viewers, and the extracted entities are
+    indexed for resolution against later jobs.
+    """
+    registry = get_job_registry()
+    if not await run_in_threadpool(registry.start_run, job_id, orphaned_before()):
+        return
+    _publish_status([job_id], "running")
+
+    def progress(stage: str, **detail: Any) -> None:
+        job_events.publish(job_id, "progress", stage=stage, **detail)
+
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        result = await crawl_and_extract(url, progress)
+        ref = await run_in_threadpool(registry.save_result, job_id, result)
+        await run_in_threadpool(registry.remember_crawl, key, url, ref)
+    except asyncio.CancelledError:
+        heartbeat.cancel()
+        await finish(job_id, key, status="error", error="Cancelled: API shutting down")
+        raise
+    except Exception as e:
+        heartbeat.cancel()
+        await finish(job_id, key, status="error", error=f"{type(e).__name__}: {e}")
+        return
+    heartbeat.cancel()
+    try:
+        await run_in_threadpool(get_entity_resolver().index_job, job_id, ref, result.get("entities") or {})
+    except Exception:
+        # matching is advisory; the crawl itself succeeded
+        log.exception("indexing entities of job %s for resolution failed", job_id)
+    # save_result already committed the leader's own row
+    await _land(job_id, key, status="success", result_ref=ref, error=None)
+
+
+async def abandon(job_id: str, error: str) -> None:
+    """Fail a leader that will never run (and its followers)."""
+    job = await run_in_threadpool(get_job_registry().get, job_id, False)
+    if job is not None:
+        await finish(job_id, url_key(job["url"]), status="error", error=error)
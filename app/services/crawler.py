@@ -1,73 +1,418 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import re
-from typing import Dict, List, Any
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Dict, List, Any, Iterable, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
 
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
+import httpx
+import lxml.html
 import trafilatura
+from lxml import etree
+from lxml.html import HtmlElement
 
+from app.core.config import settings
+from app.services.browser_pool import browser_pool
+from app.services.extraction_pool import extraction_pool
 
-async def _auto_scroll(page, steps: int = 12, delay_sec: float = 0.8) -> None:
-    for _ in range(steps):
-        await page.mouse.wheel(0, 12000)
-        await asyncio.sleep(delay_sec)
+# progress(stage, **detail) is told as a crawl moves through "fetching",
+# "scrolling", "extracting" and "done"; it must not block.
+Progress = Callable[..., None]
 
 
-def _extract_with_heuristics(html: str) -> Dict[str, Any]:
-    soup = BeautifulSoup(html, "lxml")
-    raw_text = soup.get_text(" ", strip=True)
+def _no_progress(stage: str, **detail: Any) -> None:
+    pass
 
-    headings = [h.get_text(" ", strip=True) for h in soup.select("h1,h2,h3,h4,h5,h6")]
-    items = [li.get_text(" ", strip=True) for li in soup.select("li")[:200]]
 
-    name_like = re.compile(r"\b[A-Z][a-z]+(?:\s[A-Z][a-z]+){1,3}\b")
+@dataclass(frozen=True)
+class ScrollProfile:
+    max_steps: int = 30
+    max_seconds: float = 30.0
+    stable_rounds: int = 2
+    idle_ms: int = 300
+    step_timeout_ms: int = 3000
+    step_px: int = 12000
 
-    party_candidates: List[Dict[str, Any]] = []
+
+def scroll_profile_for(url: str) -> ScrollProfile:
+    """Settings defaults, overridden by CRAWL_SCROLL_PROFILES for the host or a parent domain."""
+    profile = ScrollProfile(
+        max_steps=settings.crawl_scroll_max_steps,
+        max_seconds=settings.crawl_scroll_max_seconds,
+        stable_rounds=settings.crawl_scroll_stable_rounds,
+        idle_ms=settings.crawl_scroll_idle_ms,
+        step_timeout_ms=settings.crawl_scroll_step_timeout_ms,
+    )
+    host = (urlsplit(url).hostname or "").lower()
+    labels = host.split(".")
+    known = {f.name for f in fields(ScrollProfile)}
+    for i in range(len(labels)):
+        overrides = settings.crawl_scroll_profiles.get(".".join(labels[i:]))
+        if overrides:
+            return replace(profile, **{k: v for k, v in overrides.items() if k in known})
+    return profile
+
+
+class _NetworkTracker:
+    """Counts in-flight requests on a page so scrolling can wait for lazy loads to finish."""
+
+    def __init__(self, page) -> None:
+        self.inflight = 0
+        self.last_activity = time.monotonic()
+        page.on("request", self._started)
+        page.on("requestfinished", self._done)
+        page.on("requestfailed", self._done)
+
+    def _started(self, _request) -> None:
+        self.inflight += 1
+        self.last_activity = time.monotonic()
+
+    def _done(self, _request) -> None:
+        self.inflight = max(0, self.inflight - 1)
+        self.last_activity = time.monotonic()
+
+    async def wait_idle(self, quiet_ms: int, timeout_ms: int) -> bool:
+        """True once nothing has been in flight for `quiet_ms`; False if `timeout_ms` passes first."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        quiet = quiet_ms / 1000
+        while True:
+            now = time.monotonic()
+            if self.inflight == 0 and now - self.last_activity >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(0.05, quiet or 0.05))
+
+
+class _ResourceFilter:
+    """
+    Aborts requests the extractor has no use for (by resource type or URL
+    substring) and counts what the page fetched. The top-level document is
+    never blocked.
+    """
+
+    def __init__(self, block_types: Iterable[str], block_patterns: Iterable[str]) -> None:
+        self.block_types = frozenset(t.lower() for t in block_types)
+        self.block_patterns = tuple(p.lower() for p in block_patterns if p)
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self._pending: Set[asyncio.Future] = set()
+
+    @classmethod
+    def from_settings(cls) -> "_ResourceFilter":
+        return cls(settings.crawl_block_resource_types, settings.crawl_block_url_patterns)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type == "document":
+            return False
+        if resource_type in self.block_types:
+            return True
+        url = url.lower()
+        return any(p in url for p in self.block_patterns)
+
+    async def install(self, page) -> None:
+        await page.route("**/*", self._handle)
+        page.on("requestfinished", self._finished)
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        self.requests += 1
+        if self.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _finished(self, request) -> None:
+        task = asyncio.ensure_future(self._add_size(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _add_size(self, request) -> None:
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.bytes += max(0, sizes.get("responseBodySize", 0)) + max(0, sizes.get("responseHeadersSize", 0))
+
+    async def stats(self) -> Dict[str, Any]:
+        """Counters for the job result; call before the page is closed."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        return {
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_received": self.bytes,
+        }
+
+
+async def _auto_scroll(
+    page,
+    profile: ScrollProfile,
+    network: Optional[_NetworkTracker] = None,
+    progress: Progress = _no_progress,
+) -> Dict[str, Any]:
+    """
+    Scroll until the page stops growing: scrollHeight unchanged for
+    `stable_rounds` consecutive steps with the network idle. Bounded by
+    `max_steps` and `max_seconds`.
+    """
+    network = network or _NetworkTracker(page)
+    started = time.monotonic()
+    height = await page.evaluate("document.body.scrollHeight")
+    stable = 0
+    steps = 0
+    reason = "max_steps"
+    while steps < profile.max_steps:
+        if time.monotonic() - started >= profile.max_seconds:
+            reason = "max_seconds"
+            break
+        await page.mouse.wheel(0, profile.step_px)
+        steps += 1
+        idle = await network.wait_idle(profile.idle_ms, profile.step_timeout_ms)
+        new_height = await page.evaluate("document.body.scrollHeight")
+        progress("scrolling", step=steps, height=new_height)
+        if new_height == height and idle:
+            stable += 1
+            if stable >= profile.stable_rounds:
+                reason = "stable"
+                break
+        else:
+            stable = 0
+            height = new_height
+    return {"steps": steps, "height": height, "stopped": reason, "seconds": round(time.monotonic() - started, 3)}
+
+
+_NAME_LIKE = re.compile(r"\b[A-Z][a-z]+(?:\s[A-Z][a-z]+){1,3}\b")
+_PARTY_WORDS = ("party", "alliance", "front", "league")
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+# Elements whose text is not page content (matches BeautifulSoup's get_text)
+_NON_TEXT = frozenset(("script", "style", "template"))
+_UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+# Control characters libxml2 can't represent (trafilatura drops them the same way)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_INVALID_XML_BYTES = re.compile(b"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _parse(html: Union[str, bytes]) -> Optional[HtmlElement]:
+    try:
+        if isinstance(html, bytes):
+            return lxml.html.document_fromstring(_INVALID_XML_BYTES.sub(b"", html), parser=_UTF8_PARSER)
+        html = _INVALID_XML_CHARS.sub("", html)
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # str with an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode("utf-8", "replace"), parser=_UTF8_PARSER)
+    except etree.ParserError:
+        return None
+
+
+def _is_document(html: Union[str, bytes]) -> bool:
+    # trafilatura refuses input without an html tag/doctype near the start
+    head = html[:50].lower()
+    return (b"html" in head) if isinstance(head, bytes) else ("html" in head)
+
+
+def _strings(el, out: List[str]) -> None:
+    if el.tag in _NON_TEXT:
+        return
+    if el.text and isinstance(el.tag, str):
+        out.append(el.text)
+    for child in el:
+        _strings(child, out)
+        if child.tail:
+            out.append(child.tail)
+
+
+def _text(el) -> str:
+    """Equivalent of BeautifulSoup's `get_text(" ", strip=True)` on an lxml element."""
+    out: List[str] = []
+    _strings(el, out)
+    return " ".join(s for s in (part.strip() for part in out) if s)
+
+
+def _select(tree: HtmlElement) -> Tuple[List[str], List[str]]:
+    """Texts of every heading and of the first 200 list items."""
+    headings = [_text(h) for h in tree.iter(*_HEADINGS)]
+    items = [_text(li) for li in itertools.islice(tree.iter("li"), 200)]
+    return headings, items
+
+
+def _match(headings: List[str], items: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Party-like headings and name-like texts, first occurrence wins."""
+    parties: Dict[str, Dict[str, Any]] = {}
     for h in headings:
-        if any(k in h.lower() for k in ("party", "alliance", "front", "league")) and len(h) <= 80:
-            party_candidates.append({"name": h, "abbrev": None, "logo_url": None, "description": None})
-
-    candidate_candidates: List[Dict[str, Any]] = []
-    for text in set(headings + items):
-        if name_like.search(text) and 3 <= len(text) <= 80:
-            candidate_candidates.append({"full_name": text, "party_guess": None, "constituency_guess": None, "photo_url": None, "bio": None})
-
-    seen = set()
-    dedup_parties = []
-    for p in party_candidates:
-        key = p["name"]
-        if key and key not in seen:
-            seen.add(key)
-            dedup_parties.append(p)
-
-    seen = set()
-    dedup_candidates = []
-    for c in candidate_candidates:
-        key = c["full_name"]
-        if key and key not in seen:
-            seen.add(key)
-            dedup_candidates.append(c)
-
-    cleaned = trafilatura.extract(html) or ""
+        if h and h not in parties and len(h) <= 80 and any(k in h.lower() for k in _PARTY_WORDS):
+            parties[h] = {"name": h, "abbrev": None, "logo_url": None, "description": None}
+
+    candidates: Dict[str, Dict[str, Any]] = {}
+    for text in headings + items:
+        if text and text not in candidates and 3 <= len(text) <= 80 and _NAME_LIKE.search(text):
+            candidates[text] = {"full_name": text, "party_guess": None, "constituency_guess": None, "photo_url": None, "bio": None}
+    return parties, candidates
+
+
+def _main_text(tree: HtmlElement, html: Union[str, bytes]) -> Tuple[str, bool]:
+    """trafilatura's main content ("" if none) and whether comments were stripped from `tree` for it."""
+    if _is_document(html):
+        # trafilatura parses without comments; dropping them here merges text the same way
+        had_comments = next(tree.iter(etree.Comment, etree.ProcessingInstruction), None) is not None
+        etree.strip_tags(tree, etree.Comment, etree.ProcessingInstruction)
+        return trafilatura.extract(tree) or "", had_comments
+    return trafilatura.extract(html) or "", False
+
+
+def _extract_with_heuristics(html: Union[str, bytes], timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Parse once into an lxml tree; the heading/list passes and trafilatura's
+    main-content pass (which works on its own copy) share it. The full-page
+    text is only built when trafilatura finds no main content.
+    """
+    t0 = time.perf_counter()
+    tree = _parse(html)
+    t1 = time.perf_counter()
+    if tree is None:
+        return {"parties": [], "candidates": [], "raw_text_sample": ""}
+
+    parties, candidates = _match(*_select(tree))
+
+    t2 = time.perf_counter()
+    cleaned, had_comments = _main_text(tree, html)
+    if timings is not None:
+        timings["parse_ms"] = _ms(t1 - t0)
+        timings["heuristics_ms"] = _ms(t2 - t1)
+        timings["clean_ms"] = _ms(time.perf_counter() - t2)
+
+    if cleaned:
+        sample = cleaned[:5000]
+    else:
+        # Rare (script-only shells): the tree lost its comment boundaries above, so rebuild it
+        sample = _text(_parse(html) if had_comments else tree)[:5000]
 
     return {
-        "parties": dedup_parties[:100],
-        "candidates": dedup_candidates[:250],
-        "raw_text_sample": cleaned[:5000] if cleaned else raw_text[:5000],
+        "parties": list(parties.values())[:100],
+        "candidates": list(candidates.values())[:250],
+        "raw_text_sample": sample,
     }
 
 
-async def crawl_and_extract(url: str) -> Dict[str, Any]:
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        page = await browser.new_page()
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _extract_job(html: bytes) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Extraction-pool entry point: UTF-8 page in, entities and stage timings out."""
+    timings: Dict[str, float] = {}
+    entities = _extract_with_heuristics(html, timings)
+    return entities, timings
+
+
+async def _extract(html: str, timings: Dict[str, float], progress: Progress = _no_progress) -> Dict[str, Any]:
+    progress("extracting", html_bytes=len(html))
+    started = time.perf_counter()
+    entities, stages = await extraction_pool.run(_extract_job, html.encode("utf-8"))
+    timings.update(stages)
+    timings["extract_ms"] = _ms(time.perf_counter() - started)
+    return entities
+
+
+_USER_AGENT = "Mozilla/5.0 (compatible; ElectaIngest/1.0)"
+_http: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Pooled client for the static tier, one per event loop."""
+    global _http, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http is None or _http_loop is not loop:
+        _http_loop = loop
+        _http = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=settings.crawl_static_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.crawl_http_max_connections,
+                max_keepalive_connections=settings.crawl_http_max_connections,
+            ),
+            headers={"User-Agent": _USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+        )
+    return _http
+
+
+async def close_http_client() -> None:
+    global _http, _http_loop
+    client, _http, _http_loop = _http, None, None
+    if client is not None:
+        await client.aclose()
+
+
+async def _fetch_static(url: str) -> Optional[str]:
+    """Server-rendered HTML for `url`, or None if it isn't a complete HTML 2xx response."""
+    try:
+        async with _http_client().stream("GET", url) as resp:
+            if resp.status_code >= 300 or "html" not in resp.headers.get("content-type", "html"):
+                return None
+            body = bytearray()
+            async for chunk in resp.aiter_bytes():
+                body += chunk
+                if len(body) > settings.crawl_static_max_bytes:
+                    return None
+            return bytes(body).decode(resp.encoding or "utf-8", errors="replace")
+    except httpx.HTTPError:
+        return None
+
+
+def _enough_content(entities: Dict[str, Any]) -> bool:
+    return len(entities["parties"]) + len(entities["candidates"]) >= settings.crawl_static_min_entities
+
+
+async def _crawl_browser(url: str, timings: Dict[str, float], progress: Progress = _no_progress) -> Dict[str, Any]:
+    started = time.perf_counter()
+    progress("fetching", tier="browser")
+    async with browser_pool.page() as page:
+        resources = _ResourceFilter.from_settings()
+        await resources.install(page)
+        network = _NetworkTracker(page)
         await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
-        await _auto_scroll(page, steps=14, delay_sec=0.7)
-        await page.wait_for_timeout(1200)
+        scroll = await _auto_scroll(page, scroll_profile_for(url), network, progress)
         html = await page.content()
-        await browser.close()
+        traffic = await resources.stats()
+    timings["browser_ms"] = _ms(time.perf_counter() - started)
+
+    entities = await _extract(html, timings, progress)
+    return {"html": html, "entities": entities, "scroll": scroll, "network": traffic, "tier": "browser"}
+
 
-    entities = _extract_with_heuristics(html)
-    return {"html": html, "entities": entities}
+async def crawl_and_extract(url: str, progress: Progress = _no_progress) -> Dict[str, Any]:
+    """
+    Try a plain GET first; escalate to the headless browser only when the
+    static HTML is unavailable or too thin to extract from. The result's
+    "tier" says which path produced it and "timings" how long each stage took
+    (extraction runs in the extraction pool, off the event loop). Stages are
+    reported to `progress` as they start.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    result: Optional[Dict[str, Any]] = None
+    if settings.crawl_static_first:
+        progress("fetching", tier="static")
+        html = await _fetch_static(url)
+        timings["fetch_ms"] = _ms(time.perf_counter() - started)
+        if html is not None:
+            entities = await _extract(html, timings, progress)
+            if _enough_content(entities):
+                result = {"html": html, "entities": entities, "tier": "static"}
+    if result is None:
+        result = await _crawl_browser(url, timings, progress)
+    timings["total_ms"] = _ms(time.perf_counter() - started)
+    result["timings"] = timings
+    progress("done", tier=result["tier"], total_ms=timings["total_ms"])
+    return result
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _warm() -> None:
+    # Pay the parser/trafilatura import cost once per worker, not on the first job
+    import app.services.crawler  # noqa: F401
+
+
+class ExtractionPool:
+    """
+    CPU-bound HTML extraction off the event loop.
+
+    `workers` processes (spawned, so no event-loop or browser state is
+    inherited) run submitted functions; at most `workers * 2` calls are in
+    flight, so a burst of crawls queues here instead of piling pickled pages
+    into the executor. `workers=0` runs calls in the threadpool instead
+    (tests, single-core hosts). A crashed worker breaks the executor; it is
+    replaced and the call retried once.
+    """
+
+    def __init__(self, workers: int = 2) -> None:
+        self.workers = max(0, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.submitted = 0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm,
+            )
+        return self._executor
+
+    def _slots_for_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(max(1, self.workers * 2))
+        return self._slots
+
+    async def start(self) -> None:
+        """Spawn and warm every worker now (app startup) rather than on the first crawl."""
+        if not self.workers:
+            return
+        executor = self._ensure_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _warm) for _ in range(self.workers)))
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """`fn` must be a module-level function; args and result are pickled."""
+        if not self.workers:
+            return await run_in_threadpool(fn, *args)
+        async with self._slots_for_loop():
+            self.submitted += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._ensure_executor(), fn, *args)
+            except BrokenProcessPool:
+                log.warning("extraction worker died; restarting the pool")
+                self._discard()
+                return await loop.run_in_executor(self._ensure_executor(), fn, *args)
+
+    def _discard(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._discard()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "started": self._executor is not None, "submitted": self.submitted}
+
+
+extraction_pool = ExtractionPool(workers=settings.crawl_extract_workers)
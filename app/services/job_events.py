@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_CHANNEL = "ingest:job:"
+TERMINAL = frozenset(("success", "error"))
+
+
+class Subscription:
+    """One viewer's bounded event queue, read on the loop that opened it."""
+
+    def __init__(self, hub: "JobEventHub", job_id: str, maxsize: int) -> None:
+        self.hub = hub
+        self.job_id = job_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def push(self, event: Dict[str, Any]) -> None:
+        # A slow viewer loses the oldest progress, never the newest event
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+
+class JobEventHub:
+    """
+    Fan-out of ingest job events (status changes and crawl stages) to SSE
+    viewers. All viewers of a job share one source: without `url`, events
+    published in this process go straight to its viewers' queues; with a
+    Redis `url` (crawls on the Celery fleet, several API workers) every
+    event goes over pub/sub and each process holds a single pattern
+    subscription that feeds its local viewers.
+    """
+
+    def __init__(self, url: Optional[str] = None, queue_size: int = 64) -> None:
+        self.url = url
+        self.queue_size = queue_size
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis: Optional[redis.Redis] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._reading = False
+        self.published = 0
+
+    # --- viewers ---
+    def subscribe(self, job_id: str) -> Subscription:
+        """Start receiving `job_id`'s events now; call close() when done."""
+        sub = Subscription(self, job_id, self.queue_size)
+        with self._lock:
+            self._subs.setdefault(job_id, set()).add(sub)
+        if self.url:
+            self._ensure_reader()
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.job_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.job_id]
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subs = list(self._subs.get(event["job_id"], ()))
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for sub in subs:
+            if sub.loop is current:
+                sub.push(event)
+            elif not sub.loop.is_closed():
+                # published from another thread (e.g. an eager Celery task)
+                sub.loop.call_soon_threadsafe(sub.push, event)
+
+    # --- sources ---
+    def publish(self, job_id: str, type_: str, **fields: Any) -> None:
+        """Emit a "status" or "progress" event for `job_id`; never blocks the caller."""
+        event = {"job_id": job_id, "type": type_, **fields, "at": datetime.utcnow().isoformat()}
+        self.published += 1
+        if not self.url:
+            self._deliver(event)
+            return
+        self._bind_loop()
+        self._outbox.put_nowait(event)
+
+    async def flush(self) -> None:
+        """Wait until queued events reached Redis (before a worker loop goes idle)."""
+        if self._outbox is not None and self._loop is asyncio.get_running_loop():
+            await self._outbox.join()
+
+    # --- redis transport ---
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._redis = redis.from_url(self.url, decode_responses=True)
+            self._outbox = asyncio.Queue()
+            self._reading = False
+            self._spawn(self._drain())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _ensure_reader(self) -> None:
+        self._bind_loop()
+        if not self._reading:
+            self._reading = True
+            self._spawn(self._read())
+
+    async def _drain(self) -> None:
+        # One sender per loop keeps a job's events in order
+        outbox, client = self._outbox, self._redis
+        while True:
+            event = await outbox.get()
+            try:
+                await client.publish(_CHANNEL + event["job_id"], json.dumps(event))
+            except redis.RedisError as e:
+                log.warning("job event for %s not published: %s", event["job_id"], e)
+            finally:
+                outbox.task_done()
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(_CHANNEL + "*")
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._deliver(json.loads(message["data"]))
+            except redis.RedisError as e:
+                log.warning("job event subscription lost, reconnecting: %s", e)
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._loop = self._redis = self._outbox = None
+        self._reading = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+        return {
+            "transport": "redis" if self.url else "local",
+            "jobs_watched": len({s.job_id for s in subs}),
+            "viewers": len(subs),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subs),
+        }
+
+
+job_events = JobEventHub(url=settings.job_events_url)
@@ -0,0 +1,521 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    and_,
+    create_engine,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.services.blob_store import BlobStore, SqlBlobStore
+
+# The registry has its own metadata/engine: SQLite file locally, the shared
+# Postgres in prod (INGEST_REGISTRY_URL), independent of the app models.
+metadata = MetaData()
+
+ingest_jobs = Table(
+    "ingest_jobs",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("url", Text, nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("error", Text, nullable=True),
+    Column("result_ref", String, nullable=True),
+    Index("ix_ingest_jobs_created", "created_at", "id"),
+    Index("ix_ingest_jobs_status_created", "status", "created_at", "id"),
+)
+
+ingest_batches = Table(
+    "ingest_batches",
+    metadata,
+    Column("id", String(36), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("size", Integer, nullable=False),
+)
+
+ingest_batch_jobs = Table(
+    "ingest_batch_jobs",
+    metadata,
+    Column("batch_id", String(36), primary_key=True),
+    Column("job_id", String(36), primary_key=True),
+)
+
+# Latest successful crawl per normalized URL (key = sha256 of it), for the crawl cache
+crawl_cache = Table(
+    "crawl_cache",
+    metadata,
+    Column("url_key", String(64), primary_key=True),
+    Column("url", Text, nullable=False),
+    Column("result_ref", String, nullable=False),
+    Column("crawled_at", DateTime, nullable=False),
+)
+
+# Crawls in flight, shared by every API and crawl worker: one leader job per
+# URL key crawls, jobs submitted meanwhile follow it and get its outcome.
+crawl_flights = Table(
+    "crawl_flights",
+    metadata,
+    Column("url_key", String(64), primary_key=True),
+    Column("leader_id", String(36), nullable=False),
+    Column("started_at", DateTime, nullable=False),
+)
+
+crawl_followers = Table(
+    "crawl_followers",
+    metadata,
+    Column("leader_id", String(36), primary_key=True),
+    Column("job_id", String(36), primary_key=True),
+)
+
+
+# result_ref is "blob:<sha256>" of a small manifest (html/entities are blobs it
+# points at) or, for results saved before the blob store, "<job_id>.json".
+_BLOB_REF = "blob:"
+_BLOB_FIELDS = ("html", "entities")
+
+
+class JobRegistry:
+    """
+    Ingest jobs: status and timestamps live in indexed columns, crawl results
+    in content-addressed blobs that are only read when a job's detail is needed.
+    This is the state shared by API workers and the crawl fleet.
+
+    A result is stored as a manifest (tier, timings and other small fields,
+    plus refs to the rendered HTML and extracted entities blobs). Detail reads
+    load the manifest and entities; the HTML is fetched separately. Every
+    status change is a single-row UPDATE in its own transaction; blobs are
+    written before the row starts pointing at them.
+    """
+
+    def __init__(self, engine: Engine, results_dir: Path, blobs: Optional[BlobStore] = None) -> None:
+        self.engine = engine
+        self.results_dir = results_dir
+        self.blobs = blobs or BlobStore(results_dir.parent / "blobs")
+        results_dir.mkdir(parents=True, exist_ok=True)
+        metadata.create_all(engine)
+
+    # --- writes ---
+    def create(self, job_id: str, url: str) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        row = {
+            "id": job_id,
+            "url": url,
+            "status": "queued",
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+            "result_ref": None,
+        }
+        with self.engine.begin() as conn:
+            conn.execute(insert(ingest_jobs).values(**row))
+        return row
+
+    def create_many(self, jobs: Sequence[Dict[str, Any]], batch_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Insert jobs (id, url, status, result_ref) in one transaction, optionally as a batch."""
+        now = datetime.utcnow()
+        rows = [
+            {"status": "queued", "result_ref": None, **job, "created_at": now, "updated_at": now, "error": None}
+            for job in jobs
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(insert(ingest_jobs), rows)
+            if batch_id is not None:
+                conn.execute(insert(ingest_batches).values(id=batch_id, created_at=now, size=len(rows)))
+                conn.execute(insert(ingest_batch_jobs), [{"batch_id": batch_id, "job_id": r["id"]} for r in rows])
+        return rows
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields.setdefault("updated_at", datetime.utcnow())
+        with self.engine.begin() as conn:
+            conn.execute(update(ingest_jobs).where(ingest_jobs.c.id == job_id).values(**fields))
+
+    def save_result(self, job_id: str, result: Dict[str, Any], status: str = "success") -> str:
+        manifest = {k: v for k, v in result.items() if k not in _BLOB_FIELDS}
+        if result.get("html") is not None:
+            html = result["html"].encode("utf-8")
+            manifest["html_ref"] = self.blobs.put(html)
+            manifest["html_bytes"] = len(html)
+        if result.get("entities") is not None:
+            manifest["entities_ref"] = self.blobs.put_json(result["entities"])
+        ref = _BLOB_REF + self.blobs.put_json(manifest)
+        self.update(job_id, status=status, result_ref=ref, error=None)
+        return ref
+
+    def remember_crawl(self, url_key: str, url: str, result_ref: str) -> None:
+        values = {"url": url, "result_ref": result_ref, "crawled_at": datetime.utcnow()}
+        refresh = update(crawl_cache).where(crawl_cache.c.url_key == url_key).values(**values)
+        with self.engine.begin() as conn:
+            if conn.execute(refresh).rowcount:
+                return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(crawl_cache).values(url_key=url_key, **values))
+        except IntegrityError:
+            # another worker inserted it in between; newest wins
+            with self.engine.begin() as conn:
+                conn.execute(refresh)
+
+    # --- crawl flights (coalescing across workers) ---
+    @staticmethod
+    def _flight_lost(stale_before: datetime, orphaned_before: datetime) -> Any:
+        """
+        A flight whose leader won't settle it: the leader finished without
+        landing it, stopped heartbeating before `orphaned_before` while
+        running, or has been queued since before `stale_before`; or its job
+        row was never written by a claim older than `stale_before`.
+        """
+        f, c = crawl_flights.c, ingest_jobs.c
+        alive = or_(
+            and_(c.status == "running", c.updated_at >= orphaned_before),
+            and_(c.status == "queued", c.updated_at >= stale_before),
+        )
+        return or_(
+            exists().where(c.id == f.leader_id, ~alive),
+            and_(f.started_at < stale_before, ~exists().where(c.id == f.leader_id)),
+        )
+
+    def claim_flights(
+        self, claims: Dict[str, str], stale_before: datetime, orphaned_before: datetime
+    ) -> Dict[str, str]:
+        """
+        Try to lead the crawl of each url_key with the given job id. Returns
+        url_key -> leader job id: ours where the claim succeeded, otherwise the
+        job already crawling that URL. Flights whose leader is lost (see
+        `_flight_lost`) are taken over.
+        """
+        f = crawl_flights.c
+        now = datetime.utcnow()
+        lost = self._flight_lost(stale_before, orphaned_before)
+        with self.engine.connect() as conn:
+            current = {
+                key: (leader, bool(is_lost))
+                for key, leader, is_lost in conn.execute(
+                    select(f.url_key, f.leader_id, lost).where(f.url_key.in_(list(claims)))
+                )
+            }
+        leaders = {key: leader for key, (leader, is_lost) in current.items() if not is_lost}
+        free = [key for key in claims if key not in current]
+        if free:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        insert(crawl_flights),
+                        [{"url_key": key, "leader_id": claims[key], "started_at": now} for key in free],
+                    )
+                leaders.update((key, claims[key]) for key in free)
+            except IntegrityError:
+                pass  # raced another worker; settle these one by one below
+        for key in claims:
+            if key not in leaders:
+                leaders[key] = self._claim_flight(key, claims[key], now, lost)
+        return leaders
+
+    def _claim_flight(self, key: str, job_id: str, now: datetime, lost: Any) -> str:
+        f = crawl_flights.c
+        take_over = update(crawl_flights).where(f.url_key == key, lost).values(leader_id=job_id, started_at=now)
+        while True:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(crawl_flights).values(url_key=key, leader_id=job_id, started_at=now))
+                return job_id
+            except IntegrityError:
+                pass
+            with self.engine.begin() as conn:
+                if conn.execute(take_over).rowcount:
+                    return job_id
+                leader = conn.execute(select(f.leader_id).where(f.url_key == key)).scalar()
+            if leader is not None:
+                return leader
+            # landed in between; try to claim it again
+
+    def follow(self, pairs: Sequence[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Attach (leader_id, job_id) followers. Leaders that already finished
+        don't settle anyone any more, so their outcome is copied here; returns
+        job_id -> the fields applied to it.
+        """
+        if not pairs:
+            return {}
+        with self.engine.begin() as conn:
+            conn.execute(insert(crawl_followers), [{"leader_id": leader, "job_id": job} for leader, job in pairs])
+        # Leaders commit their own status before settling followers, so a
+        # follower missed by the settle sees the final status here.
+        c = ingest_jobs.c
+        with self.engine.connect() as conn:
+            done = {
+                row.id: {"status": row.status, "result_ref": row.result_ref, "error": row.error}
+                for row in conn.execute(
+                    select(c.id, c.status, c.result_ref, c.error).where(
+                        c.id.in_(list({leader for leader, _ in pairs})), c.status.in_(("success", "error"))
+                    )
+                )
+            }
+        applied = {job: done[leader] for leader, job in pairs if leader in done}
+        for job_id, fields in applied.items():
+            self.update(job_id, **fields)
+        if applied:
+            with self.engine.begin() as conn:
+                conn.execute(delete(crawl_followers).where(crawl_followers.c.job_id.in_(list(applied))))
+        return applied
+
+    def land_flight(self, url_key: str, leader_id: str, **fields: Any) -> List[str]:
+        """End `leader_id`'s crawl of `url_key` and give its followers `fields`; returns their ids."""
+        fields.setdefault("updated_at", datetime.utcnow())
+        followers = select(crawl_followers.c.job_id).where(crawl_followers.c.leader_id == leader_id)
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(crawl_flights).where(crawl_flights.c.url_key == url_key, crawl_flights.c.leader_id == leader_id)
+            )
+            settled = list(conn.execute(followers).scalars())
+            if settled:
+                conn.execute(update(ingest_jobs).where(ingest_jobs.c.id.in_(settled)).values(**fields))
+                conn.execute(
+                    delete(crawl_followers).where(
+                        crawl_followers.c.leader_id == leader_id, crawl_followers.c.job_id.in_(settled)
+                    )
+                )
+        return settled
+
+    # --- run ownership ---
+    def start_run(self, job_id: str, stale_before: datetime) -> bool:
+        """
+        Mark a job running; False if it already finished or another worker is
+        running it (heartbeat newer than `stale_before`), so redelivered or
+        duplicate crawl tasks are no-ops.
+        """
+        c = ingest_jobs.c
+        stmt = (
+            update(ingest_jobs)
+            .where(c.id == job_id, or_(c.status == "queued", and_(c.status == "running", c.updated_at < stale_before)))
+            .values(status="running", updated_at=datetime.utcnow())
+        )
+        with self.engine.begin() as conn:
+            return bool(conn.execute(stmt).rowcount)
+
+    def heartbeat(self, job_id: str) -> None:
+        c = ingest_jobs.c
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(ingest_jobs).where(c.id == job_id, c.status == "running").values(updated_at=datetime.utcnow())
+            )
+
+    def claim_orphans(self, stale_before: datetime, limit: int = 1000) -> List[Tuple[str, str]]:
+        """
+        Jobs left "running" by a worker that stopped heartbeating before
+        `stale_before`, put back to "queued". Each orphan is claimed by one
+        caller only; returns their (id, url) for re-dispatch.
+        """
+        c = ingest_jobs.c
+        stale = and_(c.status == "running", c.updated_at < stale_before)
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(c.id, c.url).where(stale).order_by(c.updated_at).limit(limit)).all()
+        claimed = []
+        for job_id, url in rows:
+            requeue = update(ingest_jobs).where(c.id == job_id, stale).values(status="queued", updated_at=datetime.utcnow())
+            with self.engine.begin() as conn:
+                if conn.execute(requeue).rowcount:
+                    claimed.append((job_id, url))
+        return claimed
+
+    # --- reads ---
+    def flight_stats(self) -> Dict[str, int]:
+        with self.engine.connect() as conn:
+            return {
+                "inflight": conn.execute(select(func.count()).select_from(crawl_flights)).scalar_one(),
+                "waiting": conn.execute(select(func.count()).select_from(crawl_followers)).scalar_one(),
+            }
+
+    def cached_crawls(self, url_keys: Sequence[str], fresh_after: datetime) -> Dict[str, str]:
+        """url_key -> result ref for those URLs whose last crawl finished after `fresh_after`."""
+        stmt = select(crawl_cache.c.url_key, crawl_cache.c.result_ref).where(
+            crawl_cache.c.url_key.in_(list(url_keys)), crawl_cache.c.crawled_at >= fresh_after
+        )
+        with self.engine.connect() as conn:
+            return {key: ref for key, ref in conn.execute(stmt)}
+
+    def batch_progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Job counts per status for a batch (one GROUP BY), or None if unknown."""
+        with self.engine.connect() as conn:
+            batch = conn.execute(select(ingest_batches).where(ingest_batches.c.id == batch_id)).mappings().first()
+            if batch is None:
+                return None
+            counts = dict(
+                conn.execute(
+                    select(ingest_jobs.c.status, func.count())
+                    .select_from(ingest_batch_jobs.join(ingest_jobs, ingest_jobs.c.id == ingest_batch_jobs.c.job_id))
+                    .where(ingest_batch_jobs.c.batch_id == batch_id)
+                    .group_by(ingest_jobs.c.status)
+                ).all()
+            )
+        finished = counts.get("success", 0) + counts.get("error", 0)
+        return {
+            "batch_id": batch_id,
+            "created_at": batch["created_at"],
+            "total": batch["size"],
+            "counts": counts,
+            "done": finished >= batch["size"],
+        }
+
+    def get(self, job_id: str, with_result: bool = True, with_html: bool = False) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(select(ingest_jobs).where(ingest_jobs.c.id == job_id)).mappings().first()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = self.load_result(job["result_ref"], with_html) if with_result else None
+        return job
+
+    def load_result(self, ref: Optional[str], with_html: bool = False) -> Optional[Dict[str, Any]]:
+        """Manifest fields plus entities; the rendered HTML only if `with_html`."""
+        if not ref:
+            return None
+        if not ref.startswith(_BLOB_REF):
+            try:
+                result = json.loads((self.results_dir / ref).read_bytes())
+            except FileNotFoundError:
+                return None
+            if not with_html:
+                result.pop("html", None)
+            return result
+
+        manifest = self.blobs.get_json(ref[len(_BLOB_REF):])
+        if manifest is None:
+            return None
+        result = dict(manifest)
+        if "entities_ref" in manifest:
+            result["entities"] = self.blobs.get_json(manifest["entities_ref"])
+        if with_html and "html_ref" in manifest:
+            html = self.blobs.get(manifest["html_ref"])
+            result["html"] = html.decode("utf-8") if html is not None else None
+        return result
+
+    def load_html(self, ref: Optional[str]) -> Optional[str]:
+        """Just the rendered HTML of a result (manifest + one blob read)."""
+        if not ref or not ref.startswith(_BLOB_REF):
+            return (self.load_result(ref, with_html=True) or {}).get("html")
+        manifest = self.blobs.get_json(ref[len(_BLOB_REF):]) or {}
+        html = self.blobs.get(manifest["html_ref"]) if "html_ref" in manifest else None
+        return html.decode("utf-8") if html is not None else None
+
+    def list(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        before: Optional[Tuple[datetime, str]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Newest first; `before` is the (created_at, id) of the last row seen."""
+        c = ingest_jobs.c
+        stmt = select(c.id, c.url, c.status, c.created_at, c.updated_at)
+        if statuses:
+            stmt = stmt.where(c.status.in_(list(statuses)))
+        if before is not None:
+            created_at, job_id = before
+            stmt = stmt.where(or_(c.created_at < created_at, and_(c.created_at == created_at, c.id < job_id)))
+        stmt = stmt.order_by(c.created_at.desc(), c.id.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return [dict(r) for r in conn.execute(stmt).mappings()]
+
+    def migrate_result_files(self) -> int:
+        """Move results saved as `<job_id>.json` files into the blob store."""
+        c = ingest_jobs.c
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(c.id, c.status, c.updated_at, c.result_ref).where(
+                    c.result_ref.is_not(None), c.result_ref.not_like(f"{_BLOB_REF}%")
+                )
+            ).all()
+        n = 0
+        for job_id, status, updated_at, ref in rows:
+            path = self.results_dir / ref
+            try:
+                result = json.loads(path.read_bytes())
+            except (FileNotFoundError, ValueError):
+                continue
+            self.save_result(job_id, result, status=status)
+            self.update(job_id, updated_at=updated_at)
+            path.unlink(missing_ok=True)
+            n += 1
+        return n
+
+    def import_legacy(self, directory: Path) -> int:
+        """Import pre-registry `{job_id}.json` documents (run once, when empty)."""
+        with self.engine.connect() as conn:
+            if conn.execute(select(ingest_jobs.c.id).limit(1)).first() is not None:
+                return 0
+        n = 0
+        for p in directory.glob("*.json"):
+            try:
+                job = json.loads(p.read_text(encoding="utf-8"))
+                created = datetime.fromisoformat(job["created_at"])
+                updated = datetime.fromisoformat(job.get("updated_at") or job["created_at"])
+            except Exception:
+                continue
+            with self.engine.begin() as conn:
+                conn.execute(
+                    insert(ingest_jobs).values(
+                        id=job["id"],
+                        url=job["url"],
+                        status=job.get("status") or "queued",
+                        created_at=created,
+                        updated_at=updated,
+                        error=job.get("error"),
+                    )
+                )
+            if job.get("result") is not None:
+                self.save_result(job["id"], job["result"], status=job.get("status") or "success")
+                self.update(job["id"], updated_at=updated)
+            n += 1
+        return n
+
+
+def _make_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        db_path = url.split(":///", 1)[-1]
+        if db_path and db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        return create_engine(url, future=True, connect_args={"check_same_thread": False})
+    return create_engine(url, future=True, pool_pre_ping=True)
+
+
+_job_registry_singleton: Optional[JobRegistry] = None
+
+
+def get_job_registry() -> JobRegistry:
+    global _job_registry_singleton
+    if _job_registry_singleton:
+        return _job_registry_singleton
+
+    store_dir = Path(settings.ingest_store_dir)
+    engine = _make_engine(settings.ingest_registry_url)
+    if settings.ingest_blob_backend == "db":
+        blobs: BlobStore = SqlBlobStore(engine)
+    else:
+        blobs = BlobStore(store_dir / "blobs")
+    registry = JobRegistry(engine, store_dir / "results", blobs)
+    registry.import_legacy(store_dir)
+    registry.migrate_result_files()
+    _job_registry_singleton = registry
+    return registry
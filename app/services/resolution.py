@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import logging
+import random
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.approved_store import KINDS, ApprovedStore, call_store, identity_key, normalize_candidate, normalize_party
+from app.services.job_registry import get_job_registry
+from app.services.search import tokenize
+
+log = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+# Lives in the registry database (shared by API workers and the crawl fleet),
+# created on first use like the registry's own tables.
+metadata = MetaData()
+
+resolution_entities = Table(
+    "resolution_entities",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("kind", String(16), nullable=False),
+    # "approved": ref is the identity key and position the approved row's id;
+    # "extracted": ref is "<job_id>:<index>" and position the index.
+    Column("source", String(16), nullable=False),
+    Column("ref", Text, nullable=False),
+    Column("job_id", String(36), nullable=True),
+    Column("result_ref", String, nullable=True),
+    Column("position", Integer, nullable=False),
+    Column("name", Text, nullable=False),
+    Column("folded", Text, nullable=False),
+    Column("constituency", Text, nullable=True),
+    Index("ux_resolution_entities_ref", "kind", "source", "ref", unique=True),
+)
+
+# LSH buckets: one row per (entity, band); lookups are primary-key range scans.
+resolution_bands = Table(
+    "resolution_bands",
+    metadata,
+    Column("kind", String(16), primary_key=True),
+    Column("band", BigInteger, primary_key=True),
+    Column("entity_id", Integer, primary_key=True),
+)
+
+# How far the approved store has been indexed, per kind
+resolution_sync = Table(
+    "resolution_sync",
+    metadata,
+    Column("kind", String(16), primary_key=True),
+    Column("approved_after", Integer, nullable=False),
+)
+
+# 12 bands of 2 rows: names with 3-gram Jaccard 0.5 (one typo in a short
+# name) share a band ~97% of the time, at 0.2 ~39%; verification drops the rest.
+_BANDS = 12
+_ROWS = 2
+_PRIME = (1 << 61) - 1
+# Fixed seed: band keys are persisted, every process must compute the same ones
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_BANDS * _ROWS)]
+
+# Most band-sharing entities verified per probe, so a very common name stays cheap
+_MAX_CANDIDATES = 50
+_MAX_BUCKET = 500
+_LOOKUP_CHUNK = 500
+_SYNC_BATCH = 1000
+
+_ENTITY_LISTS = {"party": "parties", "candidate": "candidates"}
+
+
+def fold(text: Optional[str]) -> str:
+    return " ".join(tokenize(text))
+
+
+def shingles(folded: str) -> Set[str]:
+    """Character 3-grams of a folded name, word boundaries included."""
+    text = f" {folded} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _hash64(data: str) -> int:
+    return int.from_bytes(hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def band_keys(grams: Iterable[str]) -> List[int]:
+    """MinHash signature of `grams`, folded into one signed 64-bit key per LSH band."""
+    hashes = [_hash64(g) for g in grams]
+    signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+    keys = []
+    for band in range(_BANDS):
+        rows = signature[band * _ROWS : (band + 1) * _ROWS]
+        digest = hashlib.blake2b(repr((band, rows)).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class _Probe:
+    __slots__ = ("name", "folded", "constituency", "grams", "bands")
+
+    def __init__(self, kind: str, item: Row) -> None:
+        """`item` is a normalized row (as the approved store returns them)."""
+        self.name = item["name"] if kind == "party" else item["fullName"]
+        self.folded = fold(self.name)
+        self.constituency = (fold(item.get("constituencyName")) or None) if kind == "candidate" else None
+        self.grams = shingles(self.folded)
+        self.bands = band_keys(self.grams) if self.folded else []
+
+
+def _normalize(kind: str, raw: Row) -> Row:
+    return normalize_party(raw) if kind == "party" else normalize_candidate(raw)
+
+
+class EntityResolver:
+    """
+    Links extracted parties/candidates to near-duplicates: approved entities
+    and entities extracted by other jobs.
+
+    Blocking is MinHash/LSH over character 3-grams of the folded name: each
+    entity is stored once with one bucket key per band, and a lookup only
+    verifies (exact 3-gram Jaccard) the entities sharing a bucket, so cost
+    follows the number of near matches rather than the corpus size. Two
+    candidates whose constituencies are both known and differ never match,
+    as in the approved store's identity key.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        metadata.create_all(engine)
+
+    # --- indexing ---
+    @staticmethod
+    def _insert(conn: Connection, kind: str, rows: List[Tuple[Row, _Probe]]) -> None:
+        rows = [(values, probe) for values, probe in rows if probe.bands]
+        if not rows:
+            return
+        ids = conn.execute(
+            insert(resolution_entities).returning(resolution_entities.c.id, sort_by_parameter_order=True),
+            [values for values, _ in rows],
+        ).scalars().all()
+        conn.execute(
+            insert(resolution_bands),
+            [
+                {"kind": kind, "band": band, "entity_id": entity_id}
+                for entity_id, (_, probe) in zip(ids, rows)
+                for band in set(probe.bands)
+            ],
+        )
+
+    def index_job(self, job_id: str, result_ref: Optional[str], entities: Row) -> int:
+        """Index a crawl's extracted entities (once; a redelivered crawl is a no-op)."""
+        rows: Dict[str, List[Tuple[Row, _Probe]]] = {}
+        for kind in KINDS:
+            rows[kind] = []
+            for index, raw in enumerate(entities.get(_ENTITY_LISTS[kind]) or []):
+                probe = _Probe(kind, _normalize(kind, raw))
+                values = {
+                    "kind": kind,
+                    "source": "extracted",
+                    "ref": f"{job_id}:{index}",
+                    "job_id": job_id,
+                    "result_ref": result_ref,
+                    "position": index,
+                    "name": probe.name,
+                    "folded": probe.folded,
+                    "constituency": probe.constituency,
+                }
+                rows[kind].append((values, probe))
+        try:
+            with self.engine.begin() as conn:
+                for kind, kind_rows in rows.items():
+                    self._insert(conn, kind, kind_rows)
+        except IntegrityError:
+            return 0
+        return sum(len(r) for r in rows.values())
+
+    def approved_after(self, kind: str) -> int:
+        with self.engine.connect() as conn:
+            after = conn.scalar(select(resolution_sync.c.approved_after).where(resolution_sync.c.kind == kind))
+        return -1 if after is None else after
+
+    def add_approved(self, kind: str, hits: Sequence[Tuple[int, Row]]) -> bool:
+        """
+        Index approved rows (position, normalized row) past the sync mark and
+        advance it. A re-approved entity keeps its entry, moved to its new
+        position. False if another worker synced the same rows first.
+        """
+        e = resolution_entities.c
+        latest: Dict[str, Tuple[int, Row]] = {identity_key(kind, item): (pos, item) for pos, item in hits}
+        try:
+            with self.engine.begin() as conn:
+                existing = dict(
+                    conn.execute(
+                        select(e.ref, e.id).where(e.kind == kind, e.source == "approved", e.ref.in_(list(latest)))
+                    ).all()
+                )
+                new: List[Tuple[Row, _Probe]] = []
+                for key, (pos, item) in latest.items():
+                    probe = _Probe(kind, item)
+                    values = {"position": pos, "name": probe.name, "constituency": probe.constituency}
+                    if key in existing:
+                        # same identity, so the same folded name and buckets
+                        conn.execute(update(resolution_entities).where(e.id == existing[key]).values(**values))
+                    else:
+                        new.append(({"kind": kind, "source": "approved", "ref": key, "folded": probe.folded, **values}, probe))
+                self._insert(conn, kind, new)
+                mark = hits[-1][0]
+                if conn.execute(
+                    update(resolution_sync).where(resolution_sync.c.kind == kind).values(approved_after=mark)
+                ).rowcount == 0:
+                    conn.execute(insert(resolution_sync).values(kind=kind, approved_after=mark))
+        except IntegrityError:
+            return False
+        return True
+
+    # --- lookups ---
+    def _candidates(self, conn: Connection, kind: str, probes: List[_Probe]) -> List[List[int]]:
+        b = resolution_bands.c
+        wanted = sorted({band for p in probes for band in p.bands})
+        # Skip buckets as crowded as a common name part (a probe still meets
+        # its near-duplicates in its rarer bands); sizes come off the index.
+        bands = []
+        for i in range(0, len(wanted), _LOOKUP_CHUNK):
+            stmt = (
+                select(b.band)
+                .where(b.kind == kind, b.band.in_(wanted[i : i + _LOOKUP_CHUNK]))
+                .group_by(b.band)
+                .having(func.count() <= _MAX_BUCKET)
+            )
+            bands += conn.execute(stmt).scalars().all()
+        buckets: Dict[int, List[int]] = {}
+        for i in range(0, len(bands), _LOOKUP_CHUNK):
+            stmt = select(b.band, b.entity_id).where(b.kind == kind, b.band.in_(bands[i : i + _LOOKUP_CHUNK]))
+            for band, entity_id in conn.execute(stmt):
+                buckets.setdefault(band, []).append(entity_id)
+        out = []
+        for p in probes:
+            shared = Counter(entity_id for band in p.bands for entity_id in buckets.get(band, ()))
+            out.append([entity_id for entity_id, _ in shared.most_common(_MAX_CANDIDATES)])
+        return out
+
+    def _load(self, conn: Connection, ids: Set[int]) -> Dict[int, Row]:
+        e = resolution_entities.c
+        found: Dict[int, Row] = {}
+        ordered = sorted(ids)
+        for i in range(0, len(ordered), _LOOKUP_CHUNK):
+            stmt = select(resolution_entities).where(e.id.in_(ordered[i : i + _LOOKUP_CHUNK]))
+            for row in conn.execute(stmt).mappings():
+                found[row["id"]] = dict(row)
+        return found
+
+    @staticmethod
+    def _link(entity: Row, score: float) -> Row:
+        if entity["source"] == "approved":
+            # the identity key, and where the public API serves the approved row by it
+            path = f"/api/v1/public/{_ENTITY_LISTS[entity['kind']]}/by-key"
+            link = {"source": "approved", "key": entity["ref"], "href": f"{path}?{urlencode({'key': entity['ref']})}"}
+        else:
+            link = {"source": "extracted", "job_id": entity["job_id"], "index": entity["position"]}
+        return {**link, "name": entity["name"], "similarity": round(score, 3)}
+
+    def annotate(self, job_id: str, result_ref: Optional[str], entities: Row) -> Row:
+        """
+        Copy of a job's entities where every party and candidate carries
+        `matches`: likely duplicates, approved ones first, then by similarity.
+        Other jobs that reuse this job's crawl (same result) are not matches.
+        """
+        threshold = settings.entity_resolution_min_similarity
+        limit = settings.entity_resolution_max_matches
+        out = dict(entities)
+        with self.engine.connect() as conn:
+            for kind in KINDS:
+                items = entities.get(_ENTITY_LISTS[kind]) or []
+                probes = [_Probe(kind, _normalize(kind, raw)) for raw in items]
+                candidates = self._candidates(conn, kind, probes)
+                loaded = self._load(conn, {i for ids in candidates for i in ids})
+                annotated = []
+                for raw, probe, ids in zip(items, probes, candidates):
+                    scored = []
+                    for entity_id in ids:
+                        entity = loaded.get(entity_id)
+                        if entity is None or entity["source"] == "extracted" and (
+                            entity["job_id"] == job_id or (result_ref and entity["result_ref"] == result_ref)
+                        ):
+                            continue
+                        if probe.constituency and entity["constituency"] and probe.constituency != entity["constituency"]:
+                            continue
+                        score = jaccard(probe.grams, shingles(entity["folded"]))
+                        if score >= threshold:
+                            scored.append((entity["source"] != "approved", -score, entity_id, entity))
+                    scored.sort(key=lambda s: s[:3])
+                    annotated.append({**raw, "matches": [self._link(s[3], -s[1]) for s in scored[:limit]]})
+                out[_ENTITY_LISTS[kind]] = annotated
+        return out
+
+
+async def sync_approved(resolver: EntityResolver, store: ApprovedStore, max_batches: Optional[int] = None) -> int:
+    """
+    Index approved rows added since the last sync (the whole store the first
+    time), at most `max_batches` pages of them per kind.
+    """
+    n = 0
+    for kind in KINDS:
+        after = await run_in_threadpool(resolver.approved_after, kind)
+        for _ in itertools.count() if max_batches is None else range(max_batches):
+            hits, _, more = await call_store(store, store.page, kind, {}, offset=0, limit=_SYNC_BATCH, after=after)
+            if not hits or not await run_in_threadpool(resolver.add_approved, kind, hits):
+                break
+            n += len(hits)
+            after = hits[-1][0]
+            if not more:
+                break
+    return n
+
+
+async def warm_up(store: ApprovedStore) -> None:
+    """Background task at startup: index the approved store, so job reads only catch up on new approvals."""
+    try:
+        n = await sync_approved(get_entity_resolver(), store)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        log.exception("indexing approved entities for resolution failed")
+        return
+    if n:
+        log.info("indexed %d approved entities for resolution", n)
+
+
+_resolver_singleton: Optional[EntityResolver] = None
+
+
+def get_entity_resolver() -> EntityResolver:
+    global _resolver_singleton
+    engine = get_job_registry().engine
+    if _resolver_singleton is None or _resolver_singleton.engine is not engine:
+        _resolver_singleton = EntityResolver(engine)
+    return _resolver_singleton
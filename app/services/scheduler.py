@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+JobRunner = Callable[[], Awaitable[None]]
+# Idle per-host state kept for politeness delays before it is pruned
+_MAX_IDLE_HOSTS = 1024
+
+
+class QueueFull(Exception):
+    """The crawl queue is at its depth limit; the caller should shed load."""
+
+
+@dataclass(order=True)
+class _Entry:
+    sort_key: tuple
+    job_id: str = field(compare=False)
+    run: JobRunner = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    host: Optional[str] = field(default=None, compare=False)
+
+
+class _Host:
+    __slots__ = ("active", "next_start", "deferred", "timer")
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.next_start = 0.0
+        self.deferred: Deque[_Entry] = deque()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+def _percentile(samples: Deque[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+class CrawlScheduler:
+    """
+    Bounded in-process crawl executor.
+
+    Jobs wait in a priority queue (higher `priority` first, FIFO within a
+    priority) and at most `concurrency` run at once, each on a long-lived
+    worker task held by the scheduler. `submit` raises QueueFull once
+    `max_queue` jobs are waiting. Workers start lazily on the first submit
+    and are cancelled by `shutdown()`.
+
+    Politeness: jobs tagged with a `host` run at most `per_host` at a time
+    per host, and starts on one host are at least `host_delay` seconds
+    apart. A job whose host is busy is parked on that host (not holding a
+    worker) and re-queued when the host frees up, so other hosts keep going.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        max_queue: int = 100,
+        samples: int = 500,
+        per_host: int = 0,
+        host_delay: float = 0.0,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self._hosts: Dict[str, _Host] = {}
+        self._seq = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._running: Dict[str, float] = {}
+        self._wait_times: Deque[float] = deque(maxlen=samples)
+        self._run_times: Deque[float] = deque(maxlen=samples)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_started(self) -> asyncio.PriorityQueue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._hosts = {}
+            self._workers = {loop.create_task(self._worker(), name=f"crawl-worker-{i}") for i in range(self.concurrency)}
+        return self._queue
+
+    @property
+    def queued(self) -> int:
+        if self._queue is None:
+            return 0
+        return self._queue.qsize() + sum(len(h.deferred) for h in self._hosts.values())
+
+    def submit(self, job_id: str, run: JobRunner, priority: int = 0, host: Optional[str] = None) -> None:
+        queue = self._ensure_started()
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"{self.queued} crawl jobs already queued")
+        queue.put_nowait(_Entry((-priority, next(self._seq)), job_id, run, time.monotonic(), host))
+
+    # --- per-host politeness ---
+    def _host_may_start(self, host: str, now: float) -> bool:
+        state = self._hosts.setdefault(host, _Host())
+        return (not self.per_host or state.active < self.per_host) and now >= state.next_start
+
+    def _pump(self, host: str) -> None:
+        """Move the host's next parked job back to the queue once it may start."""
+        state = self._hosts.get(host)
+        if state is None or self._queue is None:
+            return
+        state.timer = None
+        if not state.deferred or (self.per_host and state.active >= self.per_host):
+            return
+        wait = state.next_start - time.monotonic()
+        if wait > 0:
+            state.timer = asyncio.get_running_loop().call_later(wait, self._pump, host)
+            return
+        self._queue.put_nowait(state.deferred.popleft())
+
+    def _park(self, entry: _Entry) -> None:
+        assert entry.host is not None
+        state = self._hosts[entry.host]
+        state.deferred.append(entry)
+        if state.timer is None:
+            self._pump(entry.host)
+
+    def _host_started(self, host: str, now: float) -> None:
+        state = self._hosts[host]
+        state.active += 1
+        state.next_start = now + self.host_delay
+        if state.deferred and state.timer is None:
+            self._pump(host)
+
+    def _host_finished(self, host: str) -> None:
+        state = self._hosts.get(host)
+        if state is None:
+            return
+        state.active -= 1
+        if state.deferred and state.timer is None:
+            self._pump(host)
+        if len(self._hosts) > _MAX_IDLE_HOSTS:
+            now = time.monotonic()
+            for name in [n for n, h in self._hosts.items() if not h.active and not h.deferred and now >= h.next_start]:
+                del self._hosts[name]
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            entry: _Entry = await queue.get()
+            started = time.monotonic()
+            if entry.host is not None:
+                if not self._host_may_start(entry.host, started):
+                    self._park(entry)
+                    queue.task_done()
+                    continue
+                self._host_started(entry.host, started)
+            self._wait_times.append(started - entry.enqueued_at)
+            self._running[entry.job_id] = started
+            try:
+                await entry.run()
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+            finally:
+                self._running.pop(entry.job_id, None)
+                self._run_times.append(time.monotonic() - started)
+                if entry.host is not None:
+                    self._host_finished(entry.host)
+                queue.task_done()
+
+    async def shutdown(self) -> List[str]:
+        """Cancel workers (and the jobs they run); return ids of jobs never started."""
+        dropped: List[str] = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                dropped.append(self._queue.get_nowait().job_id)
+        for state in self._hosts.values():
+            if state.timer is not None:
+                state.timer.cancel()
+            dropped.extend(entry.job_id for entry in state.deferred)
+        self._hosts = {}
+        workers, self._workers = self._workers, set()
+        for task in workers:
+            task.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+        self._loop = None
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "running": len(self._running),
+            "oldest_running_seconds": round(now - min(self._running.values()), 3) if self._running else None,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "hosts_active": sum(1 for h in self._hosts.values() if h.active),
+            "hosts_waiting": sum(1 for h in self._hosts.values() if h.deferred),
+            "wait_seconds": {"p50": _percentile(self._wait_times, 0.5), "p95": _percentile(self._wait_times, 0.95)},
+            "run_seconds": {"p50": _percentile(self._run_times, 0.5), "p95": _percentile(self._run_times, 0.95)},
+        }
+
+
+crawl_scheduler = CrawlScheduler(
+    concurrency=settings.crawl_concurrency,
+    max_queue=settings.crawl_queue_max,
+    per_host=settings.crawl_per_host_concurrency,
+    host_delay=settings.crawl_per_host_delay_seconds,
+)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Case-folded word tokens of `text`."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class _Postings:
+    """Term -> row ids, with a sorted vocabulary for prefix lookups."""
+
+    def __init__(self) -> None:
+        self.terms: Dict[str, Set[int]] = defaultdict(set)
+        self._vocab: List[str] = []
+        self._unsorted = 0
+
+    def add(self, term: str, row_id: int) -> None:
+        if term not in self.terms:
+            # Sorted lazily: timsort merges the new run in ~linear time.
+            self._vocab.append(term)
+            self._unsorted += 1
+        self.terms[term].add(row_id)
+
+    def discard(self, term: str, row_id: int) -> None:
+        # The term stays in the vocabulary; an empty posting set matches nothing.
+        postings = self.terms.get(term)
+        if postings is not None:
+            postings.discard(row_id)
+
+    @property
+    def vocab(self) -> List[str]:
+        if self._unsorted:
+            self._vocab.sort()
+            self._unsorted = 0
+        return self._vocab
+
+    def prefixed(self, prefix: str) -> Iterable[str]:
+        vocab = self.vocab
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            yield vocab[i]
+            i += 1
+
+    def prefix(self, prefix: str) -> Set[int]:
+        out: Set[int] = set()
+        for term in self.prefixed(prefix):
+            out |= self.terms[term]
+        return out
+
+
+class _Field:
+    """A filterable field: exact map on the whole value plus token postings."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Set[int]] = defaultdict(set)
+        self.tokens = _Postings()
+
+    def add(self, value: Optional[str], row_id: int) -> None:
+        if not value:
+            return
+        self.values[value.casefold().strip()].add(row_id)
+        for tok in set(tokenize(value)):
+            self.tokens.add(tok, row_id)
+
+    def discard(self, value: Optional[str], row_id: int) -> None:
+        if not value:
+            return
+        rows = self.values.get(value.casefold().strip())
+        if rows is not None:
+            rows.discard(row_id)
+        for tok in set(tokenize(value)):
+            self.tokens.discard(tok, row_id)
+
+    def match(self, query: str) -> Set[int]:
+        # A full value (e.g. picked from a dropdown) selects exactly that value;
+        # anything else matches rows where every query token prefixes a value token.
+        exact = self.values.get(query.casefold().strip())
+        if exact:
+            return exact
+        return _intersect(self.tokens.prefix(t) for t in tokenize(query))
+
+
+def _intersect(sets: Iterable[Set[int]]) -> Set[int]:
+    result: Optional[Set[int]] = None
+    for s in sorted(sets, key=len):
+        result = set(s) if result is None else result & s
+        if not result:
+            return set()
+    return result or set()
+
+
+class CandidateIndex:
+    """
+    Incremental inverted index over normalized candidate rows.
+
+    Row ids are positions in the owning catalog; rows superseded there are
+    removed again. `q` matches rows where every
+    query token prefixes a token of the name or bio; `party`/`constituency` use
+    the exact value map first and fall back to token prefixes. Filters are
+    combined by intersecting posting sets, smallest first, so a query costs
+    roughly the number of rows it touches rather than the corpus size.
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self._name = _Postings()
+        self._bio = _Postings()
+        self._party = _Field()
+        self._constituency = _Field()
+
+    def add(self, row_id: int, item: Dict[str, Any]) -> None:
+        for tok in set(tokenize(item.get("fullName"))):
+            self._name.add(tok, row_id)
+        for tok in set(tokenize(item.get("bio"))):
+            self._bio.add(tok, row_id)
+        self._party.add(item.get("partyName"), row_id)
+        self._constituency.add(item.get("constituencyName"), row_id)
+
+    def remove(self, row_id: int, item: Dict[str, Any]) -> None:
+        """Forget a row that was added with `item` (superseded by a newer version)."""
+        for tok in set(tokenize(item.get("fullName"))):
+            self._name.discard(tok, row_id)
+        for tok in set(tokenize(item.get("bio"))):
+            self._bio.discard(tok, row_id)
+        self._party.discard(item.get("partyName"), row_id)
+        self._constituency.discard(item.get("constituencyName"), row_id)
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        party: Optional[str] = None,
+        constituency: Optional[str] = None,
+        rank: bool = False,
+    ) -> List[int]:
+        """Matching row ids, in approval order or by relevance when `rank`."""
+        q_tokens = tokenize(q)
+        sets: List[Set[int]] = []
+        if party:
+            sets.append(self._party.match(party))
+        if constituency:
+            sets.append(self._constituency.match(constituency))
+        for tok in q_tokens:
+            sets.append(self._name.prefix(tok) | self._bio.prefix(tok))
+
+        if not sets:
+            return []
+        hits = _intersect(sets)
+        if not (rank and q_tokens):
+            return sorted(hits)
+
+        scores = self._score(q_tokens, hits)
+        return sorted(hits, key=lambda i: (-scores.get(i, 0), i))
+
+    def _score(self, q_tokens: List[str], hits: Set[int]) -> Dict[int, int]:
+        # Name hits outweigh bio hits; whole-word hits outweigh prefix hits.
+        scores: Dict[int, int] = defaultdict(int)
+        for tok in q_tokens:
+            for postings, weight in ((self._name, 4), (self._bio, 1)):
+                for term in postings.prefixed(tok):
+                    bonus = weight * (2 if term == tok else 1)
+                    for row_id in postings.terms[term] & hits:
+                        scores[row_id] += bonus
+        return scores
+
+
+class NameIndex:
+    """
+    Token-prefix index over one text field of normalized rows (party names):
+    `search` matches rows where every query token prefixes a token of the field.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.clear()
+
+    def clear(self) -> None:
+        self._tokens = _Postings()
+
+    def add(self, row_id: int, item: Dict[str, Any]) -> None:
+        for tok in set(tokenize(item.get(self.field))):
+            self._tokens.add(tok, row_id)
+
+    def remove(self, row_id: int, item: Dict[str, Any]) -> None:
+        for tok in set(tokenize(item.get(self.field))):
+            self._tokens.discard(tok, row_id)
+
+    def search(self, needle: Optional[str]) -> List[int]:
+        """Matching row ids, ascending; none for a needle without tokens."""
+        tokens = tokenize(needle)
+        if not tokens:
+            return []
+        return sorted(_intersect(self._tokens.prefix(t) for t in tokens))
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+from email.utils import formatdate
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+
+def make_etag(namespace: str, generation: Any, request: Request) -> str:
+    """
+    Strong ETag for a read endpoint: store generation + normalized query params.
+
+    The generation must change whenever the underlying data does; the params
+    are sorted so that `?a=1&b=2` and `?b=2&a=1` share a validator.
+    """
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{namespace}|{generation}|{params}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 §13.1.2).
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def validator_headers(
+    request: Request,
+    *,
+    namespace: str,
+    generation: Any,
+    last_modified: Optional[float] = None,
+    max_age: Optional[int] = None,
+) -> Dict[str, str]:
+    """ETag / Cache-Control / Last-Modified headers for one response."""
+    age = settings.public_cache_max_age if max_age is None else max_age
+    headers = {
+        "ETag": make_etag(namespace, generation, request),
+        "Cache-Control": f"public, max-age={age}",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and _etag_matches(if_none_match, headers["ETag"])
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    *,
+    namespace: str,
+    generation: Any,
+    last_modified: Optional[float] = None,
+    max_age: Optional[int] = None,
+) -> Optional[Response]:
+    """
+    Set ETag / Cache-Control / Last-Modified on `response` and return a ready
+    304 response if the client's If-None-Match already matches, else None.
+
+    Usage in a handler:
+        if (not_modified := conditional_get(request, response, ...)) is not None:
+            return not_modified
+    """
+    headers = validator_headers(
+        request,
+        namespace=namespace,
+        generation=generation,
+        last_modified=last_modified,
+        max_age=max_age,
+    )
+    response.headers.update(headers)
+    if is_not_modified(request, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+CacheKey = Tuple[str, Hashable]
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of encoded response bodies.
+
+    Keys are `(namespace, key)` pairs, e.g. `("candidates", etag)`. Entries are
+    evicted least-recently-used once `max_entries` or `max_bytes` is exceeded,
+    and lazily when older than `ttl` seconds. `invalidate(namespace)` drops
+    every entry of one endpoint family (called when new rows are approved).
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[bytes]:
+        k = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, body = entry
+            if expires_at <= time.monotonic():
+                self._drop(k)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return body
+
+    def set(self, namespace: str, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        k = (namespace, key)
+        with self._lock:
+            if k in self._entries:
+                self._drop(k)
+            self._entries[k] = (time.monotonic() + self.ttl, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._drop(k)
+
+    def _drop(self, k: CacheKey) -> None:
+        _, body = self._entries.pop(k)
+        self._bytes -= len(body)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Shared by the public read endpoints; invalidated by ingest approvals.
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    ttl=settings.response_cache_ttl_seconds,
+)
@@ -0,0 +1,123 @@
+"""
+Celery crawl workers (CRAWL_EXECUTOR=celery). Run the fleet with:
+
+    celery -A app.worker worker --loglevel=info --concurrency=2
+
+Tasks are acknowledged only after the crawl finishes, so a worker that
+dies mid-crawl has its task redelivered once the broker's visibility
+timeout passes; the registry makes that redelivery (and any duplicate)
+a no-op if the job already finished or is still heartbeating elsewhere.
+Jobs whose heartbeat stops are also re-queued sooner by an orphan sweep,
+at startup and every CRAWL_ORPHAN_SWEEP_SECONDS.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine
+
+from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown
+
+from app.core.config import settings
+from app.services.browser_pool import browser_pool
+from app.services.crawl_cache import url_key
+from app.services.crawl_runner import orphaned_before, run_crawl
+from app.services.crawler import close_http_client
+from app.services.extraction_pool import extraction_pool
+from app.services.job_events import job_events
+from app.services.job_registry import get_job_registry
+
+log = logging.getLogger(__name__)
+
+celery_app = Celery("electa", broker=settings.celery_broker_url or settings.redis_url)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_always_eager=settings.celery_task_always_eager,
+    broker_transport_options={
+        "visibility_timeout": settings.celery_visibility_timeout_seconds,
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+    },
+)
+
+# One event loop per worker thread for its lifetime, so the shared browser
+# and HTTP client are reused across tasks instead of relaunched per crawl.
+_local = threading.local()
+
+
+def _run(coro: Coroutine[Any, Any, Any]) -> Any:
+    loop = getattr(_local, "loop", None)
+    if loop is None:
+        loop = _local.loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # the loop idles between tasks; get this job's events out first
+        loop.run_until_complete(job_events.flush())
+
+
+@celery_app.task(name="ingest.crawl")
+def crawl_job(job_id: str, url: str, key: str) -> None:
+    _run(run_crawl(job_id, url, key))
+
+
+def send_crawl(job_id: str, url: str, key: str, priority: int = 0) -> None:
+    """Queue a crawl on the fleet; `priority` as in the API (0-9, higher first)."""
+    # Redis serves priority 0 first
+    crawl_job.apply_async((job_id, url, key), priority=9 - priority)
+
+
+@worker_process_init.connect
+def _init_process(**_: Any) -> None:
+    # Each pool process already is a separate crawl process; a nested
+    # extraction pool per process would only multiply CPU workers.
+    extraction_pool.workers = 0
+
+
+def _recover_orphans() -> None:
+    for job_id, url in get_job_registry().claim_orphans(orphaned_before()):
+        send_crawl(job_id, url, url_key(url))
+
+
+_sweep_stop = threading.Event()
+
+
+def _sweep_orphans(interval: float) -> None:
+    while not _sweep_stop.wait(interval):
+        try:
+            _recover_orphans()
+        except Exception:
+            log.exception("recovering orphaned crawls failed")
+
+
+@worker_ready.connect
+def _start_sweep(**_: Any) -> None:
+    _recover_orphans()
+    if settings.crawl_orphan_sweep_seconds > 0:
+        _sweep_stop.clear()
+        threading.Thread(
+            target=_sweep_orphans, args=(settings.crawl_orphan_sweep_seconds,), name="orphan-sweep", daemon=True
+        ).start()
+
+
+@worker_shutdown.connect
+def _stop_sweep(**_: Any) -> None:
+    _sweep_stop.set()
+
+
+@worker_process_shutdown.connect
+def _close_process(**_: Any) -> None:
+    loop = getattr(_local, "loop", None)
+    if loop is None:
+        return
+    loop.run_until_complete(browser_pool.close())
+    loop.run_until_complete(close_http_client())
+    loop.run_until_complete(job_events.close())
+    loop.close()
@@ -0,0 +1,177 @@
+"""
+Login latency under a registration storm, through the ASGI app.
+
+Registrations (POST /auth/register/verify-otp, one bcrypt hash each) are
+fired by `--storm` concurrent clients while a single client logs in
+repeatedly (one bcrypt check each). Reported per mode: login p50/p99 at
+rest and during the storm, registrations/s, registrations shed with 503,
+and the worst event-loop stall seen by a 10 ms ticker.
+
+- executor: the current code, bcrypt on the bounded hashing executor with
+  password checks ahead of new hashes;
+- inline: the behaviour before the executor for reference, registration
+  hashing on the event loop and login checks in Starlette's threadpool.
+
+OTPs come from an in-memory fake, the database is a temporary SQLite file
+(aiosqlite) and the rate limiter is off, so it runs offline. Run from the repo root:
+
+    python benchmarks/bench_auth_hashing.py [--storm 16] [--logins 10] [--mode executor]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.v1.endpoints import auth  # noqa: E402
+from app.core import security  # noqa: E402
+from app.db.session import get_async_db  # noqa: E402
+from app.limits import limiter  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.citizen import Citizen  # noqa: E402
+
+PASSWORD = "Secret123!"
+
+
+class _Otp:
+    def __init__(self) -> None:
+        self.codes: Dict[str, str] = {}
+
+    async def set(self, identifier: str, code: str, ttl: int = 300) -> None:
+        self.codes[identifier] = code
+
+    async def get(self, identifier: str) -> Optional[str]:
+        return self.codes.get(identifier)
+
+    async def verify_and_consume(self, identifier: str, code: str) -> bool:
+        return self.codes.pop(identifier, None) == code
+
+
+async def _inline_hash(password: str) -> str:
+    return security.get_password_hash(password)
+
+
+async def _threadpool_verify(plain: str, hashed: str) -> bool:
+    return await run_in_threadpool(security.verify_password, plain, hashed)
+
+
+def _percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50={statistics.median(samples) * 1000:7.0f} ms  p99={p99 * 1000:7.0f} ms"
+
+
+async def _logins(client: AsyncClient, n: int) -> List[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        r = await client.post("/auth/login", json={"mobile_number": "01700000000", "password": PASSWORD})
+        out.append(time.perf_counter() - t0)
+        assert r.status_code == 200, r.text
+    return out
+
+
+async def _ticker(stop: asyncio.Event, stalls: List[float]) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - t0 - 0.01)
+
+
+async def _register(client: AsyncClient, otp: _Otp, worker: int, stop: asyncio.Event, counts: Dict[int, int]) -> None:
+    i = 0
+    while not stop.is_set():
+        mobile = f"018{worker:04d}{i:04d}"
+        i += 1
+        otp.codes[mobile] = "123456"
+        r = await client.post(
+            "/auth/register/verify-otp",
+            json={"mobile_number": mobile, "password": PASSWORD, "otp": 123456},
+        )
+        counts[r.status_code] = counts.get(r.status_code, 0) + 1
+        if r.status_code == 503:
+            await asyncio.sleep(0.05)
+
+
+async def run(mode: str, storm: int, logins: int, path: Path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Citizen.__table__.create(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Citizen(mobile_number="01700000000", password_hash=security.get_password_hash(PASSWORD)))
+        db.commit()
+    engine.dispose()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def _db():
+        async with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = _db
+    otp = _Otp()
+    auth.otp_service = otp
+    if mode == "inline":
+        auth.get_password_hash_async = _inline_hash
+        auth.verify_password_async = _threadpool_verify
+    else:
+        auth.get_password_hash_async = security.get_password_hash_async
+        auth.verify_password_async = security.verify_password_async
+        security.hashing_executor = security.HashingExecutor(
+            workers=security.settings.password_hash_workers, max_queue=security.settings.password_hash_queue_max
+        )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+        idle = await _logins(client, max(5, logins // 4))
+
+        stop = asyncio.Event()
+        stalls: List[float] = []
+        counts: Dict[int, int] = {}
+        ticker = asyncio.create_task(_ticker(stop, stalls))
+        storm_tasks = [asyncio.create_task(_register(client, otp, w, stop, counts)) for w in range(storm)]
+        await asyncio.sleep(0.5)  # let the storm build up
+        t0 = time.perf_counter()
+        busy = await _logins(client, logins)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(ticker, *storm_tasks)
+
+    if mode == "executor":
+        security.hashing_executor.shutdown()
+    app.dependency_overrides.pop(get_async_db, None)
+    await async_engine.dispose()
+
+    print(f"--- {mode} ({storm} registering clients) ---")
+    print(f"  login at rest      {_percentiles(idle)}")
+    print(f"  login during storm {_percentiles(busy)}")
+    print(f"  registrations      {counts.get(200, 0) / elapsed:7.1f} /s   shed (503): {counts.get(503, 0)}")
+    print(f"  worst loop stall   {max(stalls, default=0) * 1000:7.0f} ms")
+
+
+async def main(storm: int, logins: int, modes: Optional[List[str]]) -> None:
+    limiter.enabled = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes or ["inline", "executor"]:
+            await run(mode, storm, logins, Path(tmp) / f"{mode}.db")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm", type=int, default=16, help="concurrent registering clients")
+    parser.add_argument("--logins", type=int, default=10, help="logins timed during the storm")
+    parser.add_argument("--mode", action="append", choices=["inline", "executor"], help="default: both")
+    args = parser.parse_args()
+    asyncio.run(main(args.storm, args.logins, args.mode))
@@ -0,0 +1,114 @@
+"""
+Per-job fetch latency against a local fixture server:
+
+- static: the crawler's plain-GET tier (pooled httpx client) plus extraction,
+  also reported as jobs/s on one core;
+- legacy: launching Chromium for every URL (previous crawl_and_extract);
+- pooled: pages from the shared BrowserPool.
+
+Browser jobs are get a page, goto, read content; scrolling and extraction
+are left out since they are the same in both browser paths. The browser
+rows need a local Chromium (`python -m playwright install chromium`) and
+are skipped without one.
+
+Run from the repo root:
+    python benchmarks/bench_crawler_browser.py [--jobs 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from app.services import crawler  # noqa: E402
+from app.services.browser_pool import BrowserPool  # noqa: E402
+
+FIXTURE = (
+    "<html><head><title>Candidates</title></head><body>"
+    "<h1>National Citizens Party</h1><ul>"
+    + "".join(f"<li>Candidate Number {i} - Dhaka-{i % 20}</li>" for i in range(300))
+    + "</ul></body></html>"
+).encode("utf-8")
+
+
+class _Fixture(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(FIXTURE)))
+        self.end_headers()
+        self.wfile.write(FIXTURE)
+
+    def log_message(self, *args):
+        pass
+
+
+async def _legacy_job(url: str) -> None:
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto(url, wait_until="domcontentloaded")
+        await page.content()
+        await browser.close()
+
+
+async def _time(jobs: int, job: Callable[[], Awaitable[None]]) -> List[float]:
+    samples = []
+    for _ in range(jobs):
+        t0 = time.perf_counter()
+        await job()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _report(label: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<10} p50={statistics.median(ordered):8.1f}ms  p99={p99:8.1f}ms  first={samples[0]:8.1f}ms")
+
+
+async def main(jobs: int) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def static_job() -> None:
+        html = await crawler._fetch_static(url)
+        crawler._extract_with_heuristics(html)
+
+    pool = BrowserPool(max_pages=1, recycle_after=0)
+
+    async def pooled_job() -> None:
+        async with pool.page() as page:
+            await page.goto(url, wait_until="domcontentloaded")
+            await page.content()
+
+    try:
+        samples = await _time(jobs, static_job)
+        _report("static", samples)
+        print(f"{'':<10} {1000 / statistics.mean(samples):.1f} jobs/s on one core")
+        try:
+            _report("legacy", await _time(jobs, lambda: _legacy_job(url)))
+            _report("pooled", await _time(jobs, pooled_job))
+        except Exception as exc:
+            print(f"browser tiers skipped: {type(exc).__name__}")
+    finally:
+        await pool.close()
+        await crawler.close_http_client()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20)
+    asyncio.run(main(parser.parse_args().jobs))
@@ -0,0 +1,202 @@
+"""
+Throughput, memory and golden check for crawler extraction.
+
+Pages are the saved election pages in benchmarks/corpus/ plus synthetic
+large pages (thousands of headings and list items, see `synthetic_page`).
+Each page is fed to the extraction stages as the crawler does (UTF-8
+bytes), and every stage reports docs/s, input MB/s and peak memory:
+
+- parse:       lxml parse (`_parse`)
+- select:      heading and <li> text (`_select`)
+- name_like:   party words and the name regex over those texts (`_match`)
+- trafilatura: main-content pass on the shared tree (`_main_text`)
+- total:       `_extract_with_heuristics` end to end
+
+Peak memory is the process's resident-set high-water mark during one
+pass of the stage minus its RSS before it (freed heap is trimmed first),
+so it includes libxml2's C allocations. Linux only; "n/a" elsewhere.
+
+The golden check compares the full extraction output of every page with
+benchmarks/golden/<page>.json and exits non-zero on any difference;
+`--update-golden` rewrites the files after an intended output change.
+Runs offline from the repo root:
+
+    python benchmarks/bench_extraction.py [--rounds 20] [--synthetic 2000,20000] [--update-golden]
+"""
+from __future__ import annotations
+
+import argparse
+import ctypes
+import gc
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.crawler import _extract_with_heuristics, _main_text, _match, _parse, _select  # noqa: E402
+
+HERE = Path(__file__).parent
+GOLDEN = HERE / "golden"
+
+_FIRST = ["Rahim", "Karim", "Selina", "Abdul", "Nasrin", "Farhana", "Mizanur", "Anisul", "Shirin", "Tofail", "Jahanara"]
+_LAST = ["Uddin", "Ahmed", "Begum", "Khatun", "Rahman", "Hossain", "Islam", "Chowdhury", "Sarkar", "Haque", "Kabir"]
+_PARTY = ["Awami League", "Nationalist Party", "Jatiya Party", "Democratic Front", "Citizens Alliance", "Workers Party"]
+_DISTRICTS = ["Dhaka", "Chattogram", "Sylhet", "Rajshahi", "Khulna", "Barishal", "Rangpur", "Mymensingh"]
+
+
+def synthetic_page(items: int, seed: int = 7) -> str:
+    """
+    A large candidate-list page: one heading per 20 list items, plus the
+    noise real pages carry (nav lists, scripts, comments, a table).
+    Deterministic for a given (items, seed), so its golden output is stable.
+    """
+    rng = random.Random(seed)
+    out = [
+        "<!DOCTYPE html><html><head><title>Nominations</title>",
+        "<script>window.__STATE__ = {\"page\": 1};</script><style>li{margin:0}</style></head><body>",
+        "<nav><ul>" + "".join(f"<li><a href='/d/{d}'>{d}</a></li>" for d in _DISTRICTS) + "</ul></nav>",
+        "<main><h1>Election Commission Nominations</h1>",
+    ]
+    for i in range(items):
+        if i % 20 == 0:
+            level = rng.choice(("h2", "h3", "h4"))
+            party = rng.choice(_PARTY)
+            out.append(f"<{level}>Bangladesh {party} {i // 20}</{level}><!-- block {i} --><ul>")
+        name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+        seat = f"{rng.choice(_DISTRICTS)}-{rng.randint(1, 20)}"
+        out.append(f"<li><span class='name'>{name}</span> <em>{seat}</em> &middot; symbol #{i}</li>")
+        if i % 20 == 19 or i == items - 1:
+            out.append("</ul><p>Nomination papers were verified by the returning officer on schedule.</p>")
+    out.append("<table>" + "".join(f"<tr><td>{d}</td><td>{rng.randint(1000, 9999)}</td></tr>" for d in _DISTRICTS))
+    out.append("</table></main><footer><ul><li>About</li><li>Contact</li></ul></footer></body></html>")
+    return "\n".join(out)
+
+
+def load_pages(corpus: Path) -> List[Tuple[str, bytes]]:
+    return [(p.stem, p.read_bytes()) for p in sorted(corpus.glob("*.html"))]
+
+
+# --- golden check ---
+def golden_check(pages: List[Tuple[str, bytes]], update: bool) -> List[str]:
+    """Names of pages whose extraction differs from benchmarks/golden (rewritten if `update`)."""
+    GOLDEN.mkdir(exist_ok=True)
+    changed = []
+    for name, html in pages:
+        path = GOLDEN / f"{name}.json"
+        result = _extract_with_heuristics(html)
+        if update:
+            path.write_text(json.dumps(result, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+        elif not path.exists() or json.loads(path.read_text(encoding="utf-8")) != result:
+            changed.append(name)
+    return changed
+
+
+# --- peak memory ---
+_STATUS = Path("/proc/self/status")
+try:
+    _libc: Optional[ctypes.CDLL] = ctypes.CDLL("libc.so.6")
+except OSError:
+    _libc = None
+
+
+def _status_kb(field: str) -> int:
+    return int(re.search(rf"^{field}:\s+(\d+) kB", _STATUS.read_text(), re.M).group(1))
+
+
+def _reset_peak() -> bool:
+    # Hand freed heap back to the OS first, or the stage would reuse it unseen
+    gc.collect()
+    if _libc is not None:
+        _libc.malloc_trim(0)
+    # Linux: writing 5 resets VmHWM (peak RSS) to the current RSS
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_mb(run: Callable[[], Any]) -> Optional[float]:
+    """Peak RSS growth (MB) while `run()` executes, or None where it can't be measured."""
+    if not _reset_peak():
+        run()
+        return None
+    before = _status_kb("VmRSS")
+    run()
+    return max(0, _status_kb("VmHWM") - before) / 1024
+
+
+# --- stages ---
+def _each(fn: Callable[..., Any], *inputs: List[Any]) -> None:
+    # one page at a time, results dropped as in a crawl: peak memory is per page
+    for args in zip(*inputs):
+        fn(*args)
+
+
+def stages(pages: List[Tuple[str, bytes]]) -> List[Tuple[str, Callable[[], Any]]]:
+    """(name, run once over all pages) for each stage; later stages get their inputs prepared here."""
+    docs = [html for _, html in pages]
+    trees = [_parse(html) for html in docs]
+    texts = [_select(tree) for tree in trees]
+    # the trafilatura pass strips comments from its tree once; later rounds see the same tree
+    for tree, html in zip(trees, docs):
+        _main_text(tree, html)
+    return [
+        ("parse", lambda: _each(_parse, docs)),
+        ("select", lambda: _each(_select, trees)),
+        ("name_like", lambda: _each(_match, *zip(*texts))),
+        ("trafilatura", lambda: _each(_main_text, trees, docs)),
+        ("total", lambda: _each(_extract_with_heuristics, docs)),
+    ]
+
+
+def report(label: str, pages: List[Tuple[str, bytes]], rounds: int) -> None:
+    size = sum(len(html) for _, html in pages)
+    print(f"\n{label}: {len(pages)} pages, {size / 1024:.0f} KiB, {rounds} rounds")
+    print(f"  {'stage':<12} {'docs/s':>10} {'MB/s':>9} {'peak MB':>9}")
+    for name, run in stages(pages):
+        run()  # warm-up
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        elapsed = time.perf_counter() - t0
+        peak = peak_mb(run)
+        print(
+            f"  {name:<12} {rounds * len(pages) / elapsed:>10.1f} {rounds * size / elapsed / 1e6:>9.2f} "
+            f"{'n/a' if peak is None else f'{peak:.1f}':>9}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--corpus", default=str(HERE / "corpus"))
+    parser.add_argument("--synthetic", default="2000,20000", help="list items per synthetic page, comma-separated")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite benchmarks/golden from the current output")
+    args = parser.parse_args()
+
+    corpus = load_pages(Path(args.corpus))
+    if not corpus:
+        sys.exit(f"no .html files in {args.corpus}")
+    sizes = [int(n) for n in args.synthetic.split(",") if n.strip()]
+    generated = [(f"synthetic_{n}", synthetic_page(n).encode("utf-8")) for n in sizes]
+
+    pages = corpus + generated
+    changed = golden_check(pages, args.update_golden)
+    print(f"golden: {len(pages) - len(changed)}/{len(pages)} pages {'written' if args.update_golden else 'unchanged'}")
+
+    report("corpus", corpus, args.rounds)
+    for page in generated:
+        report(page[0], [page], max(1, args.rounds // 10))
+
+    if changed:
+        sys.exit(f"output changed for: {', '.join(changed)} (rerun with --update-golden if intended)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Latency benchmark for GET /api/v1/public/candidates on the JSONL store
+(per-worker ApprovedCatalog + CandidateIndex).
+
+Generates a synthetic candidate.jsonl with 10k and 100k rows, then measures
+p50/p99 of the endpoint through the ASGI app. For reference, it also times
+the previous behaviour (parse the whole file on every request).
+
+Run from the repo root:
+    python benchmarks/bench_public_catalog.py [--requests 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services import approved_store  # noqa: E402
+from app.services.approved_store import JsonlApprovedStore, normalize_candidate  # noqa: E402
+
+
+def _write_rows(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(
+                json.dumps(
+                    {
+                        "full_name": f"Candidate Number {i}",
+                        "party_guess": f"Party {i % 40}",
+                        "constituency_guess": f"Dhaka-{i % 300}",
+                        "bio": "Lorem ipsum dolor sit amet " * 4,
+                    }
+                )
+                + "\n"
+            )
+
+
+def _legacy_read(path: Path) -> List[dict]:
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(normalize_candidate(json.loads(line)))
+    return rows
+
+
+def _percentiles(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50={p50 * 1000:8.2f} ms  p99={p99 * 1000:8.2f} ms"
+
+
+async def _time_endpoint(client: AsyncClient, n_requests: int, params: dict) -> List[float]:
+    out = []
+    for _ in range(n_requests):
+        t0 = time.perf_counter()
+        r = await client.get("/public/candidates", params=params)
+        out.append(time.perf_counter() - t0)
+        assert r.status_code == 200, r.text
+    return out
+
+
+def _time_sync(fn: Callable[[], object], n_requests: int) -> List[float]:
+    out = []
+    for _ in range(n_requests):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+async def main(n_requests: int) -> None:
+    transport = ASGITransport(app=app)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in (10_000, 100_000):
+            directory = Path(tmp) / str(n_rows)
+            directory.mkdir()
+            path = directory / "candidate.jsonl"
+            _write_rows(path, n_rows)
+            approved_store._approved_store_singleton = JsonlApprovedStore(directory)
+
+            async with AsyncClient(transport=transport, base_url="http://bench/api/v1") as client:
+                t0 = time.perf_counter()
+                await client.get("/public/candidates")
+                cold = time.perf_counter() - t0
+                first_page = await _time_endpoint(client, n_requests, {})
+                filtered = await _time_endpoint(client, n_requests, {"party": "party 7"})
+                searched = await _time_endpoint(client, n_requests, {"q": "number 4242"})
+
+            legacy = _time_sync(lambda: _legacy_read(path), max(5, n_requests // 20))
+
+            print(f"--- {n_rows:,} rows ---")
+            print(f"  cold load             {cold * 1000:8.2f} ms")
+            print(f"  catalog first page    {_percentiles(first_page)}")
+            print(f"  catalog party filter  {_percentiles(filtered)}")
+            print(f"  catalog q search      {_percentiles(searched)}")
+            print(f"  legacy full re-read   {_percentiles(legacy)}  (file parse only)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,66 @@
+"""Add approved party/candidate tables and their search terms
+
+Revision ID: 5d2f8c1a9e47
+Revises: 1c9d08902522
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8c1a9e47'
+down_revision = '1c9d08902522'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('approved_parties',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('external_id', sa.String(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('name_folded', sa.String(), nullable=False),
+    sa.Column('abbrev', sa.String(), nullable=True),
+    sa.Column('logo_url', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_approved_parties_name_folded'), 'approved_parties', ['name_folded'], unique=False)
+    op.create_table('approved_candidates',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('external_id', sa.String(), nullable=True),
+    sa.Column('full_name', sa.String(), nullable=False),
+    sa.Column('party_name', sa.String(), nullable=True),
+    sa.Column('party_folded', sa.String(), nullable=True),
+    sa.Column('constituency_name', sa.String(), nullable=True),
+    sa.Column('constituency_folded', sa.String(), nullable=True),
+    sa.Column('photo_url', sa.String(), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_approved_candidates_party_folded'), 'approved_candidates', ['party_folded'], unique=False)
+    op.create_index(op.f('ix_approved_candidates_constituency_folded'), 'approved_candidates', ['constituency_folded'], unique=False)
+    op.create_table('approved_terms',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('field', sa.String(length=16), nullable=False),
+    sa.Column('term', sa.String().with_variant(sa.String(collation='C'), 'postgresql'), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'field', 'term', 'row_id')
+    )
+    op.create_index('ix_approved_terms_row', 'approved_terms', ['kind', 'row_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_approved_terms_row', table_name='approved_terms')
+    op.drop_table('approved_terms')
+    op.drop_index(op.f('ix_approved_candidates_constituency_folded'), table_name='approved_candidates')
+    op.drop_index(op.f('ix_approved_candidates_party_folded'), table_name='approved_candidates')
+    op.drop_table('approved_candidates')
+    op.drop_index(op.f('ix_approved_parties_name_folded'), table_name='approved_parties')
+    op.drop_table('approved_parties')
@@ -0,0 +1,60 @@
+"""Add identity keys to approved rows and drop superseded duplicates
+
+Revision ID: 7b3e9d2c4f10
+Revises: 5d2f8c1a9e47
+Create Date: 2026-10-18 14:02:11.512390
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e9d2c4f10'
+down_revision = '5d2f8c1a9e47'
+branch_labels = None
+depends_on = None
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Same keys as app.services.approved_store.identity_key, frozen here
+_KEY_COLUMNS = {
+    'approved_parties': ('party', ['name']),
+    'approved_candidates': ('candidate', ['full_name', 'party_name', 'constituency_name']),
+}
+
+
+def _fold(text):
+    return " ".join(_TOKEN_RE.findall((text or "").casefold()))
+
+
+def upgrade():
+    conn = op.get_bind()
+    for table, (kind, columns) in _KEY_COLUMNS.items():
+        op.add_column(table, sa.Column('identity_key', sa.String(), nullable=True))
+        t = sa.table(table, sa.column('id', sa.Integer()), sa.column('identity_key', sa.String()),
+                     *(sa.column(c, sa.String()) for c in columns))
+        terms = sa.table('approved_terms', sa.column('kind', sa.String()), sa.column('row_id', sa.Integer()))
+
+        latest = {}
+        for row in conn.execute(sa.select(t.c.id, *(t.c[c] for c in columns)).order_by(t.c.id)):
+            key = "|".join(_fold(v) for v in row[1:])
+            latest[key] = row.id  # the latest approval wins
+        keep = set(latest.values())
+        stale = [row.id for row in conn.execute(sa.select(t.c.id)) if row.id not in keep]
+        for i in range(0, len(stale), 500):
+            chunk = stale[i:i + 500]
+            conn.execute(sa.delete(terms).where(terms.c.kind == kind, terms.c.row_id.in_(chunk)))
+            conn.execute(sa.delete(t).where(t.c.id.in_(chunk)))
+        for key, row_id in latest.items():
+            conn.execute(sa.update(t).where(t.c.id == row_id).values(identity_key=key))
+
+        op.create_index(op.f(f'ix_{table}_identity_key'), table, ['identity_key'], unique=True)
+
+
+def downgrade():
+    for table in _KEY_COLUMNS:
+        op.drop_index(op.f(f'ix_{table}_identity_key'), table_name=table)
+        op.drop_column(table, 'identity_key')
@@ -0,0 +1,71 @@
+"""
+One-shot import of storage/approved/{party,candidate}.jsonl into the
+approved_* tables used by APPROVED_STORE_BACKEND=db.
+
+Rows are inserted in batches with multi-row INSERTs (plus their search
+terms). Run once before switching the backend, from the repo root:
+
+    python scripts/import_approved_jsonl.py [--dir storage/approved] [--batch 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.approved_store import KINDS, SqlApprovedStore  # noqa: E402
+
+
+def _read_batches(path: Path, size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(row, dict):
+                batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def import_dir(store: SqlApprovedStore, directory: Path, batch_size: int = 1000) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for kind in KINDS:
+        path = directory / f"{kind}.jsonl"
+        counts[kind] = 0
+        if not path.exists():
+            continue
+        for batch in _read_batches(path, batch_size):
+            store.append(kind, batch)
+            counts[kind] += len(batch)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="storage/approved")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    counts = import_dir(SqlApprovedStore(), Path(args.dir), args.batch)
+    for kind, n in counts.items():
+        print(f"Imported {n} {kind} rows")
+    print(f"Done in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,11 @@ from pathlib import Path
 from typing import Generator
 
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
 
 # --- Ensure project root is on sys.path so `import app...` works ---
 PROJECT_ROOT = Path(__file__).resolve().parents[1]  # folder that contains 'app/' and 'alembic/'
@@ -16,12 +19,19 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Now safe to import app modules
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_async_db, get_db
+from app.models.citizen import Citizen
 
 
 # --- Use an in-memory SQLite DB for tests ---
-# check_same_thread=False to allow use across threads in test client
-engine = create_engine("sqlite+pysqlite:///:memory:", future=True, connect_args={"check_same_thread": False})
+# check_same_thread=False to allow use across threads in test client; one shared
+# connection (StaticPool) so threadpool calls see the same in-memory database
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    future=True,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -55,6 +65,42 @@ def _override_db_dependency(monkeypatch, db_session):
     app.dependency_overrides.pop(get_db, None)
 
 
+# --- Async stack (get_async_db): a fresh aiosqlite file per test ---
+# A file rather than :memory: so each connection (NullPool, one per session, opened
+# on the test's own event loop) sees the same tables.
+@pytest.fixture
+def async_db_url(tmp_path) -> str:
+    path = tmp_path / "async.db"
+    sync = create_engine(f"sqlite+pysqlite:///{path}", future=True)
+    Citizen.__table__.create(sync)
+    sync.dispose()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+@pytest.fixture
+def async_session_factory(async_db_url):
+    return async_sessionmaker(
+        create_async_engine(async_db_url, poolclass=NullPool), autoflush=False, expire_on_commit=False
+    )
+
+
+@pytest.fixture(autouse=True)
+def _override_async_db_dependency(async_session_factory):
+    async def _get_async_db_for_tests():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = _get_async_db_for_tests  # type: ignore
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+@pytest_asyncio.fixture
+async def async_db_session(async_session_factory):
+    async with async_session_factory() as db:
+        yield db
+
+
 # --- Fake OTP service so tests don't require Redis ---
 class _FakeOtpService:
     def __init__(self):
@@ -80,4 +126,7 @@ def _patch_otp_service(monkeypatch):
     import app.services.otp as otp_module  # local import after sys.path fix
     fake = _FakeOtpService()
     monkeypatch.setattr(otp_module, "otp_service", fake, raising=True)
+    # ...and the name the auth endpoints imported from it
+    import app.api.v1.endpoints.auth as auth_module
+    monkeypatch.setattr(auth_module, "otp_service", fake, raising=True)
     return fake
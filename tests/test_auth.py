@@ -1,11 +1,24 @@
 # D:\Application\Electa\app\app\electa-backend-api\tests\test_auth.py
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+
+import aiosqlite
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
+from app.core import security
+from app.core.security import PRIORITY_HASH, HashingBusy, HashingExecutor, get_password_hash
+from app.db.session import get_async_db
 from app.main import app
+from app.models.citizen import Citizen, VerificationStatus
 
 
 @pytest_asyncio.fixture
@@ -31,13 +44,13 @@ async def test_request_and_verify_otp(_patch_otp_service, client: AsyncClient):
     code = _patch_otp_service.store["01700000000"]
 
     # Verify OTP (creates user + returns JWT)
-    r2 = await client.post(f"/auth/register/verify-otp?otp={code}", json=body)
+    r2 = await client.post("/auth/register/verify-otp", json={**body, "otp": code})
     assert r2.status_code == 200, r2.text
     data = r2.json()
     assert "access_token" in data and data["token_type"] == "bearer"
 
     # Reusing the same OTP must fail (consumed)
-    r3 = await client.post(f"/auth/register/verify-otp?otp={code}", json=body)
+    r3 = await client.post("/auth/register/verify-otp", json={**body, "otp": code})
     assert r3.status_code in (400, 401)
 
 
@@ -50,7 +63,7 @@ async def test_login(_patch_otp_service, client: AsyncClient):
     assert r_req.status_code == 200, r_req.text
     code = _patch_otp_service.store["01711111111"]
 
-    r_ver = await client.post(f"/auth/register/verify-otp?otp={code}", json=body)
+    r_ver = await client.post("/auth/register/verify-otp", json={**body, "otp": code})
     assert r_ver.status_code == 200, r_ver.text
 
     # Now login with password
@@ -58,3 +71,157 @@ async def test_login(_patch_otp_service, client: AsyncClient):
     assert r.status_code == 200, r.text
     data = r.json()
     assert "access_token" in data and data["token_type"] == "bearer"
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_is_bounded_and_sheds_load(async_db_session, monkeypatch, client: AsyncClient):
+    executor = HashingExecutor(workers=1, max_queue=1)
+    monkeypatch.setattr(security, "hashing_executor", executor)
+    async_db_session.add(Citizen(mobile_number="01722222222", password_hash=get_password_hash("Secret123!")))
+    await async_db_session.commit()
+    body = {"mobile_number": "01722222222", "password": "Secret123!"}
+
+    gate = threading.Event()
+    busy = [asyncio.create_task(executor.run(gate.wait, 5)) for _ in range(2)]
+    try:
+        await asyncio.sleep(0.05)
+        assert executor.stats()["running"] == 1 and executor.stats()["queued"] == 1
+
+        # saturated: shed without waiting, and the event loop stays free meanwhile
+        r = await client.post("/auth/login", json=body)
+        assert r.status_code == 503, r.text
+        assert r.headers["retry-after"] == "5"
+    finally:
+        gate.set()
+        await asyncio.gather(*busy)
+    r = await client.post("/auth/login", json=body)
+    assert r.status_code == 200, r.text
+    assert executor.stats() == {
+        "workers": 1, "running": 0, "queued": 0, "pending_hashes": 0, "max_queue": 1, "completed": 3, "shed": 1,
+    }
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_registration_shed_with_503_keeps_the_otp_for_the_retry(_patch_otp_service, monkeypatch, client: AsyncClient):
+    executor = HashingExecutor(workers=1, max_queue=1)
+    monkeypatch.setattr(security, "hashing_executor", executor)
+    body = {"mobile_number": "01733333333", "password": "Secret123!"}
+    r = await client.post("/auth/register/request-otp", json=body)
+    assert r.status_code == 200, r.text
+    code = _patch_otp_service.store["01733333333"]
+
+    gate = threading.Event()
+    busy = [asyncio.create_task(executor.run(gate.wait, 5)) for _ in range(2)]
+    try:
+        await asyncio.sleep(0.05)
+        r = await client.post("/auth/register/verify-otp", json={**body, "otp": code})
+        assert r.status_code == 503, r.text
+        assert r.headers["retry-after"] == "5"
+        assert _patch_otp_service.store["01733333333"] == code
+    finally:
+        gate.set()
+        await asyncio.gather(*busy)
+
+    r = await client.post("/auth/register/verify-otp", json={**body, "otp": code})
+    assert r.status_code == 200, r.text
+    assert "01733333333" not in _patch_otp_service.store
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_checks_jump_queued_hashes():
+    executor = HashingExecutor(workers=1, max_queue=2)
+    gate, order = threading.Event(), []
+    blocker = asyncio.create_task(executor.run(gate.wait, 5))
+    await asyncio.sleep(0.05)
+    hashes = [asyncio.create_task(executor.run(order.append, f"hash {i}", priority=PRIORITY_HASH)) for i in range(2)]
+    await asyncio.sleep(0.01)
+    # the queue is full for registrations, not for logins
+    with pytest.raises(HashingBusy):
+        await executor.run(order.append, "hash 2", priority=PRIORITY_HASH)
+    check = asyncio.create_task(executor.run(order.append, "check"))
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(blocker, check, *hashes)
+    assert order == ["check", "hash 0", "hash 1"]
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_keep_their_hash_counted_until_it_finishes():
+    executor = HashingExecutor(workers=1, max_queue=0)
+    gate = threading.Event()
+    caller = asyncio.create_task(executor.run(gate.wait, 5))
+    await asyncio.sleep(0.05)
+    caller.cancel()  # e.g. the client disconnected mid-login
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    # the worker is still hashing for it: still counted, still at capacity
+    assert executor.stats()["running"] == 1
+    with pytest.raises(HashingBusy):
+        await executor.run(gate.wait, 5)
+    gate.set()
+    for _ in range(100):
+        if executor.stats()["running"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert executor.stats()["running"] == 0 and executor.stats()["completed"] == 1
+    assert await executor.run(len, "ok") == 2
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_auth_and_ekyc_queries_never_block_the_event_loop(
+    _patch_otp_service, async_db_url, async_db_session, client: AsyncClient
+):
+    # Every statement sleeps 50 ms inside SQLite, i.e. on aiosqlite's thread
+    statements = []
+
+    async def _slow_connect():
+        conn = await aiosqlite.connect(make_url(async_db_url).database)
+        await conn.set_trace_callback(lambda sql: (statements.append(sql), time.sleep(0.05)))
+        return conn
+
+    slow = async_sessionmaker(
+        create_async_engine("sqlite+aiosqlite://", async_creator=_slow_connect, poolclass=NullPool),
+        expire_on_commit=False,
+    )
+
+    async def _slow_db():
+        async with slow() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = _slow_db
+
+    lags, done = [], asyncio.Event()
+
+    async def _ticker():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - t0 - 0.005)
+
+    ticker = asyncio.create_task(_ticker())
+    body = {"mobile_number": "01733333333", "password": "Secret123!"}
+    try:
+        await _patch_otp_service.set("01733333333", "123456")
+        r = await client.post("/auth/register/verify-otp", json={**body, "otp": 123456})
+        assert r.status_code == 200, r.text
+        r = await client.post("/auth/login", json=body)
+        assert r.status_code == 200, r.text
+        auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        r = await client.post("/ekyc/initiate", headers=auth)
+        assert r.status_code == 200, r.text
+        r = await client.get("/ekyc/callback", params={"code": "mock_success_code", "state": "xyz123"})
+        assert r.status_code == 200, r.text
+    finally:
+        done.set()
+        await ticker
+
+    # seconds were spent in the database while the loop kept ticking every few ms
+    assert len(statements) >= 8
+    assert max(lags) < 0.04, max(lags)
+    citizen = await async_db_session.scalar(select(Citizen).where(Citizen.mobile_number == "01733333333"))
+    assert citizen.verification_status == VerificationStatus.NID_VERIFIED
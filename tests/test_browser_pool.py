@@ -0,0 +1,173 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from app.services import browser_pool as bp
+from app.services.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed = True
+        self.browser.open_contexts -= 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.open_contexts = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **_):
+        self.open_contexts += 1
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class FakeDriver:
+    def __init__(self):
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def launched():
+    browsers = []
+
+    async def launcher():
+        browser = FakeBrowser()
+        browsers.append(browser)
+        return FakeDriver(), browser
+
+    launcher.browsers = browsers
+    return launcher
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_one_browser_and_isolates_contexts(launched):
+    pool = BrowserPool(max_pages=2, recycle_after=0, launcher=launched)
+    for _ in range(5):
+        async with pool.page():
+            assert launched.browsers[0].open_contexts == 1
+    assert len(launched.browsers) == 1
+    assert launched.browsers[0].open_contexts == 0
+    assert pool.stats()["pages_served"] == 5
+
+    await pool.close()
+    assert launched.browsers[0].closed
+    assert not pool.stats()["running"]
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_open_pages(launched):
+    pool = BrowserPool(max_pages=2, recycle_after=0, launcher=launched)
+    peak = 0
+    gate = asyncio.Event()
+
+    async def crawl():
+        nonlocal peak
+        async with pool.page():
+            peak = max(peak, pool.stats()["active_pages"])
+            await gate.wait()
+
+    tasks = [asyncio.create_task(crawl()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert pool.stats()["active_pages"] == 2
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert len(launched.browsers) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_n_uses_without_killing_open_pages(launched):
+    pool = BrowserPool(max_pages=4, recycle_after=2, launcher=launched)
+    async with pool.page():
+        async with pool.page():
+            pass
+        # second release hit the limit, but the first page is still open
+        assert not launched.browsers[0].closed
+    assert launched.browsers[0].closed
+
+    async with pool.page():
+        pass
+    assert len(launched.browsers) == 2
+    assert pool.stats()["recycles"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_above_rss_threshold(launched, monkeypatch):
+    monkeypatch.setattr(bp, "_browser_rss_mb", lambda: 2048.0)
+    pool = BrowserPool(max_pages=1, recycle_after=0, max_rss_mb=1024, launcher=launched)
+    async with pool.page():
+        pass
+    async with pool.page():
+        pass
+    assert len(launched.browsers) == 2
+    assert launched.browsers[0].closed
+
+
+def test_browser_rss_counts_only_the_driver_tree():
+    psutil = pytest.importorskip("psutil")
+    # a stand-in driver (same argv marker) and an unrelated child holding ~64 MB, like an extraction worker
+    hold = "import sys, time; sys.stdout.write('ok\\n'); sys.stdout.flush(); time.sleep(30)"
+    driver = subprocess.Popen([sys.executable, "-c", hold, "run-driver"], stdout=subprocess.PIPE)
+    other = subprocess.Popen(
+        [sys.executable, "-c", "b = bytearray(64 << 20); b[::4096] = b'x' * len(b[::4096]); " + hold],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        driver.stdout.readline()
+        other.stdout.readline()
+        expected = psutil.Process(driver.pid).memory_info().rss / (1024 * 1024)
+        assert bp._browser_rss_mb() == pytest.approx(expected, rel=0.2)
+        assert bp._browser_rss_mb() < 60
+    finally:
+        for proc in (driver, other):
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.asyncio
+async def test_pool_relaunches_disconnected_browser(launched):
+    pool = BrowserPool(max_pages=1, recycle_after=0, launcher=launched)
+    async with pool.page():
+        pass
+    launched.browsers[0].connected = False
+    async with pool.page():
+        pass
+    assert len(launched.browsers) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_crawl_releases_its_context(launched):
+    pool = BrowserPool(max_pages=1, recycle_after=0, launcher=launched)
+
+    async def crawl():
+        async with pool.page():
+            await asyncio.sleep(3600)
+
+    task = asyncio.create_task(crawl())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert launched.browsers[0].open_contexts == 0
+    assert pool.stats()["active_pages"] == 0
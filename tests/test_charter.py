@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import charter
+from app.db.session import get_db
+from app.models.charter_version import CharterVersion
+
+
+@pytest.fixture
+def client(db_session):
+    CharterVersion.__table__.create(db_session.get_bind(), checkfirst=True)
+    api = FastAPI()
+    api.include_router(charter.router)
+    api.dependency_overrides[get_db] = lambda: db_session
+    yield TestClient(api)
+    db_session.query(CharterVersion).delete()
+    db_session.commit()
+
+
+def test_charter_versions_etag_follows_content(db_session, client):
+    first = CharterVersion(version_name="Draft 1", effective_date=datetime(2025, 7, 1), is_active=True)
+    db_session.add(first)
+    db_session.commit()
+
+    r = client.get("/charter/versions")
+    assert r.status_code == 200, r.text
+    assert [v["version_name"] for v in r.json()] == ["Draft 1"]
+    etag = r.headers["etag"]
+    assert client.get("/charter/versions", headers={"If-None-Match": etag}).status_code == 304
+
+    # edits keep the row count but must not be served as 304
+    first.is_active = False
+    db_session.commit()
+    r = client.get("/charter/versions", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()[0]["is_active"] is False
+    etag = r.headers["etag"]
+
+    first.effective_date = datetime(2025, 8, 5)
+    db_session.commit()
+    r = client.get("/charter/versions", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    # one version replaced by another: same count, different content
+    db_session.delete(first)
+    db_session.add(CharterVersion(version_name="Draft 2", effective_date=datetime(2025, 8, 5), is_active=False))
+    db_session.commit()
+    r = client.get("/charter/versions", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert [v["version_name"] for v in r.json()] == ["Draft 2"]
+    assert client.get("/charter/versions", headers={"If-None-Match": r.headers["etag"]}).status_code == 304
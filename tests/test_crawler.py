@@ -0,0 +1,372 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.services import crawler
+from app.services.browser_pool import BrowserPool
+from app.services.extraction_pool import ExtractionPool
+from app.services.crawler import ScrollProfile, _ResourceFilter, _auto_scroll, scroll_profile_for
+
+FAST = ScrollProfile(max_steps=30, max_seconds=10, stable_rounds=2, idle_ms=10, step_timeout_ms=500)
+
+
+class _Mouse:
+    def __init__(self, page):
+        self.page = page
+
+    async def wheel(self, dx, dy):
+        self.page.scrolled()
+
+
+class FakePage:
+    """scrollHeight grows `batches` times, each after a lazy-load request completes."""
+
+    def __init__(self, batches: int, load_ms: int = 30):
+        self.height = 1000
+        self.batches = batches
+        self.load_ms = load_ms
+        self.handlers = {}
+        self.mouse = _Mouse(self)
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def scrolled(self):
+        if self.batches <= 0:
+            return
+        self.batches -= 1
+        self.handlers["request"](object())
+
+        def finish():
+            self.height += 1000
+            self.handlers["requestfinished"](object())
+
+        asyncio.get_running_loop().call_later(self.load_ms / 1000, finish)
+
+    async def evaluate(self, _expr):
+        return self.height
+
+
+@pytest.mark.asyncio
+async def test_static_page_stops_after_stable_rounds():
+    result = await _auto_scroll(FakePage(batches=0), FAST)
+    assert result["stopped"] == "stable"
+    assert result["steps"] == FAST.stable_rounds
+
+
+@pytest.mark.asyncio
+async def test_infinite_scroll_keeps_going_until_content_ends():
+    page = FakePage(batches=5)
+    result = await _auto_scroll(page, FAST)
+    assert result["stopped"] == "stable"
+    assert result["height"] == 6000
+    assert result["steps"] == 5 + FAST.stable_rounds
+
+
+@pytest.mark.asyncio
+async def test_scroll_is_capped():
+    result = await _auto_scroll(FakePage(batches=100), replace(FAST, max_steps=4))
+    assert (result["stopped"], result["steps"]) == ("max_steps", 4)
+
+
+def test_scroll_profile_per_domain(monkeypatch):
+    monkeypatch.setattr(settings, "crawl_scroll_profiles", {"example.org": {"max_steps": 80, "bogus": 1}})
+    assert scroll_profile_for("https://www.example.org/list").max_steps == 80
+    assert scroll_profile_for("https://example.org/").max_steps == 80
+    assert scroll_profile_for("https://other.org/").max_steps == settings.crawl_scroll_max_steps
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url, body_size=0):
+        self.resource_type = resource_type
+        self.url = url
+        self.body_size = body_size
+
+    async def sizes(self):
+        return {"responseBodySize": self.body_size, "responseHeadersSize": 100}
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+@pytest.mark.asyncio
+async def test_resource_filter_blocks_by_type_and_pattern_and_counts_bytes():
+    resources = _ResourceFilter(["image", "font"], ["google-analytics.com"])
+    routes = [
+        FakeRoute(FakeRequest("document", "https://example.org/logo.png")),
+        FakeRoute(FakeRequest("image", "https://example.org/logo.png")),
+        FakeRoute(FakeRequest("font", "https://example.org/a.woff2")),
+        FakeRoute(FakeRequest("script", "https://www.Google-Analytics.com/ga.js")),
+        FakeRoute(FakeRequest("script", "https://example.org/app.js")),
+    ]
+    for route in routes:
+        await resources._handle(route)
+    assert [r.outcome for r in routes] == ["continued", "aborted", "aborted", "aborted", "continued"]
+
+    resources._finished(FakeRequest("document", "https://example.org/", body_size=5000))
+    resources._finished(FakeRequest("script", "https://example.org/app.js", body_size=-1))
+    assert await resources.stats() == {
+        "requests": 5,
+        "blocked": 3,
+        "blocked_by_type": {"image": 1, "font": 1, "script": 1},
+        "bytes_received": 5200,
+    }
+
+
+class FakeBrowserPage(FakePage):
+    def __init__(self, html):
+        super().__init__(batches=0)
+        self.html = html
+        self.visited = []
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def goto(self, url, **_):
+        self.visited.append(url)
+
+    async def content(self):
+        return self.html
+
+
+class FakePagePool:
+    def __init__(self, html="<html><body><h1>Rendered</h1></body></html>"):
+        self.last = FakeBrowserPage(html)
+
+    @asynccontextmanager
+    async def page(self):
+        yield self.last
+
+
+@pytest_asyncio.fixture
+async def tiered(monkeypatch):
+    pool = FakePagePool()
+    monkeypatch.setattr(crawler, "browser_pool", pool)
+    monkeypatch.setattr(crawler, "extraction_pool", ExtractionPool(workers=0))
+    monkeypatch.setattr(crawler, "scroll_profile_for", lambda url: FAST)
+    monkeypatch.setattr(settings, "crawl_static_min_entities", 5)
+    yield pool
+    await crawler.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_server_rendered_page_uses_static_tier(tiered, fixture_site):
+    result = await crawler.crawl_and_extract(f"{fixture_site}/static")
+    assert result["tier"] == "static"
+    assert len(result["entities"]["candidates"]) == 50
+    assert tiered.last.visited == []
+    assert {"fetch_ms", "parse_ms", "heuristics_ms", "clean_ms", "extract_ms", "total_ms"} <= result["timings"].keys()
+
+
+@pytest.mark.asyncio
+async def test_thin_or_failed_static_fetch_escalates_to_browser(tiered, fixture_site):
+    for path in ("/infinite", "/missing"):
+        result = await crawler.crawl_and_extract(f"{fixture_site}{path}")
+        assert result["tier"] == "browser"
+        assert result["html"] == tiered.last.html
+    assert tiered.last.visited == [f"{fixture_site}/infinite", f"{fixture_site}/missing"]
+
+
+@pytest.mark.asyncio
+async def test_crawl_reports_stages_to_progress(tiered, fixture_site):
+    seen = []
+    await crawler.crawl_and_extract(f"{fixture_site}/infinite", lambda stage, **detail: seen.append((stage, detail)))
+    stages = [stage for stage, _ in seen]
+    assert stages[:3] == ["fetching", "extracting", "fetching"]
+    assert "scrolling" in stages and stages[-2:] == ["extracting", "done"]
+    assert seen[2][1] == {"tier": "browser"} and seen[-1][1]["tier"] == "browser"
+
+
+@pytest.mark.asyncio
+async def test_static_tier_can_be_disabled(tiered, fixture_site, monkeypatch):
+    monkeypatch.setattr(settings, "crawl_static_first", False)
+    result = await crawler.crawl_and_extract(f"{fixture_site}/static")
+    assert result["tier"] == "browser"
+    assert _Fixture.hits == []
+
+
+def test_extraction_text_matches_previous_semantics():
+    html = (
+        "<!DOCTYPE html><html><head><title>T</title><style>.x{}</style></head><body>"
+        "<h1>Rahim <!-- note --> Uddin<script>var x</script> Khan</h1>"
+        "<h2>People's \x01Alliance</h2><ul><li>Karim <b>Ahmed</b></li><li>x</li></ul>"
+        "<script>document.write('Hidden Name')</script></body></html>"
+    )
+    for doc in (html, html.encode("utf-8")):
+        result = crawler._extract_with_heuristics(doc)
+        assert [p["name"] for p in result["parties"]] == ["People's Alliance"]
+        assert [c["full_name"] for c in result["candidates"]] == ["Rahim Uddin Khan", "Karim Ahmed"]
+        assert "Hidden Name" not in result["raw_text_sample"]
+
+
+def test_extraction_falls_back_to_page_text_without_main_content():
+    shell = (
+        '<html><body><div id="root"><!-- c --></div><noscript>Enable <!-- x --> JavaScript</noscript>'
+        "<script>render()</script></body></html>"
+    )
+    assert crawler._extract_with_heuristics(shell)["raw_text_sample"] == "Enable JavaScript"
+
+
+def test_extraction_handles_fragments_and_empty_input():
+    assert crawler._extract_with_heuristics("") == {"parties": [], "candidates": [], "raw_text_sample": ""}
+    result = crawler._extract_with_heuristics("<li>Abdul Karim</li>")
+    assert [c["full_name"] for c in result["candidates"]] == ["Abdul Karim"]
+    assert result["raw_text_sample"] == "Abdul Karim"
+
+
+def test_extraction_matches_benchmark_golden():
+    from benchmarks.bench_extraction import HERE, golden_check, load_pages, synthetic_page
+
+    pages = load_pages(HERE / "corpus") + [("synthetic_2000", synthetic_page(2000).encode("utf-8"))]
+    assert len(pages) > 1
+    assert golden_check(pages, update=False) == []
+
+
+@pytest.mark.asyncio
+async def test_extraction_runs_in_worker_process():
+    pool = ExtractionPool(workers=1)
+    try:
+        await pool.start()
+        entities, timings = await pool.run(crawler._extract_job, STATIC_PAGE.encode("utf-8"))
+    finally:
+        pool.shutdown()
+    expected = crawler._extract_with_heuristics(STATIC_PAGE)
+    key = lambda c: c["full_name"]  # noqa: E731
+    assert sorted(entities["candidates"], key=key) == sorted(expected["candidates"], key=key)
+    assert entities["raw_text_sample"] == expected["raw_text_sample"]
+    assert timings["parse_ms"] >= 0
+    assert pool.stats()["submitted"] == 1
+
+
+# --- real browser against local fixture pages (skipped without Chromium) ---
+
+STATIC_PAGE = "<html><body><h1>Candidates</h1><ul>" + "".join(
+    f"<li>Candidate Number {i}</li>" for i in range(50)
+) + "</ul></body></html>"
+
+INFINITE_PAGE = """<html><body><ul id="list"><li style="height:2000px">Candidate Number 0</li></ul>
+<script>
+let batch = 0, loading = false;
+window.addEventListener('scroll', async () => {
+  if (loading || batch >= 4) return;
+  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 10) return;
+  loading = true;
+  const r = await fetch('/more?batch=' + (++batch));
+  const li = document.createElement('li');
+  li.style.height = '2000px';
+  li.textContent = await r.text();
+  document.getElementById('list').appendChild(li);
+  loading = false;
+});
+</script></body></html>"""
+
+HEAVY_PAGE = """<html><head>
+<link rel="preload" href="/asset/font.woff2" as="font" crossorigin>
+<script src="https://www.google-analytics.com/analytics.js"></script>
+</head><body><h1>People's Alliance</h1>
+<img src="/asset/banner.png"><img src="/asset/photo.jpg">
+<video src="/asset/clip.mp4" autoplay muted></video>
+<ul><li>Candidate Number 1</li></ul></body></html>"""
+
+ASSET = b"\0" * 512 * 1024
+
+
+class _Fixture(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):  # noqa: N802
+        parts = urlsplit(self.path)
+        self.hits.append(parts.path)
+        if parts.path.startswith("/asset/"):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(ASSET)))
+            self.end_headers()
+            self.wfile.write(ASSET)
+            return
+        if parts.path == "/static":
+            body = STATIC_PAGE
+        elif parts.path == "/infinite":
+            body = INFINITE_PAGE
+        elif parts.path == "/heavy":
+            body = HEAVY_PAGE
+        elif parts.path == "/more":
+            body = f"Candidate Number {parse_qs(parts.query)['batch'][0]}"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_site():
+    _Fixture.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest_asyncio.fixture
+async def real_pool(monkeypatch):
+    pool = BrowserPool(max_pages=1, recycle_after=0)
+    try:
+        async with pool.page():
+            pass
+    except Exception as exc:
+        await pool.close()
+        pytest.skip(f"Chromium not available: {type(exc).__name__}")
+    monkeypatch.setattr(crawler, "browser_pool", pool)
+    monkeypatch.setattr(crawler, "extraction_pool", ExtractionPool(workers=0))
+    monkeypatch.setattr(crawler, "scroll_profile_for", lambda url: FAST)
+    monkeypatch.setattr(settings, "crawl_static_first", False)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browser_static_fixture_stops_early(real_pool, fixture_site):
+    result = await crawler.crawl_and_extract(f"{fixture_site}/static")
+    assert result["scroll"]["stopped"] == "stable"
+    assert result["scroll"]["steps"] == FAST.stable_rounds
+    assert "Candidate Number 49" in result["html"]
+
+
+@pytest.mark.asyncio
+async def test_browser_infinite_fixture_loads_every_batch(real_pool, fixture_site):
+    result = await crawler.crawl_and_extract(f"{fixture_site}/infinite")
+    assert result["scroll"]["stopped"] == "stable"
+    assert "Candidate Number 4" in result["html"]
+
+
+@pytest.mark.asyncio
+async def test_browser_heavy_fixture_skips_assets(real_pool, fixture_site):
+    result = await crawler.crawl_and_extract(f"{fixture_site}/heavy")
+    network = result["network"]
+    assert network["blocked"] >= 4
+    assert network["bytes_received"] < len(ASSET)
+    assert not any(path.startswith("/asset/") for path in _Fixture.hits)
+    assert "People's Alliance" in result["html"]
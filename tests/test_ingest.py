@@ -0,0 +1,675 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.core.config import settings
+from app.main import app
+from app.api.v1.endpoints import ingest
+from app.services import approved_store, crawl_runner, job_registry, resolution
+from app.services.approved_store import JsonlApprovedStore
+from app.services.blob_store import BlobStore, SqlBlobStore
+from app.services.crawl_cache import CrawlCache, normalize_url
+from app.services.job_events import JobEventHub
+from app.services.job_registry import JobRegistry, _make_engine
+from app.services.scheduler import CrawlScheduler, QueueFull
+
+_FAKE_RESULT = {
+    "html": "<html><h2>Alpha Party</h2></html>",
+    "entities": {
+        "parties": [{"name": "Alpha Party", "abbrev": None, "logo_url": None, "description": None}],
+        "candidates": [],
+        "raw_text_sample": "Alpha Party",
+    },
+}
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    reg = JobRegistry(_make_engine(f"sqlite:///{tmp_path / 'registry.db'}"), tmp_path / "results")
+    monkeypatch.setattr(job_registry, "_job_registry_singleton", reg)
+    monkeypatch.setattr(approved_store, "_approved_store_singleton", JsonlApprovedStore(tmp_path / "approved"))
+    monkeypatch.setattr(ingest, "crawl_cache", CrawlCache(ttl=900))
+    monkeypatch.setattr(ingest, "crawl_scheduler", CrawlScheduler(concurrency=2, max_queue=100))
+    return reg
+
+
+@pytest.fixture
+def fake_crawl(monkeypatch):
+    calls = []
+
+    async def _crawl(url: str, progress=None):
+        calls.append(url)
+        await asyncio.sleep(0)
+        if "broken" in url:
+            raise RuntimeError("boom")
+        return _FAKE_RESULT
+
+    monkeypatch.setattr(crawl_runner, "crawl_and_extract", _crawl)
+    return calls
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test/api/v1") as ac:
+        yield ac
+
+
+async def _wait_for(client: AsyncClient, job_id: str, statuses=("success", "error")) -> dict:
+    for _ in range(200):
+        job = (await client.get(f"/ingest/jobs/{job_id}")).json()
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job['status']}")
+
+
+@pytest.mark.asyncio
+async def test_job_lifecycle_keeps_result_out_of_registry(registry, fake_crawl, client: AsyncClient):
+    r = await client.post("/ingest/jobs", json={"url": "https://example.org/parties"})
+    assert r.status_code == 202, r.text
+    job = await _wait_for(client, r.json()["id"])
+    assert job["status"] == "success"
+    assert job["result"]["entities"]["parties"][0]["name"] == "Alpha Party"
+
+    assert job["result"]["html_bytes"] == len(_FAKE_RESULT["html"])
+    assert "html" not in job["result"]
+
+    # The registry row only points at the blob; listing never reads it.
+    row = registry.list(limit=1)[0]
+    assert set(row) == {"id", "url", "status", "created_at", "updated_at"}
+    assert registry.get(job["id"], with_result=True, with_html=True)["result"] == {
+        **_FAKE_RESULT,
+        "html_ref": job["result"]["html_ref"],
+        "html_bytes": job["result"]["html_bytes"],
+        "entities_ref": job["result"]["entities_ref"],
+    }
+
+    r = await client.get(f"/ingest/jobs/{job['id']}/html")
+    assert r.status_code == 200
+    assert r.text == _FAKE_RESULT["html"]
+    assert r.headers["content-type"].startswith("text/plain")
+
+    r = await client.post("/ingest/jobs", json={"url": "https://broken.example.org/"})
+    failed = await _wait_for(client, r.json()["id"])
+    assert failed["status"] == "error" and "boom" in failed["error"]
+
+    assert (await client.get("/ingest/jobs/does-not-exist")).status_code == 404
+    assert (await client.get(f"/ingest/jobs/{failed['id']}/html")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_identical_crawls_share_blobs(registry, fake_crawl, client: AsyncClient):
+    ids = [(await client.post("/ingest/jobs", json={"url": f"https://example.org/{i}"})).json()["id"] for i in range(3)]
+    jobs = [await _wait_for(client, job_id) for job_id in ids]
+    assert len({j["result"]["html_ref"] for j in jobs}) == 1
+    # one html blob + one entities blob + one manifest (results are identical here)
+    assert len([p for p in registry.blobs.root.rglob("*") if p.is_file()]) == 3
+
+
+def test_results_saved_before_blob_store_still_load(registry):
+    registry.create("pre-blob", "https://example.org/old")
+    (registry.results_dir / "pre-blob.json").write_text(json.dumps(_FAKE_RESULT))
+    registry.update("pre-blob", status="success", result_ref="pre-blob.json")
+    assert registry.get("pre-blob")["result"] == {"entities": _FAKE_RESULT["entities"]}
+    assert registry.load_html("pre-blob.json") == _FAKE_RESULT["html"]
+
+    assert registry.migrate_result_files() == 1
+    job = registry.get("pre-blob", with_html=True)
+    assert job["result_ref"].startswith("blob:")
+    assert {k: job["result"][k] for k in _FAKE_RESULT} == _FAKE_RESULT
+    assert not (registry.results_dir / "pre-blob.json").exists()
+    assert registry.migrate_result_files() == 0
+
+
+def test_results_crawled_elsewhere_load_from_the_shared_blob_store(tmp_path):
+    # A crawl worker and an API worker: one registry database, nothing else on disk in common
+    url = f"sqlite:///{tmp_path / 'registry.db'}"
+    worker = JobRegistry(_make_engine(url), tmp_path / "worker" / "results", SqlBlobStore(_make_engine(url)))
+    api = JobRegistry(_make_engine(url), tmp_path / "api" / "results", SqlBlobStore(_make_engine(url)))
+
+    worker.create("job-1", "https://example.org/a")
+    ref = worker.save_result("job-1", _FAKE_RESULT)
+    worker.remember_crawl("k", "https://example.org/a", ref)
+
+    assert api.get("job-1")["result"]["entities"] == _FAKE_RESULT["entities"]
+    assert api.load_html(ref) == _FAKE_RESULT["html"]
+    # the crawl cache hands out refs another worker can follow too
+    cached = api.cached_crawls(["k"], datetime.utcnow() - timedelta(minutes=1))
+    assert api.load_result(cached["k"])["entities"] == _FAKE_RESULT["entities"]
+    assert not list((tmp_path / "worker").rglob("blobs"))
+
+    # per-host files: the API worker cannot see what the crawl worker wrote
+    local = JobRegistry(_make_engine(url), tmp_path / "api" / "results", BlobStore(tmp_path / "api" / "blobs"))
+    worker_files = JobRegistry(_make_engine(url), tmp_path / "w2" / "results", BlobStore(tmp_path / "w2" / "blobs"))
+    worker_files.create("job-2", "https://example.org/b")
+    assert local.load_html(worker_files.save_result("job-2", _FAKE_RESULT)) is None
+
+
+@pytest.mark.asyncio
+async def test_list_jobs_status_filter_and_keyset_pages(registry, client: AsyncClient):
+    for i in range(5):
+        registry.create(f"job-{i}", f"https://example.org/{i}")
+    registry.update("job-1", status="error", error="x")
+    registry.update("job-3", status="error", error="y")
+
+    seen, params = [], {"limit": 2}
+    while True:
+        r = await client.get("/ingest/jobs", params=params)
+        assert r.status_code == 200, r.text
+        seen += [j["id"] for j in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+    assert seen == ["job-4", "job-3", "job-2", "job-1", "job-0"]
+
+    r = await client.get("/ingest/jobs", params={"status": "error"})
+    assert [j["id"] for j in r.json()] == ["job-3", "job-1"]
+    r = await client.get("/ingest/jobs", params=[("status", "error"), ("status", "queued")])
+    assert len(r.json()) == 5
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://EC.gov.bd:443/list?b=2&utm_source=x&a=1#top") == "https://ec.gov.bd/list?a=1&b=2"
+    assert normalize_url("http://ec.gov.bd") == "http://ec.gov.bd/"
+    assert normalize_url("http://ec.gov.bd:8080/x?fbclid=1") == "http://ec.gov.bd:8080/x"
+    assert normalize_url("http://ec.gov.bd/List") != normalize_url("http://ec.gov.bd/list")
+
+
+@pytest.mark.asyncio
+async def test_repeat_submission_is_answered_from_crawl_cache(registry, fake_crawl, client: AsyncClient):
+    first = (await client.post("/ingest/jobs", json={"url": "https://example.org/list?a=1"})).json()
+    await _wait_for(client, first["id"])
+
+    r = await client.post("/ingest/jobs", json={"url": "https://EXAMPLE.org/list?a=1&utm_medium=email"})
+    assert r.status_code == 202
+    repeat = r.json()
+    assert repeat["status"] == "success" and repeat["id"] != first["id"]
+    job = (await client.get(f"/ingest/jobs/{repeat['id']}")).json()
+    # same entities, and the crawl it reuses is not listed as a match
+    parties = [{**p, "matches": []} for p in _FAKE_RESULT["entities"]["parties"]]
+    assert job["result"]["entities"] == {**_FAKE_RESULT["entities"], "parties": parties}
+    assert fake_crawl == ["https://example.org/list?a=1"]
+
+    stats = (await client.get("/ingest/cache/stats")).json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    ingest.crawl_cache.ttl = 0
+    r = await client.post("/ingest/jobs", json={"url": "https://example.org/list?a=1"})
+    assert r.json()["status"] == "queued"
+    await _wait_for(client, r.json()["id"])
+    assert len(fake_crawl) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_one_crawl(registry, monkeypatch, client: AsyncClient):
+    gate = asyncio.Event()
+    calls = []
+
+    async def slow_crawl(url, progress=None):
+        calls.append(url)
+        await gate.wait()
+        if "broken" in url:
+            raise RuntimeError("boom")
+        return _FAKE_RESULT
+
+    monkeypatch.setattr(crawl_runner, "crawl_and_extract", slow_crawl)
+    monkeypatch.setattr(ingest, "crawl_scheduler", CrawlScheduler(concurrency=4, max_queue=10))
+
+    for url in ("https://example.org/same", "https://broken.example.org/"):
+        ids = [(await client.post("/ingest/jobs", json={"url": url})).json()["id"] for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert len(calls) == 1 and (await client.get("/ingest/cache/stats")).json()["waiting"] == 2
+        gate.set()
+        jobs = [await _wait_for(client, job_id) for job_id in ids]
+        gate.clear()
+        calls.clear()
+        if "broken" in url:
+            assert {j["status"] for j in jobs} == {"error"}
+            assert all("boom" in j["error"] for j in jobs)
+        else:
+            assert {j["status"] for j in jobs} == {"success"}
+            assert len({j["result"]["entities_ref"] for j in jobs}) == 1
+
+    stats = (await client.get("/ingest/cache/stats")).json()
+    assert stats["coalesced"] == 4 and stats["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_submission_and_progress(registry, fake_crawl, client: AsyncClient):
+    first = (await client.post("/ingest/jobs", json={"url": "https://a.example.org/cached"})).json()
+    await _wait_for(client, first["id"])
+
+    urls = [
+        "https://a.example.org/cached",
+        "https://a.example.org/1",
+        "https://b.example.org/1",
+        "https://b.example.org/1#dup",
+        "https://broken.example.org/",
+    ]
+    r = await client.post("/ingest/jobs/batch", json={"urls": urls})
+    assert r.status_code == 202, r.text
+    batch = r.json()
+    assert [j["url"] for j in batch["jobs"]] == urls
+    assert batch["jobs"][0]["status"] == "success"
+
+    for job in batch["jobs"]:
+        await _wait_for(client, job["id"])
+    # cached URL and the in-batch duplicate were not crawled again
+    assert sorted(fake_crawl) == sorted(["https://a.example.org/cached", *urls[1:3], urls[4]])
+
+    progress = (await client.get(f"/ingest/batches/{batch['batch_id']}")).json()
+    assert progress["total"] == 5 and progress["done"]
+    assert progress["counts"] == {"success": 4, "error": 1}
+
+    assert (await client.get("/ingest/batches/nope")).status_code == 404
+    assert (await client.post("/ingest/jobs/batch", json={"urls": []})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_is_rejected_whole_when_queue_cannot_take_it(registry, fake_crawl, monkeypatch, client: AsyncClient):
+    monkeypatch.setattr(ingest, "crawl_scheduler", CrawlScheduler(concurrency=1, max_queue=2))
+    r = await client.post("/ingest/jobs/batch", json={"urls": [f"https://example.org/{i}" for i in range(3)]})
+    assert r.status_code == 503
+    assert registry.list() == []
+    assert registry.flight_stats() == {"inflight": 0, "waiting": 0}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_per_host_limits_and_delay():
+    sched = CrawlScheduler(concurrency=4, max_queue=20, per_host=1, host_delay=0.05)
+    starts = {}
+    active = {"slow.example": 0}
+    peak = [0]
+
+    def job(name, host):
+        async def run():
+            starts[name] = asyncio.get_running_loop().time()
+            if host == "slow.example":
+                active[host] += 1
+                peak[0] = max(peak[0], active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+        return run
+
+    for i in range(3):
+        sched.submit(f"slow-{i}", job(f"slow-{i}", "slow.example"), host="slow.example")
+    for i in range(3):
+        sched.submit(f"fast-{i}", job(f"fast-{i}", f"host{i}.example"), host=f"host{i}.example")
+
+    for _ in range(200):
+        if sched.completed == 6:
+            break
+        await asyncio.sleep(0.01)
+    assert sched.completed == 6 and peak[0] == 1
+    slow = sorted(starts[f"slow-{i}"] for i in range(3))
+    assert all(b - a >= 0.045 for a, b in zip(slow, slow[1:]))
+    # other hosts were not held up behind the slow host's delay
+    assert max(starts[f"fast-{i}"] for i in range(3)) < slow[1]
+    assert sched.stats()["queued"] == 0
+    assert await sched.shutdown() == []
+
+
+def test_legacy_job_files_are_imported(tmp_path):
+    legacy = {
+        "id": "old-job",
+        "url": "https://example.org/old",
+        "status": "success",
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": "2025-01-01T00:05:00",
+        "result": _FAKE_RESULT,
+        "error": None,
+    }
+    (tmp_path / "old-job.json").write_text(json.dumps(legacy))
+    reg = JobRegistry(_make_engine(f"sqlite:///{tmp_path / 'registry.db'}"), tmp_path / "results")
+
+    assert reg.import_legacy(tmp_path) == 1
+    job = reg.get("old-job", with_html=True)
+    assert job["status"] == "success"
+    assert {k: job["result"][k] for k in _FAKE_RESULT} == _FAKE_RESULT
+    assert job["updated_at"].isoformat() == "2025-01-01T00:05:00"
+    assert reg.import_legacy(tmp_path) == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrency_and_honours_priority():
+    sched = CrawlScheduler(concurrency=2, max_queue=3)
+    gate = asyncio.Event()
+    running, peak, order = set(), [0], []
+
+    def job(name):
+        async def run():
+            running.add(name)
+            peak[0] = max(peak[0], len(running))
+            order.append(name)
+            await gate.wait()
+            running.discard(name)
+        return run
+
+    sched.submit("a", job("a"))
+    sched.submit("b", job("b"))
+    await asyncio.sleep(0)  # both workers pick up a job
+    sched.submit("low", job("low"), priority=0)
+    sched.submit("high", job("high"), priority=5)
+    sched.submit("low2", job("low2"), priority=0)
+    with pytest.raises(QueueFull):
+        sched.submit("overflow", job("overflow"))
+
+    stats = sched.stats()
+    assert stats["running"] == 2 and stats["queued"] == 3 and stats["rejected"] == 1
+
+    gate.set()
+    for _ in range(50):
+        if sched.completed == 5:
+            break
+        await asyncio.sleep(0)
+    assert peak[0] == 2
+    assert order == ["a", "b", "high", "low", "low2"]
+    assert sched.stats()["wait_seconds"]["p50"] is not None
+    assert await sched.shutdown() == []
+
+
+@pytest.mark.asyncio
+async def test_scheduler_shutdown_cancels_running_and_returns_queued():
+    sched = CrawlScheduler(concurrency=1, max_queue=5)
+    cancelled = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    sched.submit("running", forever)
+    await asyncio.sleep(0)
+    sched.submit("waiting", forever)
+    assert await sched.shutdown() == ["waiting"]
+    assert cancelled == [True]
+
+
+@pytest.mark.asyncio
+async def test_create_job_sheds_load_when_queue_full(registry, monkeypatch, client: AsyncClient):
+    monkeypatch.setattr(ingest, "crawl_scheduler", CrawlScheduler(concurrency=1, max_queue=0))
+    r = await client.post("/ingest/jobs", json={"url": "https://example.org/"})
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "30"
+    assert registry.list() == []
+
+    stats = (await client.get("/ingest/scheduler/stats")).json()
+    assert stats["rejected"] == 1
+
+
+def test_flights_coalesce_across_workers(registry):
+    # two workers submit the same URL: one leads, the other follows it
+    hour_ago = datetime.utcnow() - timedelta(hours=1)
+    assert registry.claim_flights({"k": "lead"}, hour_ago, hour_ago) == {"k": "lead"}
+    assert registry.claim_flights({"k": "other"}, hour_ago, hour_ago) == {"k": "lead"}
+    registry.create_many([{"id": "lead", "url": "https://example.org/"}, {"id": "early", "url": "https://example.org/"}])
+    assert registry.follow([("lead", "early")]) == {}
+    assert registry.flight_stats() == {"inflight": 1, "waiting": 1}
+
+    registry.update("lead", status="success", result_ref="blob:x")
+    registry.land_flight("k", "lead", status="success", result_ref="blob:x", error=None)
+    assert registry.get("early", with_result=False)["status"] == "success"
+
+    # a follower attached after the leader landed takes its outcome itself
+    registry.create("late", "https://example.org/")
+    assert registry.follow([("lead", "late")]) == {"late": {"status": "success", "result_ref": "blob:x", "error": None}}
+    assert registry.get("late", with_result=False)["result_ref"] == "blob:x"
+    assert registry.flight_stats() == {"inflight": 0, "waiting": 0}
+
+    # a claim whose leader job was never written is taken over once stale
+    registry.claim_flights({"k2": "lost"}, datetime.utcnow(), datetime.utcnow())
+    later = datetime.utcnow() + timedelta(seconds=1)
+    assert registry.claim_flights({"k2": "new"}, later, hour_ago) == {"k2": "new"}
+
+
+def test_flights_of_silent_leaders_are_taken_over(registry):
+    # taken over as soon as the running leader's heartbeat is older than orphaned_before,
+    # long before the claim itself goes stale
+    hour_ago, now = datetime.utcnow() - timedelta(hours=1), datetime.utcnow()
+    registry.create_many([{"id": "dead", "url": "https://example.org/"}, {"id": "waiting", "url": "https://example.org/w"}])
+    assert registry.claim_flights({"k": "dead", "w": "waiting"}, hour_ago, hour_ago) == {"k": "dead", "w": "waiting"}
+    registry.update("dead", status="running", updated_at=now - timedelta(minutes=10))
+    orphaned_before = now - timedelta(minutes=5)
+
+    assert registry.claim_flights({"k": "a", "w": "b"}, hour_ago, orphaned_before) == {"k": "a", "w": "waiting"}
+    assert registry.claim_flights({"k": "c"}, hour_ago, orphaned_before) == {"k": "a"}
+    # once the new leader runs and heartbeats, it keeps the flight
+    registry.create("a", "https://example.org/")
+    registry.update("a", status="running")
+    assert registry.claim_flights({"k": "d"}, hour_ago, orphaned_before) == {"k": "a"}
+    # ...until it finishes without landing it
+    registry.update("a", status="error")
+    assert registry.claim_flights({"k": "e"}, hour_ago, orphaned_before) == {"k": "e"}
+
+
+@pytest.mark.asyncio
+async def test_crawls_run_as_celery_tasks(registry, fake_crawl, monkeypatch, client: AsyncClient):
+    from app.worker import celery_app
+
+    monkeypatch.setattr(settings, "crawl_executor", "celery")
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    # nothing goes through this worker's scheduler
+    monkeypatch.setattr(ingest, "crawl_scheduler", CrawlScheduler(concurrency=1, max_queue=0))
+
+    r = await client.post("/ingest/jobs/batch", json={"urls": ["https://example.org/a", "https://broken.example.org/"]})
+    assert r.status_code == 202, r.text
+    jobs = [await _wait_for(client, job["id"]) for job in r.json()["jobs"]]
+    assert [j["status"] for j in jobs] == ["success", "error"]
+    assert sorted(fake_crawl) == ["https://broken.example.org/", "https://example.org/a"]
+
+    # redelivery of a finished job's task does nothing
+    from app.worker import crawl_job
+
+    result = await asyncio.to_thread(crawl_job.apply, args=(jobs[0]["id"], jobs[0]["url"], "k"))
+    assert result.successful()
+    assert len(fake_crawl) == 2
+
+
+@pytest.mark.asyncio
+async def test_orphaned_running_jobs_are_recovered(registry, fake_crawl, client: AsyncClient):
+    registry.create_many([{"id": "orphan", "url": "https://example.org/o"}, {"id": "alive", "url": "https://example.org/l"}])
+    registry.update("orphan", status="running", updated_at=datetime.utcnow() - timedelta(hours=1))
+    registry.update("alive", status="running")
+
+    assert await ingest.recover_crawls() == 1
+    assert (await _wait_for(client, "orphan"))["status"] == "success"
+    assert registry.get("alive", with_result=False)["status"] == "running"
+    assert fake_crawl == ["https://example.org/o"]
+    assert await ingest.recover_crawls() == 0
+
+
+@pytest.mark.asyncio
+async def test_orphans_are_swept_after_startup(registry, fake_crawl, client: AsyncClient):
+    sweeper = asyncio.create_task(ingest.sweep_crawls(0.05))
+    try:
+        # a worker dies mid-crawl while this one is already up
+        registry.create("late-orphan", "https://example.org/late")
+        registry.update("late-orphan", status="running", updated_at=datetime.utcnow() - timedelta(hours=1))
+        assert (await _wait_for(client, "late-orphan"))["status"] == "success"
+    finally:
+        sweeper.cancel()
+    assert fake_crawl == ["https://example.org/late"]
+
+
+def _parse_sse(body: str) -> list:
+    return [
+        json.loads(line[len("data: "):])
+        for block in body.split("\n\n")
+        for line in block.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_job_events_stream_status_and_stages(registry, monkeypatch, client: AsyncClient):
+    hub = JobEventHub()
+    monkeypatch.setattr(crawl_runner, "job_events", hub)
+    monkeypatch.setattr(ingest, "job_events", hub)
+    gate = asyncio.Event()
+
+    async def staged_crawl(url, progress):
+        await gate.wait()
+        progress("fetching", tier="static")
+        progress("extracting", html_bytes=42)
+        progress("done", tier="static", total_ms=1.0)
+        return _FAKE_RESULT
+
+    monkeypatch.setattr(crawl_runner, "crawl_and_extract", staged_crawl)
+
+    leader = (await client.post("/ingest/jobs", json={"url": "https://example.org/live"})).json()
+    follower = (await client.post("/ingest/jobs", json={"url": "https://example.org/live"})).json()
+    await _wait_for(client, leader["id"], statuses=("running",))
+
+    viewers = [
+        asyncio.create_task(client.get(f"/ingest/jobs/{job_id}/events"))
+        for job_id in (leader["id"], leader["id"], follower["id"])
+    ]
+    while hub.stats()["viewers"] < 3:
+        await asyncio.sleep(0.01)
+    assert hub.stats()["jobs_watched"] == 2
+    gate.set()
+    responses = await asyncio.gather(*viewers)
+
+    assert responses[0].headers["content-type"].startswith("text/event-stream")
+    first, second, follow = (_parse_sse(r.text) for r in responses)
+    assert [(e["type"], e.get("stage") or e.get("status")) for e in first] == [
+        ("status", "running"),
+        ("progress", "fetching"),
+        ("progress", "extracting"),
+        ("progress", "done"),
+        ("status", "success"),
+    ]
+    assert second == first
+    assert [e["status"] for e in follow] == ["queued", "success"]
+    assert hub.stats()["viewers"] == 0
+
+    # a finished job's stream is just its final status
+    r = await client.get(f"/ingest/jobs/{leader['id']}/events")
+    assert [e["status"] for e in _parse_sse(r.text)] == ["success"]
+    assert (await client.get("/ingest/jobs/nope/events")).status_code == 404
+    assert hub.stats()["viewers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_approve_writes_each_kind_once(registry, tmp_path, monkeypatch, client: AsyncClient):
+    store = JsonlApprovedStore(tmp_path / "approved")
+    monkeypatch.setattr(approved_store, "_approved_store_singleton", store)
+    appends = []
+    real_append = store.append
+    monkeypatch.setattr(store, "append", lambda kind, rows: appends.append(kind) or real_append(kind, rows))
+
+    registry.create("done", "https://example.org/")
+    registry.save_result(
+        "done",
+        {
+            "html": "<html></html>",
+            "entities": {
+                "parties": [{"name": "Alpha Party"}],
+                "candidates": [{"full_name": f"Candidate {i}", "party_guess": None} for i in range(3)],
+            },
+        },
+    )
+    items = [
+        {"kind": "candidate", "index": 2, "overrides": {"party_guess": "Alpha Party"}},
+        {"kind": "candidate", "index": 0},
+        {"kind": "party", "index": 0, "overrides": {"abbrev": "AP"}},
+    ]
+
+    r = await client.post("/ingest/jobs/done/approve", json={"items": items + [{"kind": "candidate", "index": 9}]})
+    assert r.status_code == 404 and "candidate 9" in r.json()["detail"]
+    r = await client.post("/ingest/jobs/done/approve", json={"items": items + [items[1]]})
+    assert r.status_code == 400
+    assert appends == []
+
+    r = await client.post("/ingest/jobs/done/approve", json={"items": items})
+    assert r.status_code == 200, r.text
+    assert r.json()["counts"] == {"party": 1, "candidate": 2}
+    assert sorted(appends) == ["candidate", "party"]
+    lines = (tmp_path / "approved" / "candidate.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"full_name": "Candidate 2", "party_guess": "Alpha Party"},
+        {"full_name": "Candidate 0", "party_guess": None},
+    ]
+    party = json.loads((tmp_path / "approved" / "party.jsonl").read_text(encoding="utf-8"))
+    assert party == {"name": "Alpha Party", "abbrev": "AP"}
+
+    registry.create("pending", "https://example.org/p")
+    assert (await client.post("/ingest/jobs/pending/approve", json={"items": items})).status_code == 400
+    assert (await client.post("/ingest/jobs/nope/approve", json={"items": items})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_extracted_entities_link_to_likely_matches(registry, monkeypatch, client: AsyncClient):
+    pages = {
+        "https://example.org/a": [
+            {"full_name": "Rahim Uddin", "constituency_guess": "Dhaka-1"},
+            {"full_name": "Karim Ahmed"},
+        ],
+        "https://example.org/b": [
+            {"full_name": "Md. Rahim Uddin", "constituency_guess": "Dhaka-1"},
+            {"full_name": "Karim Ahmad"},
+            {"full_name": "Rahim Uddin", "constituency_guess": "Sylhet-3"},
+            {"full_name": "Selina Begum"},
+        ],
+    }
+
+    async def _crawl(url: str, progress=None):
+        return {"html": url, "entities": {"parties": [], "candidates": pages[url]}}
+
+    monkeypatch.setattr(crawl_runner, "crawl_and_extract", _crawl)
+    approved_store.get_approved_store().append("candidate", [{"full_name": "Karim Ahmed", "party_guess": "BNP"}])
+
+    first = await _wait_for(client, (await client.post("/ingest/jobs", json={"url": "https://example.org/a"})).json()["id"])
+    rahim, karim = first["result"]["entities"]["candidates"]
+    assert rahim["matches"] == []
+    assert karim["matches"] == [{
+        "source": "approved",
+        "key": "karim ahmed|bnp|",
+        "href": "/api/v1/public/candidates/by-key?key=karim+ahmed%7Cbnp%7C",
+        "name": "Karim Ahmed",
+        "similarity": 1.0,
+    }]
+    # reviewers can follow the link to the approved row
+    r = await client.get("http://test" + karim["matches"][0]["href"])
+    assert r.status_code == 200, r.text
+    assert r.json()["fullName"] == "Karim Ahmed" and r.json()["partyName"] == "BNP"
+    r = await client.get("/public/candidates/by-key", params={"key": "nobody||"})
+    assert r.status_code == 404
+
+    second = await _wait_for(client, (await client.post("/ingest/jobs", json={"url": "https://example.org/b"})).json()["id"])
+    md_rahim, karim_ahmad, other_rahim, selina = second["result"]["entities"]["candidates"]
+    assert [(m["source"], m.get("job_id"), m.get("index")) for m in md_rahim["matches"]] == [("extracted", first["id"], 0)]
+    assert [m["source"] for m in karim_ahmad["matches"]] == ["approved", "extracted"]
+    assert karim_ahmad["matches"][0]["similarity"] < 1.0
+    assert other_rahim["matches"] == []  # same name, other constituency
+    assert selina["matches"] == []
+
+    # a job answered from the crawl cache does not match the crawl it reuses
+    again = await _wait_for(client, (await client.post("/ingest/jobs", json={"url": "https://example.org/a"})).json()["id"])
+    assert [m["source"] for m in again["result"]["entities"]["candidates"][1]["matches"]] == ["approved", "extracted"]
+    assert again["result"]["entities"]["candidates"][1]["matches"][1]["job_id"] == second["id"]
+
+
+@pytest.mark.asyncio
+async def test_job_reads_only_catch_up_on_approvals_indexed_at_startup(registry, monkeypatch):
+    store = approved_store.get_approved_store()
+    store.append("candidate", [{"full_name": f"Candidate {i}"} for i in range(5)])
+    monkeypatch.setattr(resolution, "_SYNC_BATCH", 2)
+    resolver = resolution.get_entity_resolver()
+
+    # what a job read does: one batch at most
+    assert await resolution.sync_approved(resolver, store, max_batches=1) == 2
+    assert resolver.approved_after("candidate") == 1
+    # the startup task indexes the rest
+    await resolution.warm_up(store)
+    assert resolver.approved_after("candidate") == 4
@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.models.approved_entity import ApprovedCandidate, ApprovedParty, ApprovedTerm
+from app.services import approved_store
+from app.services.approved_store import JsonlApprovedStore, SqlApprovedStore, normalize_party
+from app.services.catalog import ApprovedCatalog
+from app.services.search import CandidateIndex
+from app.utils.response_cache import ResponseCache, response_cache
+
+
+def _append(path, *rows):
+    with path.open("a", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r) + "\n")
+
+
+@pytest.fixture
+def approved_dir(tmp_path, monkeypatch):
+    response_cache.invalidate()
+    monkeypatch.setattr(approved_store, "_approved_store_singleton", JsonlApprovedStore(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def sql_store(monkeypatch):
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for model in (ApprovedParty, ApprovedCandidate, ApprovedTerm):
+        model.__table__.create(engine)
+    response_cache.invalidate()
+    store = SqlApprovedStore(sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True))
+    monkeypatch.setattr(approved_store, "_approved_store_singleton", store)
+    return store
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test/api/v1") as ac:
+        yield ac
+
+
+def test_catalog_reads_only_appended_tail(tmp_path):
+    path = tmp_path / "party.jsonl"
+    catalog = ApprovedCatalog(path, normalize_party)
+    assert catalog.items() == []
+
+    _append(path, {"name": "Alpha Party"})
+    assert [r["name"] for r in catalog.items()] == ["Alpha Party"]
+    first_offset = catalog.generation
+
+    # A partially written line is left for the next refresh.
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"name": "Beta')
+    assert len(catalog.items()) == 1
+    assert catalog.generation == first_offset
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write(' League"}\nnot json\n')
+    assert [r["name"] for r in catalog.items()] == ["Alpha Party", "Beta League"]
+
+    # Replacing the file triggers a full reload.
+    path.unlink()
+    _append(path, {"full_name": "Gamma Front"})
+    assert [r["name"] for r in catalog.items()] == ["Gamma Front"]
+
+
+@pytest.mark.asyncio
+async def test_public_lists_pick_up_new_approvals(approved_dir, client: AsyncClient):
+    _append(approved_dir / "party.jsonl", {"name": "Alpha Party", "logo_url": "a.png"}, {"name": "Beta League"})
+    _append(
+        approved_dir / "candidate.jsonl",
+        {"full_name": "Rahim Uddin", "party_guess": "Alpha Party", "constituency_guess": "Dhaka-1"},
+    )
+
+    r = await client.get("/public/parties", params={"search": "alpha"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["total"] == 1
+    assert data["items"][0] == {
+        "id": None,
+        "name": "Alpha Party",
+        "abbrev": None,
+        "logoUrl": "a.png",
+        "description": None,
+    }
+
+    _append(
+        approved_dir / "candidate.jsonl",
+        {"full_name": "Karim Ahmed", "party_guess": "Beta League", "constituency_guess": "Dhaka-2"},
+    )
+    r = await client.get("/public/candidates", params={"party": "beta"})
+    assert r.status_code == 200, r.text
+    assert [c["fullName"] for c in r.json()["items"]] == ["Karim Ahmed"]
+
+    r = await client.get("/public/candidates", params={"page": 1, "size": 1})
+    assert r.json()["total"] == 2
+
+
+def test_candidate_index_filters_and_ranking():
+    index = CandidateIndex()
+    rows = [
+        {"fullName": "Rahim Uddin", "partyName": "Bangladesh Awami League", "constituencyName": "Dhaka-1", "bio": None},
+        {"fullName": "Karim Ahmed", "partyName": "BNP", "constituencyName": "Dhaka-10", "bio": "Worked with Rahim"},
+        {"fullName": "Rahima Khatun", "partyName": "Bangladesh Awami League", "constituencyName": "Chattogram-2", "bio": None},
+    ]
+    for i, row in enumerate(rows):
+        index.add(i, row)
+
+    assert index.search(party="awami") == [0, 2]
+    assert index.search(party="BNP") == [1]
+    # A full value selects exactly that constituency, a partial one prefixes tokens.
+    assert index.search(constituency="Dhaka-1") == [0]
+    assert index.search(constituency="dhaka") == [0, 1]
+    assert index.search(q="rahim") == [0, 1, 2]
+    assert index.search(q="rahim", party="awami", constituency="chatto") == [2]
+    assert index.search(q="nobody") == []
+    # Exact name hits rank ahead of prefix and bio hits.
+    assert index.search(q="rahim", rank=True) == [0, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_and_export(approved_dir, client: AsyncClient):
+    path = approved_dir / "candidate.jsonl"
+    _append(path, *({"full_name": f"Candidate {i}", "party_guess": "Alpha" if i % 2 else "Beta"} for i in range(7)))
+
+    seen = []
+    params = {"party": "alpha", "size": 2}
+    while True:
+        r = await client.get("/public/candidates", params=params)
+        assert r.status_code == 200, r.text
+        data = r.json()
+        # counted once, on the first page
+        assert data["total"] == (None if "after" in params else 3)
+        seen += [c["fullName"] for c in data["items"]]
+        if not data["next_cursor"]:
+            break
+        params["after"] = data["next_cursor"]
+    assert seen == ["Candidate 1", "Candidate 3", "Candidate 5"]
+
+    # Cursors stay valid while new rows are appended.
+    first = (await client.get("/public/candidates", params={"size": 3})).json()
+    _append(path, {"full_name": "Candidate 7"})
+    r = await client.get("/public/candidates", params={"size": 3, "after": first["next_cursor"]})
+    assert [c["fullName"] for c in r.json()["items"]] == ["Candidate 3", "Candidate 4", "Candidate 5"]
+
+    r = await client.get("/public/candidates", params={"after": "garbage"})
+    assert r.status_code == 400
+
+    r = await client.get("/public/candidates/export", params={"party": "beta"})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [c["fullName"] for c in lines] == ["Candidate 0", "Candidate 2", "Candidate 4", "Candidate 6"]
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_304_until_new_approval(approved_dir, client: AsyncClient):
+    path = approved_dir / "party.jsonl"
+    _append(path, {"name": "Alpha Party"})
+
+    r1 = await client.get("/public/parties", params={"size": 5, "search": "a"})
+    etag = r1.headers["etag"]
+    assert r1.headers["cache-control"].startswith("public, max-age=")
+    assert "last-modified" in r1.headers
+
+    # Same params in a different order share the validator.
+    r2 = await client.get("/public/parties?search=a&size=5", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.headers["etag"] == etag
+    assert r2.content == b""
+
+    r3 = await client.get("/public/parties", params={"size": 6, "search": "a"}, headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+
+    _append(path, {"name": "Beta Alliance"})
+    r4 = await client.get("/public/parties", params={"size": 5, "search": "a"}, headers={"If-None-Match": etag})
+    assert r4.status_code == 200
+    assert r4.headers["etag"] != etag
+    assert r4.json()["total"] == 2
+
+
+def test_response_cache_lru_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl=5)
+    cache.set("a", 1, b"1234")
+    cache.set("a", 2, b"5678")
+    assert cache.get("a", 1) == b"1234"
+    cache.set("b", 3, b"9")  # evicts ("a", 2), the least recently used
+    assert cache.get("a", 2) is None
+    cache.set("b", 4, b"123456")  # over max_bytes: evicts until it fits
+    assert cache.stats()["bytes"] <= 10
+
+    clock = [100.0]
+    monkeypatch.setattr("app.utils.response_cache.time.monotonic", lambda: clock[0])
+    cache.set("c", 5, b"x")
+    clock[0] += 6
+    assert cache.get("c", 5) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["evictions"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_public_responses_cached_until_approval(approved_dir, client: AsyncClient):
+    _append(approved_dir / "party.jsonl", {"name": "Alpha Party"})
+
+    before = response_cache.stats()
+    r1 = await client.get("/public/parties")
+    r2 = await client.get("/public/parties", params={"page": 1})
+    assert r1.content == r2.content
+    after = response_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+    r = await client.post("/ingest/extracted/party/0/approve", json={"payload": {"name": "Beta League"}})
+    assert r.status_code == 200, r.text
+    assert response_cache.stats()["entries"] == 0
+
+    r3 = await client.get("/public/parties")
+    assert [p["name"] for p in r3.json()["items"]] == ["Alpha Party", "Beta League"]
+
+    stats = (await client.get("/public/cache/stats")).json()
+    assert {"hits", "misses", "evictions", "entries", "bytes"} <= set(stats)
+
+
+_PARITY_ROWS = [
+    {"full_name": "Rahim Uddin", "party_guess": "Bangladesh Awami League", "constituency_guess": "Dhaka-1"},
+    {"full_name": "Karim Ahmed", "party_guess": "BNP", "constituency_guess": "Dhaka-10", "bio": "Worked with Rahim"},
+    {"full_name": "Rahima Khatun", "party_guess": "Bangladesh Awami League", "constituency_guess": "Chattogram-2"},
+    {"full_name": "Selina Begum", "party_guess": "Jatiya Party", "constituency_guess": "Dhaka-1", "bio": "Teacher"},
+]
+
+
+@pytest.mark.parametrize(
+    "filters, rank",
+    [
+        ({"party": "awami"}, False),
+        ({"party": "BNP"}, False),
+        ({"constituency": "Dhaka-1"}, False),
+        ({"constituency": "dhaka"}, False),
+        ({"q": "rahim"}, False),
+        ({"q": "rahim"}, True),
+        ({"q": "teach", "constituency": "dhaka"}, False),
+        ({"q": "nobody"}, False),
+        ({}, False),
+    ],
+)
+def test_sql_store_matches_jsonl_store(tmp_path, sql_store, filters, rank):
+    jsonl = JsonlApprovedStore(tmp_path)
+    jsonl.append("candidate", _PARITY_ROWS)
+    sql_store.append("candidate", _PARITY_ROWS)
+
+    def names(store):
+        hits, total, _ = store.page("candidate", filters, offset=0, limit=10, rank=rank)
+        return [row["fullName"] for _, row in hits], total
+
+    assert names(sql_store) == names(jsonl)
+    # walking cursor pages (a keyset seek per page) yields the same rows as one page
+    for store in (sql_store, jsonl):
+        walked, after, more = [], None, True
+        while more and not rank:
+            hits, total, more = store.page("candidate", filters, offset=0, limit=1, after=after)
+            assert total is None or after is None
+            walked += [row["fullName"] for _, row in hits]
+            after = hits[-1][0] if hits else None
+        assert rank or walked == names(jsonl)[0]
+    assert [r["fullName"] for r in sql_store.export("candidate", filters)] == [
+        r["fullName"] for r in jsonl.export("candidate", filters)
+    ]
+
+
+_PARTY_ROWS = [
+    {"name": "Bangladesh Nationalist Party"},
+    {"name": "Bangladesh Awami League (BAL)"},
+    {"name": "Jatiya Party (Ershad)"},
+    {"full_name": "Gono Forum"},
+]
+
+
+@pytest.mark.parametrize("search", ["bang", "desh", "ang", "party (", "PARTY", "nat party", "ershad)", "gono", "()", ""])
+def test_sql_store_matches_jsonl_store_for_party_search(tmp_path, sql_store, search):
+    jsonl = JsonlApprovedStore(tmp_path)
+    jsonl.append("party", _PARTY_ROWS)
+    sql_store.append("party", _PARTY_ROWS)
+
+    def names(store):
+        hits, total, _ = store.page("party", {"search": search}, offset=0, limit=10)
+        return [row["name"] for _, row in hits], total
+
+    assert names(sql_store) == names(jsonl)
+    for store in (sql_store, jsonl):
+        first, _, _ = store.page("party", {"search": search}, offset=0, limit=1)
+        if first:
+            rest, total, _ = store.page("party", {"search": search}, offset=0, limit=10, after=first[0][0])
+            assert total is None
+            assert [row["name"] for _, row in first + rest] == names(jsonl)[0]
+    assert [r["name"] for r in sql_store.export("party", {"search": search})] == [
+        r["name"] for r in jsonl.export("party", {"search": search})
+    ]
+
+
+def test_party_search_matches_token_prefixes(tmp_path):
+    store = JsonlApprovedStore(tmp_path)
+    store.append("party", _PARTY_ROWS)
+
+    def names(search):
+        return [row["name"] for _, row in store.page("party", {"search": search}, offset=0, limit=10)[0]]
+
+    assert names("bang") == ["Bangladesh Nationalist Party", "Bangladesh Awami League (BAL)"]
+    assert names("desh") == []  # inside a word: no match on either backend
+    assert names("party (") == ["Bangladesh Nationalist Party", "Jatiya Party (Ershad)"]
+    assert names("nat party") == ["Bangladesh Nationalist Party"]
+    assert names("gono") == ["Gono Forum"]
+    assert len(names("()")) == 4  # no words: no filter
+
+
+def test_cursor_pages_seek_in_the_match_set(tmp_path, monkeypatch):
+    store = JsonlApprovedStore(tmp_path)
+    store.append("candidate", [{"full_name": f"Filler {i}", "party_guess": "Alpha"} for i in range(2000)])
+    store.append("candidate", [{"full_name": f"Zebulon {i}", "party_guess": "Alpha"} for i in range(5)])
+    first, _, _ = store.page("candidate", {"q": "zebulon"}, offset=0, limit=2)
+
+    catalog = store._catalogs["candidate"]
+    read = []
+    row = catalog.row
+    monkeypatch.setattr(catalog, "row", lambda pos: read.append(pos) or row(pos))
+    hits, total, more = store.page("candidate", {"q": "zebulon"}, offset=0, limit=2, after=first[-1][0])
+
+    assert [r["fullName"] for _, r in hits] == ["Zebulon 2", "Zebulon 3"]
+    assert total is None and more
+    assert read == [pos for pos, _ in hits]  # no walk over the filler rows
+
+
+@pytest.mark.asyncio
+async def test_public_api_on_sql_store(sql_store, client: AsyncClient):
+    sql_store.append("party", [{"name": "Alpha Party", "logo_url": "a.png"}, {"name": "Beta League"}])
+    sql_store.append("candidate", [{"full_name": f"Candidate {i}", "party_guess": "Alpha"} for i in range(5)])
+
+    r = await client.get("/public/parties", params={"search": "beta"})
+    assert r.status_code == 200, r.text
+    assert [p["name"] for p in r.json()["items"]] == ["Beta League"]
+
+    seen, params = [], {"size": 2}
+    while True:
+        data = (await client.get("/public/candidates", params=params)).json()
+        seen += [c["fullName"] for c in data["items"]]
+        if not data["next_cursor"]:
+            break
+        params["after"] = data["next_cursor"]
+    assert seen == [f"Candidate {i}" for i in range(5)]
+
+    etag = (await client.get("/public/candidates")).headers["etag"]
+    r = await client.get("/public/candidates", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    r = await client.post("/ingest/extracted/candidate/0/approve", json={"payload": {"full_name": "Late Entry"}})
+    assert r.status_code == 200, r.text
+    r = await client.get("/public/candidates", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["total"] == 6
+
+
+def test_bulk_import_from_jsonl(tmp_path, sql_store):
+    from scripts.import_approved_jsonl import import_dir
+
+    _append(tmp_path / "party.jsonl", {"name": "Alpha Party"}, {"name": "Beta League"})
+    _append(tmp_path / "candidate.jsonl", *_PARITY_ROWS)
+
+    assert import_dir(sql_store, tmp_path, batch_size=3) == {"party": 2, "candidate": 4}
+    hits, total, _ = sql_store.page("candidate", {"party": "awami"}, offset=0, limit=10)
+    assert total == 2
+    assert [row["fullName"] for _, row in hits] == ["Rahim Uddin", "Rahima Khatun"]
+
+
+def test_jsonl_store_supersedes_and_compacts(tmp_path):
+    store = JsonlApprovedStore(tmp_path, compact_min_superseded=1)
+    store.append("party", [{"name": "Alpha Party"}, {"name": "Beta League"}])
+    store.append("party", [{"name": "alpha  party", "abbrev": "AP"}, {"name": "Gamma Front"}])
+
+    hits, total, _ = store.page("party", {}, offset=0, limit=10)
+    assert total == 3
+    assert [(pos, row["name"]) for pos, row in hits] == [(1, "Beta League"), (2, "alpha  party"), (3, "Gamma Front")]
+    assert [r["name"] for r in store.export("party", {"search": "alpha"})] == ["alpha  party"]
+    generation = store.generation("party")[0]
+
+    assert store.compact("party") == 1
+    assert len((tmp_path / "party.jsonl").read_text().splitlines()) == 3
+    # positions, cursors and the generation survive the rewrite
+    assert store.generation("party")[0] == generation
+    after, _, _ = store.page("party", {}, offset=0, limit=10, after=1)
+    assert [(pos, row["name"]) for pos, row in after] == [(2, "alpha  party"), (3, "Gamma Front")]
+    assert store.compact("party") == 0
+
+    store.append("party", [{"name": "Delta"}])
+    hits, total, _ = store.page("party", {}, offset=0, limit=10)
+    assert total == 4
+    assert hits[-1][0] == 4
+
+    # export resolves its rows when called (on the event loop), not when drained from the threadpool
+    store.append("party", [{"name": "Epsilon"}])
+    rows = store.export("party", {})
+    assert store._catalogs["party"].generation == 6
+    store.append("party", [{"name": "Zeta"}])
+    assert [r["name"] for r in rows] == ["Beta League", "alpha  party", "Gamma Front", "Delta", "Epsilon"]
+
+
+def test_catalog_adopts_a_compacted_snapshot_without_reloading(tmp_path):
+    path = tmp_path / "party.jsonl"
+    _append(path, *({"name": f"Party {i}"} for i in range(50)), {"name": "party 3", "abbrev": "P3"})
+    normalized = []
+
+    def normalize(raw):
+        normalized.append(raw["name"])
+        return normalize_party(raw)
+
+    def catalog():
+        return ApprovedCatalog(path, normalize, identity=lambda item: item["name"].casefold())
+
+    reader = catalog()
+    assert len(reader.items()) == 50 and reader.superseded == 1
+    # appended after the reader's last refresh: one new row, one superseding a held row
+    _append(path, {"name": "Party 51"}, {"name": "PARTY 7"})
+    assert catalog().compact() == 2
+    _append(path, {"name": "Party 52"})
+
+    normalized.clear()
+    positions = reader.positions()
+    assert normalized == ["Party 51", "PARTY 7", "Party 52"]
+    fresh = catalog()
+    assert positions == fresh.positions() and reader.items() == fresh.items()
+    assert reader.generation == fresh.generation == 54
+    assert reader.superseded == fresh.superseded == 0
+
+    # anything else replacing the file is a reload
+    path.with_name("other.jsonl").write_text(json.dumps({"name": "Solo"}) + "\n")
+    path.with_name("other.jsonl").replace(path)
+    assert [r["name"] for r in reader.items()] == ["Solo"]
+
+
+def test_sql_store_upserts_by_identity(sql_store):
+    assert sql_store.generation("candidate") == (0, None)
+    sql_store.append("candidate", _PARITY_ROWS[:2])
+    first, modified = sql_store.generation("candidate")
+    sql_store.append("candidate", [{**_PARITY_ROWS[0], "bio": "Re-approved"}, {**_PARITY_ROWS[0], "bio": "Twice"}])
+    # the re-approval is the newest row: the generation moves on
+    assert sql_store.generation("candidate")[0] > first and sql_store.generation("candidate")[1] >= modified
+
+    hits, total, _ = sql_store.page("candidate", {}, offset=0, limit=10)
+    assert total == 2
+    assert [(row["fullName"], row["bio"]) for _, row in hits] == [("Karim Ahmed", "Worked with Rahim"), ("Rahim Uddin", "Twice")]
+    hits, total, _ = sql_store.page("candidate", {"q": "twice"}, offset=0, limit=10)
+    assert total == 1
+    hits, total, _ = sql_store.page("candidate", {"q": "approved"}, offset=0, limit=10)
+    assert total == 0